@@ -3,20 +3,32 @@ Handbook Reader - PDF Processing for Camply
 
 Core components for processing academic handbooks into structured JSON data.
 Integrated into main.py FastAPI service.
+
+Components are imported on first access, so importing the package (or a
+light module such as job_executor) does not load PyMuPDF or the NLP stack.
 """
 
-from .config import HandbookConfig
-from .pdf_processor import HandbookProcessor, validate_pdf, get_pdf_info
-from .content_extractor import ContentExtractor
-from .json_generator import HandbookJSONGenerator
-from .database_updater import HandbookDatabaseUpdater
+import importlib
+
+_EXPORTS = {
+    'HandbookConfig': '.config',
+    'HandbookProcessor': '.pdf_processor',
+    'validate_pdf': '.pdf_processor',
+    'get_pdf_info': '.pdf_processor',
+    'ContentExtractor': '.content_extractor',
+    'HandbookJSONGenerator': '.json_generator',
+    'HandbookDatabaseUpdater': '.database_updater',
+    'HandbookJobExecutor': '.job_executor',
+    'HandbookResultCache': '.result_cache',
+    'HandbookEngine': '.engine'
+}
+
+__all__ = list(_EXPORTS)
 
-__all__ = [
-    'HandbookConfig',
-    'HandbookProcessor',
-    'validate_pdf',
-    'get_pdf_info',
-    'ContentExtractor',
-    'HandbookJSONGenerator',
-    'HandbookDatabaseUpdater'
-] 
\ No newline at end of file
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
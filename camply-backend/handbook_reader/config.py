@@ -1,6 +1,9 @@
 """Configuration settings for Handbook Reader service."""
 
+import hashlib
+import json
 import os
+import tempfile
 from typing import Dict, List
 
 class HandbookConfig:
@@ -9,6 +12,17 @@ class HandbookConfig:
     MAX_FILE_SIZE_MB = 100
     SUPPORTED_FORMATS = ['.pdf']
     
+    # Page extraction workers (1 = serial, 0 = one per CPU core). Only used by
+    # extract_all_content(), i.e. with STREAMING_PIPELINE disabled; the
+    # streaming pipeline reads text page by page on the job's thread.
+    EXTRACTION_WORKERS = int(os.getenv("HANDBOOK_EXTRACTION_WORKERS", "1"))
+    PARALLEL_MIN_PAGES = int(os.getenv("HANDBOOK_PARALLEL_MIN_PAGES", "40"))
+    
+    # Background job executor limits
+    JOB_CONCURRENCY = int(os.getenv("HANDBOOK_JOB_CONCURRENCY", "2"))
+    JOB_QUEUE_SIZE = int(os.getenv("HANDBOOK_JOB_QUEUE_SIZE", "50"))
+    JOB_TIMEOUT_SECONDS = float(os.getenv("HANDBOOK_JOB_TIMEOUT_SECONDS", "900"))
+    
     MIN_WORDS_PER_CATEGORY = 200
     MAX_TEXT_LENGTH = 50000  
     
@@ -102,8 +116,69 @@ class HandbookConfig:
     
     SPACY_MODEL = "en_core_web_sm"
     
+    # Sentence segmentation: "spacy" (the model's sentence recognizer, or the
+    # rule-based sentencizer without the model) or "rules" (regular expression)
+    SENTENCE_SEGMENTER = os.getenv("HANDBOOK_SENTENCE_SEGMENTER", "spacy").lower()
+    SEGMENTATION_BATCH_SIZE = int(os.getenv("HANDBOOK_SEGMENTATION_BATCH_SIZE", "64"))
+    SEGMENTATION_PROCESSES = int(os.getenv("HANDBOOK_SEGMENTATION_PROCESSES", "1"))
+    SEGMENTATION_CACHE_SIZE = int(os.getenv("HANDBOOK_SEGMENTATION_CACHE_SIZE", "256"))
+    
+    # Keep page/paragraph breaks in cleaned text so chunks follow paragraphs
+    PRESERVE_STRUCTURE = os.getenv("HANDBOOK_PRESERVE_STRUCTURE", "TRUE").upper() == "TRUE"
+    
+    # Categorize pages as they are extracted instead of materializing the
+    # whole document first (requires PRESERVE_STRUCTURE). Incremental
+    # reprocessing from the page index only runs on this path; with it
+    # disabled every run scores every chunk.
+    STREAMING_PIPELINE = os.getenv("HANDBOOK_STREAMING_PIPELINE", "TRUE").upper() == "TRUE"
+    
+    # Chunks scored together in one category score matrix
+    SCORING_BATCH_SIZE = int(os.getenv("HANDBOOK_SCORING_BATCH_SIZE", "256"))
+    
     CHUNK_SIZE = 1000  
     OVERLAP_SIZE = 200  
+    MIN_CHUNK_CHARS = 50
+    
+    # Bump when extraction, categorization or JSON output changes so cached
+    # results from older pipelines are no longer reused
+    PIPELINE_VERSION = "2"
+    
+    # Processed results cached by PDF content hash (0 MB disables the local store,
+    # an empty table name disables the shared Supabase store)
+    RESULT_CACHE_DIR = os.getenv(
+        "HANDBOOK_RESULT_CACHE_DIR",
+        os.path.join(tempfile.gettempdir(), "camply_handbook_cache")
+    )
+    RESULT_CACHE_MAX_MB = float(os.getenv("HANDBOOK_RESULT_CACHE_MAX_MB", "500"))
+    RESULT_CACHE_TABLE = os.getenv("HANDBOOK_RESULT_CACHE_TABLE", "handbook_result_cache")
+    
+    # Page hashes and chunk matches saved per handbook so a revised upload only
+    # rescores the chunks touching changed pages (an empty table name disables it)
+    PAGE_INDEX_TABLE = os.getenv("HANDBOOK_PAGE_INDEX_TABLE", "handbook_page_index")
+    
+    @classmethod
+    def get_pipeline_version(cls) -> str:
+        """Get a version string covering every setting that changes processed output.
+        
+        Includes the sentence segmentation backend actually in use, so results
+        split by the rule-based sentencizer (model not installed) are never
+        reused by an instance that has the model, and vice versa. Loads the
+        segmenter if it has not been loaded yet.
+        """
+        from .segmentation import get_segmenter
+        
+        settings = json.dumps({
+            "categories": cls.HANDBOOK_CATEGORIES,
+            "min_words_per_category": cls.MIN_WORDS_PER_CATEGORY,
+            "preserve_structure": cls.PRESERVE_STRUCTURE,
+            "chunk_size": cls.CHUNK_SIZE,
+            "overlap_size": cls.OVERLAP_SIZE,
+            "min_chunk_chars": cls.MIN_CHUNK_CHARS,
+            "sentence_segmenter": cls.SENTENCE_SEGMENTER,
+            "segmentation_backend": get_segmenter().get_backend()
+        }, sort_keys=True)
+        fingerprint = hashlib.sha256(settings.encode("utf-8")).hexdigest()[:12]
+        return f"{cls.PIPELINE_VERSION}-{fingerprint}"
     
     @classmethod
     def get_category_keywords(cls, category: str) -> List[str]:
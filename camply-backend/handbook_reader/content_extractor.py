@@ -2,24 +2,78 @@
 
 import re
 import logging
-from typing import Dict, List, Tuple, Optional
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Optional
 from collections import defaultdict, Counter
 from dataclasses import dataclass
 import string
 
-try:
-    import spacy
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
-    ADVANCED_NLP_AVAILABLE = True
-except ImportError:
-    ADVANCED_NLP_AVAILABLE = False
-    logging.warning("Advanced NLP libraries not available. Using basic text processing.")
+import numpy as np
 
 from .config import HandbookConfig
+from .segmentation import get_segmenter
 
 logger = logging.getLogger(__name__)
 
+CONTEXT_PATTERNS = {
+    'basic_info': [
+        r'contact.*information', r'about.*college', r'mission.*vision',
+        r'established.*in', r'founded.*in', r'college.*overview'
+    ],
+    'semester_structure': [
+        r'semester.*system', r'academic.*year', r'semester.*breakdown',
+        r'academic.*structure', r'term.*duration'
+    ],
+    'examination_rules': [
+        r'examination.*rules', r'exam.*conduct', r'test.*procedures',
+        r'examination.*malpractice', r'exam.*guidelines'
+    ],
+    'evaluation_criteria': [
+        r'grading.*system', r'marking.*scheme', r'assessment.*criteria',
+        r'evaluation.*method', r'grade.*calculation'
+    ],
+    'attendance_policies': [
+        r'attendance.*policy', r'attendance.*requirement', r'minimum.*attendance',
+        r'attendance.*percentage', r'leave.*policy'
+    ],
+    'academic_calendar': [
+        r'academic.*calendar', r'important.*dates', r'examination.*schedule',
+        r'semester.*dates', r'academic.*schedule'
+    ],
+    'course_details': [
+        r'course.*structure', r'syllabus.*details', r'curriculum.*overview',
+        r'course.*description', r'subject.*details'
+    ],
+    'assessment_methods': [
+        r'assessment.*method', r'internal.*assessment', r'external.*examination',
+        r'continuous.*assessment', r'project.*evaluation'
+    ],
+    'disciplinary_rules': [
+        r'disciplinary.*action', r'code.*of.*conduct', r'student.*behavior',
+        r'disciplinary.*committee', r'misconduct.*penalties'
+    ],
+    'graduation_requirements': [
+        r'graduation.*requirement', r'degree.*completion', r'minimum.*credits',
+        r'eligibility.*criteria', r'completion.*requirements'
+    ],
+    'fee_structure': [
+        r'fee.*structure', r'tuition.*fees', r'payment.*schedule',
+        r'fee.*payment', r'scholarship.*details'
+    ],
+    'facilities_rules': [
+        r'library.*rules', r'hostel.*regulations', r'laboratory.*guidelines',
+        r'facility.*usage', r'infrastructure.*rules'
+    ]
+}
+
+SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+
+@dataclass
+class TextChunk:
+    """A chunk of handbook text plus the tail of the previous chunk for context."""
+    text: str
+    overlap: str
+
 @dataclass
 class CategoryMatch:
     """Structure for category matching results."""
@@ -29,6 +83,213 @@ class CategoryMatch:
     keyword_matches: List[str]
     context: str
 
+class CategoryMatcher:
+    """Score every category's keywords and context patterns against a chunk in one pass.
+    
+    A chunk is tokenized once into word-token counts, which give every
+    single-word keyword's whole-word occurrences directly; the few multi-word
+    (or non-word) keywords are counted with word-boundary regexes, and only
+    when their first word occurs. Context patterns of the form 'a.*b' match
+    at most once per line and reduce to ordered str.find calls. Anything that
+    fits neither shape falls back to a precompiled regex. Scores are
+    identical to the per-category scans.
+    
+    For batches, score_matrix turns each chunk into one term-count row over
+    the combined keyword vocabulary (plus one column per context pattern) and
+    scores every category with matrix products instead of per-category loops.
+    """
+    
+    TOKEN_PATTERN = re.compile(r'\w+')
+    SEPARATOR_PATTERN = re.compile(r'\W+')
+    
+    def __init__(self, category_keywords: Dict[str, List[str]],
+                 context_patterns: Dict[str, List[str]]):
+        """
+        Args:
+            category_keywords: Keyword list per category
+            context_patterns: Context regex list per category
+        """
+        self.category_keywords = category_keywords
+        self.context_patterns = context_patterns
+        
+        self.categories = list(category_keywords)
+        self.vocabulary: Dict[str, int] = {}
+        for keywords in category_keywords.values():
+            for keyword in keywords:
+                self.vocabulary.setdefault(keyword.lower(), len(self.vocabulary))
+        
+        # Multi-word and non-word keywords, keyed by the word token that must occur first
+        self._token_keywords = [keyword for keyword in self.vocabulary if self.TOKEN_PATTERN.fullmatch(keyword)]
+        self._regex_keywords: Dict[str, Tuple[Optional[str], re.Pattern]] = {}
+        for keyword in self.vocabulary:
+            if not self.TOKEN_PATTERN.fullmatch(keyword):
+                first_token = self.TOKEN_PATTERN.match(keyword)
+                self._regex_keywords[keyword] = (
+                    first_token.group() if first_token else None,
+                    re.compile(r'\b' + re.escape(keyword) + r'\b')
+                )
+        
+        self._context_pieces: Dict[str, List[Tuple[str, ...]]] = {}
+        self._context_regexes: Dict[str, List[re.Pattern]] = {}
+        for category, patterns in context_patterns.items():
+            pieces_list, regexes = [], []
+            for pattern in patterns:
+                pieces = tuple(pattern.split('.*'))
+                if all(piece and re.escape(piece) == piece for piece in pieces):
+                    pieces_list.append(pieces)
+                else:
+                    regexes.append(re.compile(pattern))
+            self._context_pieces[category] = pieces_list
+            self._context_regexes[category] = regexes
+        
+        # Dense incidence matrices for score_matrix: keyword -> category
+        # (a keyword listed twice counts twice, as in keyword_score) and
+        # context pattern -> category (2 points per match)
+        self.keyword_weights = np.zeros((len(self.vocabulary), len(self.categories)))
+        self._context_features: List[Tuple[object, Optional[frozenset]]] = []
+        context_columns = []
+        for column, category in enumerate(self.categories):
+            for keyword in category_keywords[category]:
+                self.keyword_weights[self.vocabulary[keyword.lower()], column] += 1
+            for pieces in self._context_pieces.get(category, []):
+                self._context_features.append((pieces, frozenset(pieces)))
+                context_columns.append(column)
+            for pattern in self._context_regexes.get(category, []):
+                self._context_features.append((pattern, None))
+                context_columns.append(column)
+        
+        self.context_weights = np.zeros((len(self._context_features), len(self.categories)))
+        self.context_weights[np.arange(len(context_columns)), context_columns] = 2
+        self._context_piece_set = frozenset(
+            piece for pieces, piece_set in self._context_features if piece_set for piece in pieces
+        )
+    
+    def count_keywords(self, text_lower: str) -> Dict[str, int]:
+        """Count non-overlapping whole-word occurrences of every keyword in lowercased text."""
+        token_counts = Counter(self.TOKEN_PATTERN.findall(text_lower))
+        counts = {
+            keyword: token_counts[keyword]
+            for keyword in self._token_keywords if keyword in token_counts
+        }
+        
+        for keyword, (first_token, pattern) in self._regex_keywords.items():
+            if first_token is not None and first_token not in token_counts:
+                continue
+            matches = len(pattern.findall(text_lower))
+            if matches:
+                counts[keyword] = matches
+        
+        return counts
+    
+    def keyword_score(self, counts: Dict[str, int], text_words: int,
+                      keywords: List[str]) -> Tuple[float, List[str]]:
+        """Score one keyword list from precomputed counts, as ContentExtractor.calculate_keyword_score does."""
+        matched_keywords = []
+        total_matches = 0
+        
+        for keyword in keywords:
+            matches = counts.get(keyword.lower(), 0)
+            if matches > 0:
+                matched_keywords.append(keyword)
+                total_matches += matches
+        
+        score = (total_matches * len(matched_keywords)) / max(text_words, 1)
+        return score, matched_keywords
+    
+    @staticmethod
+    def _count_lines(pieces: Tuple[str, ...], lines: List[str]) -> int:
+        """Count the lines containing every piece in order (a pattern 'a.*b' matching the line)."""
+        count = 0
+        for line in lines:
+            position = 0
+            for piece in pieces:
+                found = line.find(piece, position)
+                if found < 0:
+                    break
+                position = found + len(piece)
+            else:
+                count += 1
+        return count
+    
+    def context_score(self, text_lower: str, category: str, lines: Optional[List[str]] = None) -> float:
+        """Score one category's context patterns against lowercased text."""
+        lines = text_lower.split('\n') if lines is None else lines
+        score = 0
+        
+        for pieces in self._context_pieces.get(category, []):
+            score += self._count_lines(pieces, lines) * 2
+        
+        for pattern in self._context_regexes.get(category, []):
+            score += len(pattern.findall(text_lower)) * 2
+        
+        return score
+    
+    def score_chunk(self, text_lower: str) -> Dict[str, Tuple[float, List[str], float]]:
+        """Get (keyword_score, matched_keywords, context_score) for every category."""
+        counts = self.count_keywords(text_lower)
+        text_words = len(text_lower.split())
+        lines = text_lower.split('\n')
+        
+        scores = {}
+        for category, keywords in self.category_keywords.items():
+            keyword_score, matched_keywords = self.keyword_score(counts, text_words, keywords)
+            scores[category] = (
+                keyword_score,
+                matched_keywords,
+                self.context_score(text_lower, category, lines)
+            )
+        return scores
+    
+    def score_matrix(self, texts_lower: List[str]) -> Tuple[np.ndarray, List[Dict[str, int]]]:
+        """Score every category for a batch of lowercased texts at once.
+        
+        Each text is tokenized once into keyword counts and context pattern
+        counts; the per-category totals then come from matrix products.
+        
+        Args:
+            texts_lower: Preprocessed, lowercased texts
+            
+        Returns:
+            (texts x categories array of keyword_score + context_score * 0.5,
+            keyword counts per text for matched_keywords)
+        """
+        keyword_counts = np.zeros((len(texts_lower), len(self.vocabulary)))
+        context_counts = np.zeros((len(texts_lower), len(self._context_features)))
+        text_words = np.empty(len(texts_lower))
+        counts_list = []
+        
+        for row, text_lower in enumerate(texts_lower):
+            counts = self.count_keywords(text_lower)
+            counts_list.append(counts)
+            for keyword, count in counts.items():
+                keyword_counts[row, self.vocabulary[keyword]] = count
+            
+            text_words[row] = max(len(text_lower.split()), 1)
+            lines = text_lower.split('\n')
+            # A pattern can only match if every one of its pieces occurs somewhere
+            present = frozenset(piece for piece in self._context_piece_set if piece in text_lower)
+            for column, (feature, piece_set) in enumerate(self._context_features):
+                if piece_set is None:
+                    context_counts[row, column] = len(feature.findall(text_lower))
+                elif piece_set <= present:
+                    context_counts[row, column] = self._count_lines(feature, lines)
+        
+        # Counts are whole numbers, so these products are exact and the
+        # scores equal keyword_score + context_score * 0.5 bit for bit
+        total_matches = keyword_counts @ self.keyword_weights
+        matched_keywords = (keyword_counts > 0).astype(np.float64) @ self.keyword_weights
+        scores = (total_matches * matched_keywords) / text_words[:, None]
+        scores += (context_counts @ self.context_weights) * 0.5
+        
+        return scores, counts_list
+    
+    def matched_keywords(self, counts: Dict[str, int], category: str) -> List[str]:
+        """Get a category's keywords that occur in a text, in keyword list order."""
+        return [
+            keyword for keyword in self.category_keywords[category]
+            if counts.get(keyword.lower(), 0) > 0
+        ]
+
 class ContentExtractor:
     """Advanced content extraction and categorization system."""
     
@@ -39,20 +300,10 @@ class ContentExtractor:
             cat: HandbookConfig.get_category_keywords(cat) 
             for cat in self.categories
         }
+        self.matcher = CategoryMatcher(self.category_keywords, CONTEXT_PATTERNS)
         
-        self.nlp = None
-        self.vectorizer = None
-        
-        if ADVANCED_NLP_AVAILABLE:
-            try:
-                self.nlp = spacy.load(HandbookConfig.SPACY_MODEL)
-                logger.info("Loaded spaCy model for advanced text processing")
-            except OSError:
-                logger.warning(f"spaCy model '{HandbookConfig.SPACY_MODEL}' not found. Using basic processing.")
-                # Don't modify global variable, use instance variable instead
-                self.advanced_nlp_available = False
-        else:
-            self.advanced_nlp_available = ADVANCED_NLP_AVAILABLE
+        # spaCy is loaded on first use, with sentence boundaries only
+        self.segmenter = get_segmenter()
     
     def preprocess_text(self, text: str) -> str:
         """Clean and preprocess text for analysis."""
@@ -68,43 +319,95 @@ class ContentExtractor:
         return text.strip()
     
     def extract_sentences(self, text: str) -> List[str]:
-        """Extract sentences from text."""
-        if self.nlp and getattr(self, 'advanced_nlp_available', ADVANCED_NLP_AVAILABLE):
-            doc = self.nlp(text)
-            return [sent.text.strip() for sent in doc.sents if len(sent.text.strip()) > 10]
-        else:
-            sentences = re.split(r'[.!?]+', text)
-            return [s.strip() for s in sentences if len(s.strip()) > 10]
+        """Extract sentences from text (see SentenceSegmenter)."""
+        return [sentence for sentence in self.segmenter.split(text) if len(sentence) > 10]
     
     def extract_chunks(self, text: str) -> List[str]:
         """Extract meaningful chunks from text for processing."""
-        chunks = []
-        
-        paragraphs = text.split('\n\n')
+        return [chunk.text for chunk in self.build_chunks(text)]
+    
+    def build_chunks(self, text: str) -> List[TextChunk]:
+        """Pack the blank-line separated paragraphs of text into chunks (see iter_chunks)."""
+        return list(self.iter_chunks(text.split('\n\n')))
+    
+    def iter_chunks(self, paragraphs: Iterable[str]) -> Iterator[TextChunk]:
+        """Pack paragraphs into chunks of up to CHUNK_SIZE characters as they arrive.
+        
+        Consecutive paragraphs are packed together; a paragraph longer than
+        CHUNK_SIZE is split on sentence ends (and, failing that, on spaces).
+        Each chunk also carries up to OVERLAP_SIZE characters from the end of
+        the previous chunk as scoring context. Parts are collected in a list
+        and joined once, so building is linear in the text length. One chunk
+        is held back so a short tail can be merged into it.
+        """
+        chunk_size = HandbookConfig.CHUNK_SIZE
+        previous: Optional[TextChunk] = None
+        parts: List[str] = []
+        length = 0
         
         for paragraph in paragraphs:
             paragraph = paragraph.strip()
-            if len(paragraph) < 50:  
+            if not paragraph:
                 continue
             
-            if len(paragraph) > HandbookConfig.CHUNK_SIZE:
-                sentences = self.extract_sentences(paragraph)
-                current_chunk = ""
+            pieces = [paragraph] if len(paragraph) <= chunk_size else self.split_paragraph(paragraph)
+            
+            for index, piece in enumerate(pieces):
+                separator = ' ' if index else '\n\n'
                 
-                for sentence in sentences:
-                    if len(current_chunk + sentence) > HandbookConfig.CHUNK_SIZE:
-                        if current_chunk:
-                            chunks.append(current_chunk.strip())
-                        current_chunk = sentence
-                    else:
-                        current_chunk += " " + sentence
+                # Short buffers (e.g. a lone heading) always take the next piece
+                if parts and length >= HandbookConfig.MIN_CHUNK_CHARS \
+                        and length + len(separator) + len(piece) > chunk_size:
+                    chunk = self._make_chunk(parts[1:], previous)
+                    if previous:
+                        yield previous
+                    previous = chunk
+                    parts, length = [], 0
                 
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-            else:
-                chunks.append(paragraph)
-        
-        return chunks
+                parts.append(separator)
+                parts.append(piece)
+                length += len(piece) + (len(separator) if length else 0)
+        
+        if parts:
+            if length < HandbookConfig.MIN_CHUNK_CHARS and previous:
+                previous = TextChunk(text=previous.text + "".join(parts), overlap=previous.overlap)
+            elif length >= HandbookConfig.MIN_CHUNK_CHARS:
+                chunk = self._make_chunk(parts[1:], previous)
+                if previous:
+                    yield previous
+                previous = chunk
+        
+        if previous:
+            yield previous
+    
+    def split_paragraph(self, paragraph: str) -> List[str]:
+        """Split an oversized paragraph into pieces no longer than CHUNK_SIZE, keeping all text."""
+        chunk_size = HandbookConfig.CHUNK_SIZE
+        pieces = []
+        
+        for sentence in SENTENCE_BREAK.split(paragraph):
+            while len(sentence) > chunk_size:
+                cut = sentence.rfind(' ', 0, chunk_size)
+                if cut <= 0:
+                    cut = chunk_size
+                pieces.append(sentence[:cut])
+                sentence = sentence[cut:].lstrip()
+            if sentence:
+                pieces.append(sentence)
+        
+        return pieces
+    
+    def _make_chunk(self, parts: List[str], previous_chunk: Optional[TextChunk]) -> TextChunk:
+        """Join buffered parts into a chunk whose overlap is the tail of the previous chunk."""
+        overlap = ""
+        if previous_chunk and HandbookConfig.OVERLAP_SIZE > 0:
+            previous = previous_chunk.text
+            overlap = previous[-HandbookConfig.OVERLAP_SIZE:]
+            if len(previous) > HandbookConfig.OVERLAP_SIZE:
+                word_start = re.search(r'\s', overlap)
+                overlap = overlap[word_start.end():] if word_start else overlap
+        
+        return TextChunk(text="".join(parts), overlap=overlap)
     
     def calculate_keyword_score(self, text: str, keywords: List[str]) -> Tuple[float, List[str]]:
         """Calculate keyword-based relevance score for a category."""
@@ -126,80 +429,21 @@ class ContentExtractor:
     
     def calculate_context_score(self, text: str, category: str) -> float:
         """Calculate contextual relevance score using pattern matching."""
-        context_patterns = {
-            'basic_info': [
-                r'contact.*information', r'about.*college', r'mission.*vision',
-                r'established.*in', r'founded.*in', r'college.*overview'
-            ],
-            'semester_structure': [
-                r'semester.*system', r'academic.*year', r'semester.*breakdown',
-                r'academic.*structure', r'term.*duration'
-            ],
-            'examination_rules': [
-                r'examination.*rules', r'exam.*conduct', r'test.*procedures',
-                r'examination.*malpractice', r'exam.*guidelines'
-            ],
-            'evaluation_criteria': [
-                r'grading.*system', r'marking.*scheme', r'assessment.*criteria',
-                r'evaluation.*method', r'grade.*calculation'
-            ],
-            'attendance_policies': [
-                r'attendance.*policy', r'attendance.*requirement', r'minimum.*attendance',
-                r'attendance.*percentage', r'leave.*policy'
-            ],
-            'academic_calendar': [
-                r'academic.*calendar', r'important.*dates', r'examination.*schedule',
-                r'semester.*dates', r'academic.*schedule'
-            ],
-            'course_details': [
-                r'course.*structure', r'syllabus.*details', r'curriculum.*overview',
-                r'course.*description', r'subject.*details'
-            ],
-            'assessment_methods': [
-                r'assessment.*method', r'internal.*assessment', r'external.*examination',
-                r'continuous.*assessment', r'project.*evaluation'
-            ],
-            'disciplinary_rules': [
-                r'disciplinary.*action', r'code.*of.*conduct', r'student.*behavior',
-                r'disciplinary.*committee', r'misconduct.*penalties'
-            ],
-            'graduation_requirements': [
-                r'graduation.*requirement', r'degree.*completion', r'minimum.*credits',
-                r'eligibility.*criteria', r'completion.*requirements'
-            ],
-            'fee_structure': [
-                r'fee.*structure', r'tuition.*fees', r'payment.*schedule',
-                r'fee.*payment', r'scholarship.*details'
-            ],
-            'facilities_rules': [
-                r'library.*rules', r'hostel.*regulations', r'laboratory.*guidelines',
-                r'facility.*usage', r'infrastructure.*rules'
-            ]
-        }
-        
-        patterns = context_patterns.get(category, [])
-        score = 0
-        text_lower = text.lower()
-        
-        for pattern in patterns:
-            matches = len(re.findall(pattern, text_lower))
-            score += matches * 2  
-        
-        return score
+        return self.matcher.context_score(text.lower(), category)
     
-    def categorize_chunk(self, chunk: str) -> List[CategoryMatch]:
-        """Categorize a text chunk into relevant categories."""
-        chunk_preprocessed = self.preprocess_text(chunk)
+    def categorize_chunk(self, chunk: str, overlap: str = "") -> List[CategoryMatch]:
+        """Categorize a text chunk into relevant categories.
+        
+        Args:
+            chunk: Text to categorize; this is what gets stored on a match
+            overlap: Preceding text that is scored along with the chunk but not stored
+        """
+        chunk_preprocessed = self.preprocess_text(overlap + "\n\n" + chunk if overlap else chunk)
+        chunk_scores = self.matcher.score_chunk(chunk_preprocessed.lower())
         matches = []
         
         for category in self.categories:
-            keywords = self.category_keywords[category]
-            
-            keyword_score, matched_keywords = self.calculate_keyword_score(
-                chunk_preprocessed, keywords
-            )
-            
-            context_score = self.calculate_context_score(chunk_preprocessed, category)
+            keyword_score, matched_keywords, context_score = chunk_scores[category]
             
             total_score = keyword_score + (context_score * 0.5)
             
@@ -215,34 +459,124 @@ class ContentExtractor:
         matches.sort(key=lambda x: x.confidence, reverse=True)
         return matches[:3]  
     
+    def categorize_chunk_batch(self, chunks: List[TextChunk]) -> List[List[CategoryMatch]]:
+        """Categorize several chunks with one score matrix.
+        
+        Gives the same matches as calling categorize_chunk on each chunk:
+        the top 3 categories by confidence, ties kept in category order.
+        """
+        if not chunks:
+            return []
+        
+        texts_lower = [
+            self.preprocess_text(chunk.overlap + "\n\n" + chunk.text if chunk.overlap else chunk.text).lower()
+            for chunk in chunks
+        ]
+        scores, counts_list = self.matcher.score_matrix(texts_lower)
+        
+        # A stable sort on the negated scores keeps tied categories in order
+        top_columns = np.argsort(-scores, axis=1, kind='stable')[:, :3]
+        categories = self.matcher.categories
+        
+        batch_matches = []
+        for row, chunk in enumerate(chunks):
+            matches = []
+            for column in top_columns[row]:
+                confidence = float(scores[row, column])
+                if confidence <= 0:
+                    break
+                category = categories[column]
+                matches.append(CategoryMatch(
+                    category=category,
+                    content=chunk.text,
+                    confidence=confidence,
+                    keyword_matches=self.matcher.matched_keywords(counts_list[row], category),
+                    context=chunk.text[:200] + "..." if len(chunk.text) > 200 else chunk.text
+                ))
+            batch_matches.append(matches)
+        
+        return batch_matches
+    
     def extract_categorized_content(self, text: str) -> Dict[str, Dict]:
         """Extract and categorize content from handbook text."""
         logger.info(f"Starting content categorization for {len(text)} characters of text")
-        
+        return self.categorize_chunks(self.iter_chunks(text.split('\n\n')))
+    
+    def extract_categorized_content_from_pages(self, pages: Iterable[str]) -> Dict[str, Dict]:
+        """Categorize cleaned page texts as they are produced.
+        
+        Pages are consumed one at a time, so only the current chunk and the
+        per-category aggregates are held in memory. Gives the same result as
+        extract_categorized_content on the pages joined by blank lines.
+        """
+        logger.info("Starting streaming content categorization")
+        paragraphs = (paragraph for page in pages for paragraph in page.split('\n\n'))
+        return self.categorize_chunks(self.iter_chunks(paragraphs))
+    
+    def analyze_chunk_batch(self, chunks: List[TextChunk]) -> List[Tuple[List[CategoryMatch], int]]:
+        """Categorize chunks and count the sentences of each chunk that matched a category.
+        
+        Returns:
+            (matches, sentence count) per chunk; the count is 0 for unmatched chunks
+        """
+        batch_matches = self.categorize_chunk_batch(chunks)
+        matched = [index for index, matches in enumerate(batch_matches) if matches]
+        segmented = self.segmenter.split_many([chunks[index].text for index in matched], memoize=False)
+        sentence_counts = {
+            index: sum(1 for sentence in sentences if len(sentence) > 10)
+            for index, sentences in zip(matched, segmented)
+        }
+        return [(matches, sentence_counts.get(index, 0)) for index, matches in enumerate(batch_matches)]
+    
+    def categorize_chunks(self, chunks: Iterable[TextChunk],
+                          analyze_batch: Optional[Callable[[List[TextChunk]], List[Tuple[List[CategoryMatch], int]]]] = None
+                          ) -> Dict[str, Dict]:
+        """Categorize chunks and aggregate the matches per category.
+        
+        A category's sentence count (for its quality score) is the sum over
+        its chunks: chunks are joined by blank lines, which always end a
+        sentence, so each chunk is segmented once instead of once per category.
+        
+        Args:
+            chunks: Chunks in document order
+            analyze_batch: Used instead of analyze_chunk_batch, e.g. to reuse
+                results from an earlier run
+        """
+        analyze_batch = analyze_batch or self.analyze_chunk_batch
         categorized_content = {category: {
             'content': [],
             'total_words': 0,
+            'total_sentences': 0,
             'confidence_scores': [],
             'keyword_matches': set(),
             'sources': []
         } for category in self.categories}
         
-        chunks = self.extract_chunks(text)
-        logger.info(f"Extracted {len(chunks)} chunks for processing")
+        chunk_count = 0
+        chunks = iter(chunks)
+        batch_size = max(HandbookConfig.SCORING_BATCH_SIZE, 1)
         
-        for i, chunk in enumerate(chunks):
-            matches = self.categorize_chunk(chunk)
+        while True:
+            batch = list(islice(chunks, batch_size))
+            if not batch:
+                break
             
-            for match in matches:
-                cat_data = categorized_content[match.category]
-                cat_data['content'].append(match.content)
-                cat_data['total_words'] += len(match.content.split())
-                cat_data['confidence_scores'].append(match.confidence)
-                cat_data['keyword_matches'].update(match.keyword_matches)
-                cat_data['sources'].append(f"chunk_{i}")
-            
-            if (i + 1) % 50 == 0:
-                logger.info(f"Processed {i + 1}/{len(chunks)} chunks")
+            for matches, sentences in analyze_batch(batch):
+                i = chunk_count
+                for match in matches:
+                    cat_data = categorized_content[match.category]
+                    cat_data['content'].append(match.content)
+                    cat_data['total_words'] += len(match.content.split())
+                    cat_data['total_sentences'] += sentences
+                    cat_data['confidence_scores'].append(match.confidence)
+                    cat_data['keyword_matches'].update(match.keyword_matches)
+                    cat_data['sources'].append(f"chunk_{i}")
+                
+                chunk_count = i + 1
+                if chunk_count % 50 == 0:
+                    logger.info(f"Processed {chunk_count} chunks")
+        
+        logger.info(f"Categorized {chunk_count} chunks")
         
         final_content = {}
         
@@ -259,7 +593,8 @@ class ContentExtractor:
                     'keyword_matches': list(data['keyword_matches']),
                     'chunk_count': len(data['content']),
                     'quality_score': self.calculate_quality_score(
-                        combined_content, data['total_words'], avg_confidence
+                        combined_content, data['total_words'], avg_confidence,
+                        sentences=data['total_sentences']
                     )
                 }
             else:
@@ -275,8 +610,13 @@ class ContentExtractor:
         logger.info("Content categorization completed")
         return final_content
     
-    def calculate_quality_score(self, content: str, word_count: int, confidence: float) -> float:
-        """Calculate overall quality score for categorized content."""
+    def calculate_quality_score(self, content: str, word_count: int, confidence: float,
+                                sentences: Optional[int] = None) -> float:
+        """Calculate overall quality score for categorized content.
+        
+        Args:
+            sentences: Number of sentences in content, if already known
+        """
         if word_count == 0:
             return 0.0
         
@@ -287,7 +627,8 @@ class ContentExtractor:
         elif word_count >= HandbookConfig.MIN_WORDS_PER_CATEGORY * 0.5:
             score += 10
         
-        sentences = len(self.extract_sentences(content))
+        if sentences is None:
+            sentences = len(self.extract_sentences(content))
         if sentences > 5:
             score += 10
         elif sentences > 2:
@@ -1,29 +1,60 @@
 """Database integration for storing processed handbook data in Supabase."""
 
+import json
 import logging
+import time
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+from postgrest.exceptions import APIError
+
 import sys
 sys.path.append(str(Path(__file__).parent.parent))
-from shared.database import supabase, UserDataService
+from shared.database import (
+    get_supabase, get_async_supabase, UserDataService, HANDBOOK_CONTENT_EMBED, HANDBOOK_SECTIONS,
+    handbook_content_hash, handbook_section_hash, resolve_handbook_content
+)
+from shared.search_index import HandbookSearchIndex, split_passages
+from shared.vector_index import ChunkVectorIndex
+from shared.embeddings import get_embedder
 from shared.config import Config
 
+from .config import HandbookConfig
+
 logger = logging.getLogger(__name__)
 
+# Postgres error code PostgREST reports when a reference points at a missing row
+FOREIGN_KEY_VIOLATION = "23503"
+
+def json_size(payload) -> int:
+    """Size in bytes of a JSON request body as the Supabase client sends it (compact, UTF-8)."""
+    return len(json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
 class HandbookDatabaseUpdater:
-    """Handle database operations for handbook processing."""
+    """Handle database operations for handbook processing.
     
-    def __init__(self):
-        """Initialize the database updater."""
-        self.supabase = supabase
+    Coroutine methods, called from API endpoints, use the shared async client.
+    Plain methods block and are meant for the processing worker threads.
+    """
+    
+    def __init__(self, content_extractor=None):
+        """Initialize the database updater.
+        
+        Args:
+            content_extractor: ContentExtractor used to chunk sections for the
+                embedding index (paragraph passages are used without one)
+        """
+        self.supabase = get_supabase()
+        self.content_extractor = content_extractor
         self.current_timestamp = datetime.utcnow().isoformat()
+        self.last_store_stats: Optional[Dict] = None
     
     async def get_user_handbook_record(self, user_id: str, academic_id: str) -> Optional[Dict]:
         """Get existing handbook record for user."""
         try:
-            response = self.supabase.table("user_handbooks").select("*").eq(
+            client = await get_async_supabase()
+            response = await client.table("user_handbooks").select("*").eq(
                 "user_id", user_id
             ).eq("academic_id", academic_id).execute()
             
@@ -51,9 +82,22 @@ class HandbookDatabaseUpdater:
             elif status == "failed":
                 update_data["error_message"] = error_message
             
-            response = self.supabase.table("user_handbooks").update(update_data).eq(
-                "handbook_id", handbook_id
-            ).execute()
+            try:
+                response = self.supabase.table("user_handbooks").update(update_data).eq(
+                    "handbook_id", handbook_id
+                ).execute()
+            except APIError as e:
+                if e.code != FOREIGN_KEY_VIOLATION or "content_hash" not in update_data:
+                    raise
+                # The content row was collected after it was found stored (its
+                # last other handbook went away): store it again and re-point
+                logger.warning(f"Content {content_hash} was collected before handbook {handbook_id} referenced it, storing it again")
+                write = self.plan_content_write(sections, content_hash, {})
+                bytes_written += json_size(write["payload"])
+                self.insert_content(write["payload"])
+                response = self.supabase.table("user_handbooks").update(update_data).eq(
+                    "handbook_id", handbook_id
+                ).execute()
             
             logger.info(f"Updated handbook {handbook_id} status to {status}")
             return True
@@ -62,7 +106,7 @@ class HandbookDatabaseUpdater:
             logger.error(f"Error updating processing status: {e}")
             return False
     
-    def create_handbook_record(self, user_id: str, academic_id: str, storage_path: str, 
+    async def create_handbook_record(self, user_id: str, academic_id: str, storage_path: str, 
                              original_filename: str, file_size: int) -> Optional[str]:
         """Create new handbook record and return handbook_id."""
         try:
@@ -78,7 +122,8 @@ class HandbookDatabaseUpdater:
                 "updated_at": self.current_timestamp
             }
             
-            response = self.supabase.table("user_handbooks").insert(insert_data).execute()
+            client = await get_async_supabase()
+            response = await client.table("user_handbooks").insert(insert_data).execute()
             
             if response.data:
                 handbook_id = response.data[0]["handbook_id"]
@@ -92,16 +137,23 @@ class HandbookDatabaseUpdater:
             return None
     
     def store_processed_content(self, handbook_id: str, database_format: Dict) -> bool:
-        """Store processed content in the handbook record."""
+        """Store processed content and point the handbook record at it.
+        
+        Sections are written once per distinct handbook into handbook_contents,
+        keyed by handbook_content_hash(), together with their search and chunk
+        embedding indexes; the user row only keeps the reference. Writes are
+        diff-aware: what is stored is read first (see get_content_state), and
+        a reprocessed handbook only sends the sections whose stored JSON
+        changed (see plan_content_write). If a content row found stored is
+        collected before the handbook references it, the reference update
+        fails and the content is stored again. Bytes sent and time taken are
+        logged and kept in last_store_stats.
+        """
         try:
+            started = time.perf_counter()
             logger.info(f"Storing processed content for handbook {handbook_id}")
             
-            update_data = {
-                "processing_status": "completed",
-                "processed_date": self.current_timestamp,
-                "updated_at": self.current_timestamp,
-                "error_message": None
-            }
+            sections = {}
             
             categories = [
                 'basic_info', 'semester_structure', 'examination_rules', 'evaluation_criteria',
@@ -112,9 +164,9 @@ class HandbookDatabaseUpdater:
             for category in categories:
                 category_data = database_format.get(category, {})
                 if category_data and category_data.get("content"):
-                    update_data[category] = category_data
+                    sections[category] = category_data
                 else:
-                    update_data[category] = {
+                    sections[category] = {
                         "title": self.format_category_title(category),
                         "content": "",
                         "summary": "No content found for this section in the handbook.",
@@ -128,10 +180,77 @@ class HandbookDatabaseUpdater:
                         "searchable_text": "",
                         "content_hash": ""
                     }
+                
+                # Hash of everything stored for the section, compared on the next store
+                sections[category] = {
+                    **sections[category],
+                    "section_hash": handbook_section_hash(sections[category])
+                }
             
-            response = self.supabase.table("user_handbooks").update(update_data).eq(
-                "handbook_id", handbook_id
-            ).execute()
+            content_hash = handbook_content_hash(sections)
+            
+            state = self.get_content_state(handbook_id, content_hash)
+            if state is None:
+                # Without the stored state, only skip content that is already stored
+                existing = self.supabase.table("handbook_contents").select("content_hash").eq(
+                    "content_hash", content_hash
+                ).limit(1).execute()
+                state = {"stored": bool(existing.data), "inline_sections": True}
+            
+            write = self.plan_content_write(sections, content_hash, state)
+            bytes_written = 0
+            
+            if write["mode"] == "partial":
+                bytes_written += json_size(write["payload"])
+                derived = self.supabase.rpc("derive_handbook_contents", write["payload"]).execute()
+                if not derived.data:
+                    # The content row the handbook pointed at is gone, store everything
+                    write = self.plan_content_write(sections, content_hash, {})
+            
+            if write["mode"] == "full":
+                bytes_written += json_size(write["payload"])
+                self.insert_content(write["payload"])
+            
+            update_data = {
+                "processing_status": "completed",
+                "processed_date": self.current_timestamp,
+                "updated_at": self.current_timestamp,
+                "error_message": None
+            }
+            if state.get("content_hash") != content_hash:
+                update_data["content_hash"] = content_hash
+            if state.get("inline_sections"):
+                update_data.update({category: None for category in categories})
+            bytes_written += json_size(update_data)
+            
+            try:
+                response = self.supabase.table("user_handbooks").update(update_data).eq(
+                    "handbook_id", handbook_id
+                ).execute()
+            except APIError as e:
+                if e.code != FOREIGN_KEY_VIOLATION or "content_hash" not in update_data:
+                    raise
+                # The content row was collected after it was found stored (its
+                # last other handbook went away): store it again and re-point
+                logger.warning(f"Content {content_hash} was collected before handbook {handbook_id} referenced it, storing it again")
+                write = self.plan_content_write(sections, content_hash, {})
+                bytes_written += json_size(write["payload"])
+                self.insert_content(write["payload"])
+                response = self.supabase.table("user_handbooks").update(update_data).eq(
+                    "handbook_id", handbook_id
+                ).execute()
+            
+            self.last_store_stats = {
+                "mode": write["mode"],
+                "changed_sections": write["changed_sections"],
+                "bytes_written": bytes_written,
+                "seconds": time.perf_counter() - started
+            }
+            logger.info(
+                f"Store for handbook {handbook_id}: {write['mode']}, "
+                f"{len(write['changed_sections'])}/{len(categories)} sections written, "
+                f"{bytes_written} bytes in {self.last_store_stats['seconds']:.2f}s"
+            )
             
             if response.data:
                 logger.info(f"Successfully stored processed content for handbook {handbook_id}")
@@ -145,6 +264,138 @@ class HandbookDatabaseUpdater:
             self.update_processing_status(handbook_id, "failed", str(e))
             return False
     
+    def insert_content(self, row: Dict):
+        """Insert a handbook_contents row, leaving an existing row with the same content_hash as is."""
+        self.supabase.table("handbook_contents").upsert(
+            row,
+            on_conflict="content_hash",
+            ignore_duplicates=True,
+            returning="minimal"
+        ).execute()
+    
+    def get_content_state(self, handbook_id: str, content_hash: str) -> Optional[Dict]:
+        """Get what is stored for a handbook, without reading any section bodies.
+        
+        One call to handbook_content_state(), which returns the content_hash
+        the handbook points at, whether content_hash is already stored,
+        whether the user row still carries inline sections, and the per-section
+        section_hash values and chunk index model of the current content row.
+        
+        Returns:
+            The stored state, or None if it could not be read
+        """
+        try:
+            response = self.supabase.rpc("handbook_content_state", {
+                "target_handbook_id": handbook_id,
+                "new_content_hash": content_hash
+            }).execute()
+            return response.data or {}
+            
+        except Exception as e:
+            logger.warning(f"Failed to read stored content state for handbook {handbook_id}: {e}")
+            return None
+    
+    def plan_content_write(self, sections: Dict, content_hash: str, state: Dict) -> Dict:
+        """Decide what to send to store a handbook's sections.
+        
+        Args:
+            sections: All twelve sections, keyed by category, with their section_hash
+            content_hash: handbook_content_hash() of the sections
+            state: Stored state from get_content_state ({} if nothing is stored)
+        
+        Returns:
+            Dict with mode, changed_sections and payload. Mode is "unchanged"
+            when the content row already exists (no payload), "partial" when
+            the handbook's current row differs in some sections, i.e. their
+            section_hash (any stored field, not only the text) (payload for
+            derive_handbook_contents, holding only those sections and the
+            embeddings of their chunks) and "full" otherwise (a handbook_contents row).
+        """
+        if state.get("stored"):
+            return {"mode": "unchanged", "changed_sections": [], "payload": None}
+        
+        search_index = HandbookSearchIndex.build(sections).to_dict()
+        stored_sections = state.get("sections")
+        
+        if state.get("content_hash") and stored_sections:
+            changed = {
+                category: section_data for category, section_data in sections.items()
+                if section_data["section_hash"] != stored_sections.get(category)
+            }
+            
+            # Unchanged sections keep their stored embeddings if the embedder is the same
+            chunk_index = self.build_chunk_index(changed)
+            stored_chunk_index = state.get("chunk_index") or {}
+            chunk_index_partial = all(
+                stored_chunk_index.get(key) == chunk_index[key] for key in ("version", "model", "dim")
+            )
+            if not chunk_index_partial:
+                chunk_index = self.build_chunk_index(sections)
+            
+            return {
+                "mode": "partial",
+                "changed_sections": list(changed),
+                "payload": {
+                    "base_content_hash": state["content_hash"],
+                    "new_content_hash": content_hash,
+                    "changed_sections": changed,
+                    "new_search_index": search_index,
+                    "new_chunk_index": chunk_index,
+                    "chunk_index_partial": chunk_index_partial
+                }
+            }
+        
+        return {
+            "mode": "full",
+            "changed_sections": list(sections),
+            "payload": {
+                "content_hash": content_hash,
+                **sections,
+                "search_index": search_index,
+                "chunk_index": self.build_chunk_index(sections)
+            }
+        }
+    
+    def build_chunk_index(self, sections: Dict) -> Dict:
+        """Embed the chunks of the given sections into a serialized ChunkVectorIndex."""
+        return ChunkVectorIndex.build(self.build_section_chunks(sections), get_embedder()).to_dict()
+    
+    def get_page_index(self, handbook_id: str) -> Optional[Dict]:
+        """Get the page index saved by the handbook's last successful run, if any."""
+        if not HandbookConfig.PAGE_INDEX_TABLE:
+            return None
+        
+        try:
+            response = self.supabase.table(HandbookConfig.PAGE_INDEX_TABLE).select("page_index").eq(
+                "handbook_id", handbook_id
+            ).eq("pipeline_version", HandbookConfig.get_pipeline_version()).limit(1).execute()
+            
+            if response.data:
+                return response.data[0]["page_index"]
+            return None
+            
+        except Exception as e:
+            logger.warning(f"Failed to load page index for handbook {handbook_id}: {e}")
+            return None
+    
+    def store_page_index(self, handbook_id: str, page_index: Dict) -> bool:
+        """Save the page index for incremental reprocessing of the handbook."""
+        if not HandbookConfig.PAGE_INDEX_TABLE:
+            return False
+        
+        try:
+            self.supabase.table(HandbookConfig.PAGE_INDEX_TABLE).upsert({
+                "handbook_id": handbook_id,
+                "pipeline_version": page_index["pipeline_version"],
+                "page_index": page_index,
+                "updated_at": datetime.utcnow().isoformat()
+            }, on_conflict="handbook_id", returning="minimal").execute()
+            return True
+            
+        except Exception as e:
+            logger.warning(f"Failed to store page index for handbook {handbook_id}: {e}")
+            return False
+    
     def format_category_title(self, category: str) -> str:
         """Format category name into a readable title."""
         title_mapping = {
@@ -167,12 +418,12 @@ class HandbookDatabaseUpdater:
     def get_user_handbook_data(self, user_id: str, academic_id: str) -> Optional[Dict]:
         """Get processed handbook data for a user."""
         try:
-            response = self.supabase.table("user_handbooks").select("*").eq(
-                "user_id", user_id
-            ).eq("academic_id", academic_id).eq("processing_status", "completed").execute()
+            response = self.supabase.table("user_handbooks").select(
+                f"*, {HANDBOOK_CONTENT_EMBED}({', '.join(HANDBOOK_SECTIONS)})"
+            ).eq("user_id", user_id).eq("academic_id", academic_id).eq("processing_status", "completed").execute()
             
             if response.data:
-                return response.data[0]
+                return resolve_handbook_content(response.data[0])
             return None
             
         except Exception as e:
@@ -187,56 +438,105 @@ class HandbookDatabaseUpdater:
             if not handbook_data:
                 return []
             
-            results = []
-            search_categories = categories or [
-                'basic_info', 'semester_structure', 'examination_rules', 'evaluation_criteria',
-                'attendance_policies', 'academic_calendar', 'course_details', 'assessment_methods',
-                'disciplinary_rules', 'graduation_requirements', 'fee_structure', 'facilities_rules'
-            ]
-            
-            query_lower = query.lower()
+            index = self.get_search_index(handbook_data)
+            hits = index.search(query, limit=30, sections=categories)
             
-            for category in search_categories:
-                category_data = handbook_data.get(category, {})
-                if not category_data:
+            # Hits are ranked by BM25; keep each category's best passage
+            results = []
+            seen_categories = set()
+            for hit in hits:
+                category = hit["section"]
+                if category in seen_categories:
                     continue
+                seen_categories.add(category)
                 
-                searchable_text = category_data.get("searchable_text", "").lower()
-                content = category_data.get("content", "").lower()
-                summary = category_data.get("summary", "").lower()
-                
-                relevance_score = 0
-                if query_lower in searchable_text:
-                    relevance_score += 10
-                if query_lower in summary:
-                    relevance_score += 5
-                if query_lower in content:
-                    relevance_score += 3
-                
-                query_words = query_lower.split()
-                for word in query_words:
-                    if word in searchable_text:
-                        relevance_score += 2
-                    if word in summary:
-                        relevance_score += 1
-                
-                if relevance_score > 0:
-                    results.append({
-                        "category": category,
-                        "title": category_data.get("title", ""),
-                        "summary": category_data.get("summary", ""),
-                        "relevance_score": relevance_score,
-                        "content_preview": content[:300] + "..." if len(content) > 300 else content,
-                        "key_points": category_data.get("key_points", [])
-                    })
-            
-            results.sort(key=lambda x: x["relevance_score"], reverse=True)
+                category_data = handbook_data.get(category) or {}
+                results.append({
+                    "category": category,
+                    "title": category_data.get("title", ""),
+                    "summary": category_data.get("summary", ""),
+                    "relevance_score": hit["score"],
+                    "content_preview": hit["snippet"],
+                    "key_points": category_data.get("key_points", [])
+                })
+            
             return results
             
         except Exception as e:
             logger.error(f"Error searching handbook content: {e}")
             return []
     
+    def build_section_chunks(self, sections: Dict) -> List[Tuple[str, str]]:
+        """Split each section's content into (section, chunk text) pairs for embedding."""
+        chunks = []
+        for category, category_data in sections.items():
+            content = (category_data or {}).get("content") or ""
+            if not content:
+                continue
+            
+            if self.content_extractor:
+                texts = self.content_extractor.extract_chunks(content)
+            else:
+                texts = split_passages(content)
+            chunks.extend((category, text) for text in texts if text.strip())
+        
+        return chunks
+    
+    def search_handbook_sections(self, user_id: str, academic_id: str, query: str,
+                                 limit: int = 5) -> List[Dict]:
+        """Rank a user's handbook sections with Postgres full-text search.
+        
+        Ranking and snippet extraction run in the database
+        (search_handbook_sections), so only the top matches are returned.
+        """
+        try:
+            response = self.supabase.table("user_handbooks").select("content_hash").eq(
+                "user_id", user_id
+            ).eq("academic_id", academic_id).eq("processing_status", "completed").execute()
+            
+            content_hashes = sorted({row["content_hash"] for row in response.data or [] if row.get("content_hash")})
+            if not content_hashes:
+                return []
+            
+            response = self.supabase.rpc("search_handbook_sections", {
+                "content_hashes": content_hashes,
+                "search_query": query,
+                "match_limit": limit
+            }).execute()
+            
+            return [
+                {
+                    "category": row["section"],
+                    "title": self.format_category_title(row["section"]),
+                    "relevance_score": row["rank"],
+                    "snippet": row["snippet"]
+                }
+                for row in response.data or []
+            ]
+            
+        except Exception as e:
+            logger.error(f"Error running handbook full-text search: {e}")
+            return []
+    
+    def get_search_index(self, handbook_data: Dict) -> HandbookSearchIndex:
+        """Load the stored search index for a handbook row, building one if none is stored."""
+        content_hash = handbook_data.get("content_hash")
+        if content_hash:
+            try:
+                response = self.supabase.table("handbook_contents").select("search_index").eq(
+                    "content_hash", content_hash
+                ).limit(1).execute()
+                
+                if response.data:
+                    index = HandbookSearchIndex.from_dict(response.data[0].get("search_index"))
+                    if index is not None:
+                        return index
+                    
+            except Exception as e:
+                logger.warning(f"Error loading search index, rebuilding: {e}")
+        
+        return HandbookSearchIndex.build({category: handbook_data.get(category) for category in HANDBOOK_SECTIONS})
+    
     def get_handbook_section(self, user_id: str, academic_id: str, category: str) -> Optional[Dict]:
         """Get specific handbook section."""
         try:
@@ -250,10 +550,11 @@ class HandbookDatabaseUpdater:
             logger.error(f"Error fetching handbook section: {e}")
             return None
     
-    def get_processing_status(self, user_id: str, academic_id: str) -> Dict:
+    async def get_processing_status(self, user_id: str, academic_id: str) -> Dict:
         """Get current processing status for user's handbook."""
         try:
-            response = self.supabase.table("user_handbooks").select(
+            client = await get_async_supabase()
+            response = await client.table("user_handbooks").select(
                 "handbook_id, processing_status, upload_date, processed_date, processing_started_at, error_message, original_filename"
             ).eq("user_id", user_id).eq("academic_id", academic_id).order("upload_date", desc=True).limit(1).execute()
             
@@ -344,10 +645,11 @@ class HandbookDatabaseUpdater:
             logger.error(f"Error getting handbook statistics: {e}")
             return {"status": "error", "error": str(e)}
     
-    def validate_database_connection(self) -> bool:
+    async def validate_database_connection(self) -> bool:
         """Validate database connection and required tables."""
         try:
-            response = self.supabase.table("user_handbooks").select("handbook_id").limit(1).execute()
+            client = await get_async_supabase()
+            response = await client.table("user_handbooks").select("handbook_id").limit(1).execute()
             logger.info("Database connection validated successfully")
             return True
             
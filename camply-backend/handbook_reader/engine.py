@@ -0,0 +1,109 @@
+"""Lazily loaded handbook processing components for the bridge service."""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class HandbookEngine:
+    """Handbook processing components, imported and built on first use.
+
+    Importing PyMuPDF and building the extractor (which loads spaCy for
+    sentence segmentation) takes far longer than the rest of startup, so the
+    bridge creates the engine cold and warms it in the background once it is
+    serving chat. Endpoints and job workers that need a component before
+    warm-up finishes load it themselves; loading happens once and is safe to
+    request from several threads.
+    """
+
+    def __init__(self):
+        self.content_extractor = None
+        self.json_generator = None
+        self.database_updater = None
+        self.result_cache = None
+        self.state = "cold"
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_warm(self) -> bool:
+        return self.state == "warm"
+
+    def load(self) -> "HandbookEngine":
+        """Import and build every component (blocking), then warm the sentence segmenter.
+
+        Raises:
+            ImportError: If a processing dependency (e.g. PyMuPDF) is missing
+        """
+        if self.state == "warm":
+            return self
+
+        with self._lock:
+            if self.state == "warm":
+                return self
+            if self.state == "unavailable":
+                raise ImportError(self.error)
+
+            self.state = "warming"
+            started = time.perf_counter()
+            try:
+                from . import pdf_processor  # noqa: F401 - imports PyMuPDF
+                from .content_extractor import ContentExtractor
+                from .json_generator import HandbookJSONGenerator
+                from .database_updater import HandbookDatabaseUpdater
+                from .result_cache import HandbookResultCache
+
+                content_extractor = ContentExtractor()
+                content_extractor.segmenter.split("Warm up the sentence segmenter. It loads on first use.")
+
+                self.json_generator = HandbookJSONGenerator()
+                self.database_updater = HandbookDatabaseUpdater(content_extractor)
+                self.result_cache = HandbookResultCache()
+                self.content_extractor = content_extractor
+            except ImportError as e:
+                self.state = "unavailable"
+                self.error = str(e)
+                logger.error(f"Handbook processing unavailable: {e}")
+                raise
+            except Exception as e:
+                # Retried on the next load() call
+                self.state = "cold"
+                self.error = str(e)
+                raise
+
+            self.error = None
+            self.load_seconds = time.perf_counter() - started
+            self.state = "warm"
+            logger.info(f"Handbook engine warm in {self.load_seconds:.2f}s")
+            return self
+
+    async def ensure_loaded(self) -> "HandbookEngine":
+        """Load the engine on a worker thread if it is not warm yet."""
+        if self.state == "warm":
+            return self
+        return await asyncio.to_thread(self.load)
+
+    async def warm_up(self):
+        """Background warm-up task: load the engine and check the database connection."""
+        try:
+            await self.ensure_loaded()
+        except Exception as e:
+            print(f"Handbook engine warm-up failed: {e}")
+            return
+
+        if await self.database_updater.validate_database_connection():
+            print("Handbook database connection validated")
+        else:
+            print("WARNING: Handbook database connection failed")
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get the warm-up state for readiness checks."""
+        return {
+            "state": self.state,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "error": self.error
+        }
@@ -0,0 +1,163 @@
+"""Incremental re-categorization of revised handbooks."""
+
+import difflib
+import hashlib
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .config import HandbookConfig
+from .content_extractor import CategoryMatch, ContentExtractor, TextChunk
+from .pdf_processor import page_text_hash
+from shared.database import handbook_section_hash
+
+logger = logging.getLogger(__name__)
+
+def chunk_key(chunk: TextChunk) -> str:
+    """Hash of everything a chunk's category matches depend on (its text and overlap)."""
+    return hashlib.blake2b(
+        (chunk.overlap + "\x00" + chunk.text).encode("utf-8"), digest_size=16
+    ).hexdigest()
+
+class IncrementalCategorizer:
+    """Categorize a handbook's pages, reusing the work of its previous run.
+
+    The page index saved after each run holds the hash of every page's
+    cleaned text, the category matches and sentence count of every chunk,
+    and the section_hash of every section. On the next run the pages are
+    diffed against the saved hashes; the document is re-chunked (which is
+    cheap) and only chunks that were not seen before, i.e. those touching a
+    changed page, are scored and segmented. The result is identical to
+    ContentExtractor.extract_categorized_content_from_pages.
+
+    Reuse is decided per chunk (see chunk_key), not per page: the page
+    hashes and their diff only feed the changed/removed page counts in
+    stats, which are logged. Only the streaming pipeline
+    (HandbookConfig.STREAMING_PIPELINE) categorizes through this class;
+    extract_all_content() runs never read or save a page index.
+
+    A page index from a different pipeline version is ignored.
+    """
+
+    def __init__(self, content_extractor: ContentExtractor, page_index: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            content_extractor: Extractor used for chunking and scoring
+            page_index: Page index saved by the previous run (see get_page_index)
+        """
+        self.content_extractor = content_extractor
+        self.pipeline_version = HandbookConfig.get_pipeline_version()
+
+        if page_index and page_index.get("pipeline_version") != self.pipeline_version:
+            logger.info("Ignoring page index from another pipeline version")
+            page_index = None
+        self.previous = page_index or {}
+
+        self._previous_chunks: Dict[str, List] = self.previous.get("chunks", {})
+        self._chunks: Dict[str, List] = {}
+        self._page_hashes: List[str] = []
+        self.stats = {
+            "incremental": bool(self.previous),
+            "pages": 0,
+            "changed_pages": 0,
+            "removed_pages": 0,
+            "chunks": 0,
+            "rescored_chunks": 0
+        }
+
+    def categorize_pages(self, pages: Iterable[str]) -> Dict[str, Dict]:
+        """Categorize cleaned page texts, consuming them one at a time.
+
+        Args:
+            pages: Cleaned, structure-preserving page texts in page order
+
+        Returns:
+            Categorized content, as ContentExtractor.categorize_chunks returns it
+        """
+        paragraphs = (paragraph for page in self._hash_pages(pages) for paragraph in page.split('\n\n'))
+        categorized_content = self.content_extractor.categorize_chunks(
+            self.content_extractor.iter_chunks(paragraphs),
+            analyze_batch=self._analyze_batch
+        )
+
+        self._diff_pages()
+        logger.info(
+            f"Incremental categorization: {self.stats['changed_pages']}/{self.stats['pages']} pages changed, "
+            f"{self.stats['rescored_chunks']}/{self.stats['chunks']} chunks scored"
+        )
+        return categorized_content
+
+    def get_page_index(self, database_format: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the page index to save for the next run of this handbook.
+
+        Args:
+            database_format: The run's output from HandbookJSONGenerator.format_for_database
+        """
+        return {
+            "pipeline_version": self.pipeline_version,
+            "pages": self._page_hashes,
+            "chunks": self._chunks,
+            "sections": {
+                category: handbook_section_hash(database_format.get(category))
+                for category in self.content_extractor.categories
+            }
+        }
+
+    def changed_sections(self, database_format: Dict[str, Any]) -> List[str]:
+        """Get the sections whose stored JSON (any field) differs from the previous run."""
+        previous_sections = self.previous.get("sections", {})
+        return [
+            category for category in self.content_extractor.categories
+            if handbook_section_hash(database_format.get(category))
+            != previous_sections.get(category, "")
+        ]
+
+    def _hash_pages(self, pages: Iterable[str]) -> Iterator[str]:
+        for page in pages:
+            self._page_hashes.append(page_text_hash(page))
+            yield page
+
+    def _diff_pages(self):
+        """Count the pages that are new or changed since the previous run (for stats only)."""
+        self.stats["pages"] = len(self._page_hashes)
+        if not self.previous:
+            self.stats["changed_pages"] = len(self._page_hashes)
+            return
+
+        matcher = difflib.SequenceMatcher(None, self.previous.get("pages", []), self._page_hashes, autojunk=False)
+        for tag, old_start, old_end, new_start, new_end in matcher.get_opcodes():
+            if tag != "equal":
+                self.stats["changed_pages"] += new_end - new_start
+                self.stats["removed_pages"] += max(0, (old_end - old_start) - (new_end - new_start))
+
+    def _analyze_batch(self, chunks: List[TextChunk]) -> List[Tuple[List[CategoryMatch], int]]:
+        """Reuse the saved results of chunks seen in the previous run and analyze the rest."""
+        keys = [chunk_key(chunk) for chunk in chunks]
+        missing = [index for index, key in enumerate(keys) if key not in self._previous_chunks]
+        analyzed = dict(zip(missing, self.content_extractor.analyze_chunk_batch([chunks[index] for index in missing])))
+
+        results = []
+        for index, (chunk, key) in enumerate(zip(chunks, keys)):
+            if index in analyzed:
+                matches, sentences = analyzed[index]
+                self._chunks[key] = [
+                    [[match.category, match.confidence, match.keyword_matches] for match in matches],
+                    sentences
+                ]
+            else:
+                self._chunks[key] = self._previous_chunks[key]
+                saved_matches, sentences = self._chunks[key]
+                matches = [
+                    CategoryMatch(
+                        category=category,
+                        content=chunk.text,
+                        confidence=confidence,
+                        keyword_matches=keyword_matches,
+                        context=chunk.text[:200] + "..." if len(chunk.text) > 200 else chunk.text
+                    )
+                    for category, confidence, keyword_matches in saved_matches
+                ]
+            results.append((matches, sentences))
+
+        self.stats["chunks"] += len(chunks)
+        self.stats["rescored_chunks"] += len(missing)
+        return results
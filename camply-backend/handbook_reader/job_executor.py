@@ -0,0 +1,221 @@
+"""Bounded job executor that keeps handbook processing off the FastAPI event loop."""
+
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from .config import HandbookConfig
+
+logger = logging.getLogger(__name__)
+
+FailureCallback = Callable[[str, str], Any]
+
+_job_state = threading.local()
+
+class JobCancelled(Exception):
+    """Raised inside a job whose executor has cancelled it (on timeout or shutdown)."""
+
+def raise_if_cancelled():
+    """Raise JobCancelled if the job running on this thread has been cancelled.
+
+    Threads cannot be interrupted, so long-running jobs call this between
+    steps to give their pool slot back. Outside the executor it does nothing.
+    """
+    cancel_event = getattr(_job_state, "cancel_event", None)
+    if cancel_event is not None and cancel_event.is_set():
+        raise JobCancelled("Job was cancelled")
+
+def cancellable(items: Iterable) -> Iterator:
+    """Yield items, checking for cancellation before each one."""
+    for item in items:
+        raise_if_cancelled()
+        yield item
+
+class HandbookJobExecutor:
+    """Queue handbook jobs and run them on a bounded thread pool with per-job timeouts.
+
+    Each worker task owns one pool thread and waits for its job's thread to
+    finish, even after a timeout, so a job never waits behind another in the
+    pool and stays registered (and cannot be queued again) until it has
+    really stopped. Jobs should raise on failure and call raise_if_cancelled()
+    between steps.
+    """
+
+    def __init__(self, max_concurrency: int = None, max_queue_size: int = None,
+                 job_timeout: float = None, on_failure: Optional[FailureCallback] = None):
+        """Initialize the executor.
+
+        Args:
+            max_concurrency: Number of jobs allowed to run at the same time
+            max_queue_size: Number of jobs allowed to wait in the queue
+            job_timeout: Seconds a single job may run before it is marked failed
+            on_failure: Blocking callback invoked as on_failure(job_id, message)
+                when a job times out or raises
+        """
+        self.max_concurrency = max_concurrency or HandbookConfig.JOB_CONCURRENCY
+        self.max_queue_size = max_queue_size or HandbookConfig.JOB_QUEUE_SIZE
+        self.job_timeout = job_timeout or HandbookConfig.JOB_TIMEOUT_SECONDS
+        self.on_failure = on_failure
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._workers = []
+        self._active_jobs: Dict[str, str] = {}
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self.stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0
+        }
+
+    async def start(self):
+        """Create the queue, thread pool and worker tasks."""
+        if self._workers:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="handbook-job"
+        )
+        self._workers = [
+            asyncio.create_task(self._worker_loop(i))
+            for i in range(self.max_concurrency)
+        ]
+        logger.info(
+            f"Handbook job executor started: concurrency={self.max_concurrency}, "
+            f"queue={self.max_queue_size}, timeout={self.job_timeout}s"
+        )
+
+    async def shutdown(self):
+        """Cancel workers and running jobs, and release the thread pool without waiting for them."""
+        for cancel_event in self._cancel_events.values():
+            cancel_event.set()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+        logger.info("Handbook job executor stopped")
+
+    def submit(self, job_id: str, func: Callable[..., Any], *args) -> bool:
+        """Enqueue a blocking job without waiting for it.
+
+        Returns:
+            True if the job was queued (or is already queued/running), False if
+            the executor is not running or the queue is full
+        """
+        if self._queue is None:
+            logger.error("Handbook job executor is not running")
+            return False
+
+        if job_id in self._active_jobs:
+            logger.info(f"Job {job_id} is already {self._active_jobs[job_id]}")
+            return True
+
+        try:
+            self._queue.put_nowait((job_id, func, args))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            logger.warning(f"Handbook job queue full, rejected job {job_id}")
+            return False
+
+        self._active_jobs[job_id] = "queued"
+        self.stats["submitted"] += 1
+        return True
+
+    def get_job_state(self, job_id: str) -> Optional[str]:
+        """Get 'queued', 'running' or 'cancelling' for a known job, None otherwise."""
+        return self._active_jobs.get(job_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue depth, running job count and lifetime counters."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue_size": self.max_queue_size,
+            "job_timeout_seconds": self.job_timeout,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": sum(1 for state in self._active_jobs.values() if state != "queued"),
+            **self.stats
+        }
+
+    async def _worker_loop(self, worker_index: int):
+        """Pull jobs off the queue and run them one at a time."""
+        while True:
+            job_id, func, args = await self._queue.get()
+            try:
+                await self._run_job(job_id, func, args)
+            finally:
+                self._active_jobs.pop(job_id, None)
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str, func: Callable[..., Any], args: Tuple):
+        """Run a single job on the thread pool, enforcing the per-job timeout.
+
+        On timeout the job is cancelled and reported failed at once, but the
+        worker keeps waiting until the job's thread stops at its next
+        raise_if_cancelled() check.
+        """
+        loop = asyncio.get_running_loop()
+        self._active_jobs[job_id] = "running"
+        cancel_event = threading.Event()
+        self._cancel_events[job_id] = cancel_event
+        started = time.perf_counter()
+        future = loop.run_in_executor(self._pool, self._call_job, func, args, cancel_event)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.job_timeout)
+            self.stats["completed"] += 1
+            logger.info(f"Job {job_id} finished in {time.perf_counter() - started:.1f}s")
+
+        except asyncio.TimeoutError:
+            cancel_event.set()
+            self._active_jobs[job_id] = "cancelling"
+            self.stats["timed_out"] += 1
+            message = f"Processing timed out after {self.job_timeout:.0f} seconds"
+            logger.error(f"Job {job_id}: {message}")
+            await self._report_failure(job_id, message)
+
+            try:
+                await future
+                logger.warning(f"Job {job_id} finished {time.perf_counter() - started:.1f}s after it was cancelled")
+            except JobCancelled:
+                logger.info(f"Job {job_id} stopped {time.perf_counter() - started:.1f}s after it was cancelled")
+            except Exception as e:
+                logger.error(f"Job {job_id} failed after it was cancelled: {e}")
+
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.error(f"Job {job_id} failed: {e}")
+            await self._report_failure(job_id, str(e))
+
+        finally:
+            self._cancel_events.pop(job_id, None)
+
+    @staticmethod
+    def _call_job(func: Callable[..., Any], args: Tuple, cancel_event: threading.Event):
+        """Run a job on a pool thread with its cancellation flag visible to raise_if_cancelled()."""
+        _job_state.cancel_event = cancel_event
+        try:
+            return func(*args)
+        finally:
+            _job_state.cancel_event = None
+
+    async def _report_failure(self, job_id: str, message: str):
+        """Invoke the failure callback off the event loop."""
+        if not self.on_failure:
+            return
+
+        try:
+            await asyncio.to_thread(self.on_failure, job_id, message)
+        except Exception as e:
+            logger.error(f"Failure callback for job {job_id} raised: {e}")
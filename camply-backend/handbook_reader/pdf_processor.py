@@ -1,9 +1,13 @@
 """Core PDF processing using PyMuPDF for handbook text extraction."""
 
 import pymupdf
+import hashlib
 import logging
+import multiprocessing
+import os
 import re
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 from pathlib import Path
 from dataclasses import dataclass
 from .config import HandbookConfig
@@ -11,6 +15,16 @@ from .config import HandbookConfig
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PARAGRAPH_BREAK = re.compile(r'\n[^\S\n]*\n')
+WHITESPACE = re.compile(r'\s+')
+
+# Default dict flags minus image decoding; only text blocks are read
+TEXT_DICT_FLAGS = pymupdf.TEXTFLAGS_DICT & ~pymupdf.TEXT_PRESERVE_IMAGES
+
+# Extraction workers start from a clean interpreter rather than a fork of the
+# server process, which holds threads (job executor, event loop) and sockets
+EXTRACTION_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
 @dataclass
 class PageContent:
     """Structure for page content data."""
@@ -43,6 +57,7 @@ class HandbookProcessor:
         self.doc = None
         self.metadata = None
         self.pages_content = []
+        self.stream_stats = {}
         
         if not self.pdf_path.exists():
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
@@ -83,22 +98,29 @@ class HandbookProcessor:
         return self.metadata
     
     def extract_text_from_page(self, page) -> Tuple[str, List[str]]:
-        """Extract text and headers from a single page."""
-        text = page.get_text()
+        """Extract text and headers from a single page.
         
+        Text is rebuilt from the same layout pass used for headers: lines of a
+        block are joined with newlines and blocks are separated by a blank
+        line, so paragraph boundaries survive into clean_text.
+        """
         headers = []
-        blocks = page.get_text("dict")["blocks"]
+        block_texts = []
+        blocks = page.get_text("dict", flags=TEXT_DICT_FLAGS)["blocks"]
         
         for block in blocks:
             if "lines" in block:
+                line_texts = []
                 for line in block["lines"]:
+                    line_texts.append("".join(span["text"] for span in line["spans"]))
                     for span in line["spans"]:
                         if span["size"] > 12 and span["flags"] & 2**4:  
                             header_text = span["text"].strip()
                             if len(header_text) > 3 and header_text not in headers:
                                 headers.append(header_text)
+                block_texts.append("\n".join(line_texts))
         
-        return text, headers
+        return "\n\n".join(block_texts), headers
     
     def extract_tables_from_page(self, page) -> List[Dict]:
         """Extract tables from a page."""
@@ -174,36 +196,34 @@ class HandbookProcessor:
             metadata=metadata
         )
     
-    def extract_all_content(self) -> Dict:
-        """Extract content from all pages."""
+    def extract_all_content(self, workers: Optional[int] = None) -> Dict:
+        """Extract content from all pages.
+        
+        Args:
+            workers: Number of worker processes for page extraction. Defaults to
+                HandbookConfig.EXTRACTION_WORKERS; 1 extracts serially.
+        """
         if not self.doc:
             if not self.open_document():
                 raise ValueError("Failed to open document")
         
         doc_metadata = self.extract_metadata()
+        page_count = len(self.doc)
+        workers = resolve_worker_count(workers, page_count)
         
-        all_content = []
-        total_text = ""
-        all_headers = []
-        all_tables = []
+        logger.info(f"Processing {page_count} pages with {workers} worker(s)...")
         
-        logger.info(f"Processing {len(self.doc)} pages...")
+        if workers > 1:
+            all_content = self._extract_pages_parallel(page_count, workers)
+        else:
+            all_content = self._extract_pages_serial(page_count)
         
-        for page_num in range(len(self.doc)):
-            try:
-                page_content = self.process_page(page_num)
-                all_content.append(page_content)
-                
-                total_text += page_content.text + "\n"
-                all_headers.extend(page_content.headers)
-                all_tables.extend(page_content.tables)
-                
-                if (page_num + 1) % 10 == 0:
-                    logger.info(f"Processed {page_num + 1}/{len(self.doc)} pages")
-                    
-            except Exception as e:
-                logger.error(f"Failed to process page {page_num + 1}: {e}")
-                continue
+        total_text = "\n\n".join(page_content.text for page_content in all_content)
+        all_headers = []
+        all_tables = []
+        for page_content in all_content:
+            all_headers.extend(page_content.headers)
+            all_tables.extend(page_content.tables)
         
         total_text = self.clean_text(total_text)
         
@@ -218,18 +238,120 @@ class HandbookProcessor:
             "pages": all_content,
             "processing_stats": {
                 "processed_pages": len(all_content),
-                "total_pages": len(self.doc),
-                "success_rate": len(all_content) / len(self.doc) * 100
+                "total_pages": page_count,
+                "success_rate": len(all_content) / page_count * 100,
+                "workers": workers
             }
         }
     
-    def clean_text(self, text: str) -> str:
-        """Clean and normalize extracted text."""
-        text = re.sub(r'\s+', ' ', text)
+    def iter_page_texts(self) -> Iterator[str]:
+        """Yield each page's cleaned, structure-preserving text in page order.
+        
+        Only text is extracted (no tables or images) and nothing is kept
+        between pages. Page and word counts are tallied in self.stream_stats
+        as pages are consumed. Joining the yielded pages with blank lines
+        gives the same text as extract_all_content()["total_text"] with
+        PRESERVE_STRUCTURE enabled.
+        """
+        if not self.doc:
+            if not self.open_document():
+                raise ValueError("Failed to open document")
+        
+        page_count = len(self.doc)
+        self.stream_stats = {
+            "total_pages": 0,
+            "total_words": 0,
+            "page_count": page_count
+        }
+        
+        for page_num in range(page_count):
+            try:
+                text, _ = self.extract_text_from_page(self.doc[page_num])
+            except Exception as e:
+                logger.error(f"Failed to process page {page_num + 1}: {e}")
+                continue
+            
+            self.stream_stats["total_pages"] += 1
+            if (page_num + 1) % 10 == 0:
+                logger.info(f"Processed {page_num + 1}/{page_count} pages")
+            
+            text = self.clean_text(text, preserve_structure=True)
+            if text:
+                self.stream_stats["total_words"] += len(text.split())
+                yield text
+    
+    def _extract_pages_serial(self, page_count: int, start: int = 0, end: Optional[int] = None) -> List[PageContent]:
+        """Process the pages in [start, end) (all by default) in order on the current process."""
+        all_content = []
+        
+        for page_num in range(start, page_count if end is None else end):
+            try:
+                all_content.append(self.process_page(page_num))
+                
+                if (page_num + 1) % 10 == 0:
+                    logger.info(f"Processed {page_num + 1}/{page_count} pages")
+                    
+            except Exception as e:
+                logger.error(f"Failed to process page {page_num + 1}: {e}")
+                continue
+        
+        return all_content
+    
+    def _extract_pages_parallel(self, page_count: int, workers: int) -> List[PageContent]:
+        """Split the page range across worker processes and merge results in page order.
+        
+        A range whose worker fails (or dies, breaking the pool) is processed
+        again serially on this process, so no pages are silently dropped.
+        """
+        page_ranges = split_page_range(page_count, workers)
+        all_content = []
+        
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context(EXTRACTION_START_METHOD)
+        ) as executor:
+            futures = [
+                executor.submit(_extract_page_range, str(self.pdf_path), start, end)
+                for start, end in page_ranges
+            ]
+            
+            for future, (start, end) in zip(futures, page_ranges):
+                try:
+                    all_content.extend(future.result())
+                    logger.info(f"Processed pages {start + 1}-{end}/{page_count}")
+                except Exception as e:
+                    logger.warning(f"Worker failed on pages {start + 1}-{end} ({e}); retrying serially")
+                    all_content.extend(self._extract_pages_serial(page_count, start, end))
         
-        text = re.sub(r'\b\d+\s*$', '', text, flags=re.MULTILINE)
+        return all_content
+    
+    def clean_text(self, text: str, preserve_structure: Optional[bool] = None) -> str:
+        """Clean and normalize extracted text.
         
-        text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)
+        Args:
+            text: Raw page text joined across pages
+            preserve_structure: Keep paragraphs (and so pages) separated by a
+                blank line, with wrapped lines inside a paragraph joined by
+                spaces and bare page-number paragraphs dropped. False collapses
+                all whitespace into a single line. Defaults to
+                HandbookConfig.PRESERVE_STRUCTURE.
+        """
+        if preserve_structure is None:
+            preserve_structure = HandbookConfig.PRESERVE_STRUCTURE
+        
+        if preserve_structure:
+            paragraphs = []
+            for paragraph in PARAGRAPH_BREAK.split(text):
+                paragraph = WHITESPACE.sub(' ', paragraph).strip()
+                if paragraph and not paragraph.isdigit():
+                    paragraphs.append(paragraph)
+            text = '\n\n'.join(paragraphs)
+        else:
+            text = re.sub(r'\s+', ' ', text)
+            
+            text = re.sub(r'\b\d+\s*$', '', text, flags=re.MULTILINE)
+            
+            text = re.sub(r'\n\s*\n\s*\n', '\n\n', text)
         
         text = text.replace('|', 'l')  
         text = text.replace('0', 'O')  
@@ -269,6 +391,54 @@ class HandbookProcessor:
             self.doc.close()
             self.doc = None
 
+def page_text_hash(text: str) -> str:
+    """Hash of a page's cleaned text, used to find the pages that changed between handbook versions."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+def resolve_worker_count(workers: Optional[int], page_count: int) -> int:
+    """Resolve the number of extraction workers to use for a document."""
+    if workers is None:
+        workers = HandbookConfig.EXTRACTION_WORKERS
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    
+    if page_count < HandbookConfig.PARALLEL_MIN_PAGES:
+        return 1
+    
+    return max(1, min(workers, page_count))
+
+def split_page_range(page_count: int, parts: int) -> List[Tuple[int, int]]:
+    """Split [0, page_count) into contiguous (start, end) ranges of near-equal size."""
+    parts = max(1, min(parts, page_count))
+    base, extra = divmod(page_count, parts)
+    
+    ranges = []
+    start = 0
+    for i in range(parts):
+        end = start + base + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+    
+    return ranges
+
+def _extract_page_range(pdf_path: str, start: int, end: int) -> List[PageContent]:
+    """Worker entry point: open a private document handle and process a page range."""
+    processor = HandbookProcessor(pdf_path)
+    if not processor.open_document():
+        raise ValueError(f"Failed to open document in worker: {pdf_path}")
+    
+    pages = []
+    try:
+        for page_num in range(start, end):
+            try:
+                pages.append(processor.process_page(page_num))
+            except Exception as e:
+                logger.error(f"Failed to process page {page_num + 1}: {e}")
+    finally:
+        processor.close()
+    
+    return pages
+
 def validate_pdf(pdf_path: str) -> bool:
     """Validate if file is a readable PDF."""
     try:
@@ -0,0 +1,232 @@
+"""Content-addressed cache of processed handbook results."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import sys
+sys.path.append(str(Path(__file__).parent.parent))
+from shared.database import get_supabase
+
+from .config import HandbookConfig
+
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+class HandbookResultCache:
+    """Reuse processed output for byte-identical PDFs.
+
+    Results are keyed by the SHA-256 of the PDF bytes and the pipeline
+    version, so a settings or code change never serves stale output. Lookups
+    go to a size-bounded local directory first and then to an optional shared
+    Supabase table that other backend instances also write to.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None,
+                 table_name: str = None, pipeline_version: str = None):
+        """Initialize the cache.
+
+        Args:
+            cache_dir: Directory for the local store
+            max_bytes: Local store size limit; entries are evicted least recently
+                used first (0 disables the local store)
+            table_name: Shared Supabase table ("" disables the shared store)
+            pipeline_version: Version recorded with every entry
+        """
+        self.pipeline_version = pipeline_version or HandbookConfig.get_pipeline_version()
+        self.max_bytes = int(
+            HandbookConfig.RESULT_CACHE_MAX_MB * 1024 * 1024 if max_bytes is None else max_bytes
+        )
+        self.table_name = HandbookConfig.RESULT_CACHE_TABLE if table_name is None else table_name
+        self.cache_dir = Path(cache_dir or HandbookConfig.RESULT_CACHE_DIR) / self.pipeline_version
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._size_bytes = 0
+        self.stats = {
+            "local_hits": 0,
+            "shared_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "errors": 0
+        }
+
+        if self.max_bytes > 0:
+            self._load_local_entries()
+
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        """Get the SHA-256 hex digest of a file without reading it into memory at once."""
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def get(self, pdf_hash: str) -> Optional[Dict]:
+        """Get the cached database format for a PDF hash, or None on a miss."""
+        result = self._get_local(pdf_hash)
+        if result is not None:
+            self._count("local_hits")
+            return result
+
+        result = self._get_shared(pdf_hash)
+        if result is not None:
+            self._count("shared_hits")
+            self._put_local(pdf_hash, result)
+            return result
+
+        self._count("misses")
+        return None
+
+    def put(self, pdf_hash: str, database_format: Dict) -> None:
+        """Store a processed result locally and in the shared table."""
+        self._put_local(pdf_hash, database_format)
+        self._put_shared(pdf_hash, database_format)
+        self._count("stores")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and local store usage."""
+        with self._lock:
+            hits = self.stats["local_hits"] + self.stats["shared_hits"]
+            lookups = hits + self.stats["misses"]
+            return {
+                "pipeline_version": self.pipeline_version,
+                "local_enabled": self.max_bytes > 0,
+                "shared_table": self.table_name or None,
+                "entries": len(self._entries),
+                "size_bytes": self._size_bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                **self.stats
+            }
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _entry_path(self, pdf_hash: str) -> Path:
+        return self.cache_dir / f"{pdf_hash}.json"
+
+    def _load_local_entries(self):
+        """Index existing entries from disk, oldest access first."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            files = []
+            for path in self.cache_dir.glob("*.json"):
+                stat = path.stat()
+                files.append((stat.st_mtime, path.stem, stat.st_size))
+        except OSError as e:
+            logger.warning(f"Handbook result cache directory unavailable, local store disabled: {e}")
+            self.max_bytes = 0
+            return
+
+        for _, pdf_hash, size in sorted(files):
+            self._entries[pdf_hash] = size
+            self._size_bytes += size
+
+        with self._lock:
+            self._evict()
+        logger.info(f"Handbook result cache: {len(self._entries)} local entries in {self.cache_dir}")
+
+    def _get_local(self, pdf_hash: str) -> Optional[Dict]:
+        if self.max_bytes <= 0:
+            return None
+
+        with self._lock:
+            if pdf_hash not in self._entries:
+                return None
+            self._entries.move_to_end(pdf_hash)
+
+        path = self._entry_path(pdf_hash)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+            os.utime(path)
+            return result
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable cache entry {pdf_hash}: {e}")
+            self._remove_local(pdf_hash)
+            return None
+
+    def _put_local(self, pdf_hash: str, database_format: Dict):
+        if self.max_bytes <= 0:
+            return
+
+        path = self._entry_path(pdf_hash)
+        try:
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(database_format, f)
+            os.replace(temp_path, path)
+            size = path.stat().st_size
+        except OSError as e:
+            logger.warning(f"Failed to write cache entry {pdf_hash}: {e}")
+            self._count("errors")
+            if "temp_path" in locals():
+                Path(temp_path).unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self._size_bytes += size - self._entries.pop(pdf_hash, 0)
+            self._entries[pdf_hash] = size
+            self._evict()
+
+    def _remove_local(self, pdf_hash: str):
+        with self._lock:
+            self._size_bytes -= self._entries.pop(pdf_hash, 0)
+        self._entry_path(pdf_hash).unlink(missing_ok=True)
+
+    def _evict(self):
+        """Drop least recently used entries until the store fits. Caller holds the lock."""
+        while self._entries and self._size_bytes > self.max_bytes:
+            pdf_hash, size = self._entries.popitem(last=False)
+            self._size_bytes -= size
+            self.stats["evictions"] += 1
+            try:
+                self._entry_path(pdf_hash).unlink(missing_ok=True)
+            except OSError as e:
+                logger.warning(f"Failed to evict cache entry {pdf_hash}: {e}")
+
+    def _get_shared(self, pdf_hash: str) -> Optional[Dict]:
+        if not self.table_name:
+            return None
+
+        try:
+            response = get_supabase().table(self.table_name).select("database_format").eq(
+                "pdf_hash", pdf_hash
+            ).eq("pipeline_version", self.pipeline_version).limit(1).execute()
+
+            if response.data:
+                return response.data[0]["database_format"]
+            return None
+
+        except Exception as e:
+            logger.warning(f"Shared handbook result cache lookup failed: {e}")
+            self._count("errors")
+            return None
+
+    def _put_shared(self, pdf_hash: str, database_format: Dict):
+        if not self.table_name:
+            return
+
+        try:
+            get_supabase().table(self.table_name).upsert({
+                "pdf_hash": pdf_hash,
+                "pipeline_version": self.pipeline_version,
+                "database_format": database_format,
+                "created_at": datetime.utcnow().isoformat()
+            }, on_conflict="pdf_hash,pipeline_version").execute()
+
+        except Exception as e:
+            logger.warning(f"Shared handbook result cache store failed: {e}")
+            self._count("errors")
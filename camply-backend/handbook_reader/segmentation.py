@@ -0,0 +1,220 @@
+"""Sentence segmentation for handbook content."""
+
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from typing import Iterable, List, Optional
+
+from .config import HandbookConfig
+
+logger = logging.getLogger(__name__)
+
+# Rule-based fallback: sentence-ending punctuation followed by whitespace, or a blank line
+RULE_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+|\n\s*\n')
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+# Paragraphs are grouped into documents of about this size for nlp.pipe, which
+# keeps per-document overhead low and every document far below spaCy's max_length
+BLOCK_CHARS = 20_000
+
+class SentenceSegmenter:
+    """Split text into sentences, loading spaCy once with sentence boundaries only.
+
+    With the "spacy" mode, the configured model is loaded on first use with
+    every component except its statistical sentence recognizer ("senter")
+    excluded, so no tagging, parsing or NER is run. If the model is not
+    installed a blank English pipeline with the rule-based "sentencizer" is
+    used, and if spaCy itself is missing (or the mode is "rules") sentences
+    are split with a regular expression.
+
+    Paragraphs are grouped into blocks that are streamed through nlp.pipe in
+    batches (optionally across processes); a blank line always ends a
+    sentence. Results are memoized by text hash, so content that is segmented
+    more than once (for example while scoring categories) is only processed
+    once. Instances are safe to share between processing threads.
+    """
+
+    def __init__(self, mode: str = None, model_name: str = None, batch_size: int = None,
+                 n_process: int = None, cache_size: int = None):
+        """
+        Args:
+            mode: "spacy" or "rules" (defaults to HandbookConfig.SENTENCE_SEGMENTER)
+            model_name: spaCy model to take the sentence recognizer from
+            batch_size: Blocks per nlp.pipe batch
+            n_process: Processes used by nlp.pipe
+            cache_size: Number of segmented texts to memoize
+        """
+        self.mode = (mode or HandbookConfig.SENTENCE_SEGMENTER).lower()
+        self.model_name = model_name or HandbookConfig.SPACY_MODEL
+        self.batch_size = batch_size or HandbookConfig.SEGMENTATION_BATCH_SIZE
+        self.n_process = n_process or HandbookConfig.SEGMENTATION_PROCESSES
+        self.cache_size = cache_size if cache_size is not None else HandbookConfig.SEGMENTATION_CACHE_SIZE
+
+        self.backend: Optional[str] = None
+        self._nlp = None
+        self._cache: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _load(self):
+        """Pick the segmentation backend on first use."""
+        with self._load_lock:
+            if self.backend is not None:
+                return
+
+            if self.mode == "spacy":
+                try:
+                    import spacy
+
+                    try:
+                        nlp = spacy.load(self.model_name, exclude=[
+                            "tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner"
+                        ])
+                        nlp.enable_pipe("senter")
+                        self._nlp = nlp
+                        self.backend = f"spacy:{self.model_name}-{nlp.meta.get('version', '')}/senter"
+                    except (OSError, ValueError) as e:
+                        logger.warning(f"spaCy model '{self.model_name}' unavailable ({e}); using the rule-based sentencizer")
+                        nlp = spacy.blank("en")
+                        nlp.add_pipe("sentencizer")
+                        self._nlp = nlp
+                        self.backend = "spacy:sentencizer"
+                except ImportError:
+                    logger.warning("spaCy not installed; using rule-based sentence splitting")
+
+            if self._nlp is None:
+                self.backend = "rules"
+
+            logger.info(f"Sentence segmentation backend: {self.backend}")
+
+    def get_backend(self) -> str:
+        """Get the backend in use ("spacy:<model>-<version>/senter", "spacy:sentencizer" or "rules"), loading it if needed."""
+        if self.backend is None:
+            self._load()
+        return self.backend
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def split(self, text: str) -> List[str]:
+        """Split one text into stripped, non-empty sentences."""
+        return self.split_many([text])[0]
+
+    def split_many(self, texts: Iterable[str], memoize: bool = True) -> List[List[str]]:
+        """Split several texts, segmenting the ones not yet memoized in one batch.
+
+        Args:
+            texts: Texts to segment
+            memoize: Read and fill the memo; pass False for texts that are
+                segmented only once (such as chunks) so they do not evict others
+
+        Returns:
+            One list of sentences per input text, in input order
+        """
+        texts = list(texts)
+        if not memoize:
+            return self._segment(texts) if texts else []
+
+        keys = [self._key(text) for text in texts]
+        results: List[Optional[List[str]]] = [None] * len(texts)
+        pending = {}
+
+        with self._lock:
+            for index, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    results[index] = cached
+                    self.hits += 1
+                elif key not in pending:
+                    pending[key] = texts[index]
+                    self.misses += 1
+
+        if pending:
+            segmented = dict(zip(pending, self._segment(list(pending.values()))))
+            with self._lock:
+                for key, sentences in segmented.items():
+                    if self.cache_size > 0:
+                        self._cache[key] = sentences
+                        self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+            for index, key in enumerate(keys):
+                if results[index] is None:
+                    results[index] = segmented[key]
+
+        return results
+
+    def _segment(self, texts: List[str]) -> List[List[str]]:
+        """Segment texts without the memo."""
+        if self.backend is None:
+            self._load()
+
+        if self._nlp is None:
+            return [
+                [sentence.strip() for sentence in RULE_SENTENCE_BREAK.split(text) if sentence.strip()]
+                for text in texts
+            ]
+
+        blocks = []
+        owners = []
+        for index, text in enumerate(texts):
+            for block in self._blocks(text):
+                blocks.append(block)
+                owners.append(index)
+
+        results: List[List[str]] = [[] for _ in texts]
+        docs = self._nlp.pipe(blocks, batch_size=self.batch_size, n_process=self.n_process)
+        for owner, doc in zip(owners, docs):
+            for sentence in doc.sents:
+                # Paragraph breaks always end a sentence, even without punctuation
+                for part in PARAGRAPH_BREAK.split(sentence.text):
+                    part = part.strip()
+                    if part:
+                        results[owner].append(part)
+        return results
+
+    @staticmethod
+    def _blocks(text: str) -> Iterable[str]:
+        """Group a text's paragraphs into blocks of about BLOCK_CHARS characters."""
+        parts = []
+        length = 0
+        for paragraph in PARAGRAPH_BREAK.split(text):
+            if not paragraph.strip():
+                continue
+            parts.append(paragraph)
+            length += len(paragraph)
+            if length >= BLOCK_CHARS:
+                yield "\n\n".join(parts)
+                parts, length = [], 0
+        if parts:
+            yield "\n\n".join(parts)
+
+    def get_stats(self) -> dict:
+        """Get the backend in use and memo hit/miss counters."""
+        return {
+            "backend": self.backend,
+            "cached_texts": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+_segmenter: Optional[SentenceSegmenter] = None
+_segmenter_lock = threading.Lock()
+
+def get_segmenter() -> SentenceSegmenter:
+    """Get the process-wide sentence segmenter."""
+    global _segmenter
+
+    if _segmenter is None:
+        with _segmenter_lock:
+            if _segmenter is None:
+                _segmenter = SentenceSegmenter()
+
+    return _segmenter
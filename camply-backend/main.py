@@ -1,21 +1,26 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks
+from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator
+import asyncio
 import httpx
+import json
+import time
 from contextlib import asynccontextmanager
 import tempfile
 from pathlib import Path
 
 from shared import Config
+from shared.cache import TTLCache
+from shared.database import get_async_supabase, close_async_supabase
 
+# Only the light handbook modules are imported here; PyMuPDF and the NLP
+# stack load in HandbookEngine, warmed in the background after startup.
 try:
     from handbook_reader.config import HandbookConfig
-    from handbook_reader.pdf_processor import HandbookProcessor, validate_pdf, get_pdf_info
-    from handbook_reader.content_extractor import ContentExtractor
-    from handbook_reader.json_generator import HandbookJSONGenerator
-    from handbook_reader.database_updater import HandbookDatabaseUpdater
+    from handbook_reader.engine import HandbookEngine
+    from handbook_reader.job_executor import HandbookJobExecutor, cancellable, raise_if_cancelled
     HANDBOOK_AVAILABLE = True
 except ImportError as e:
     print(f"Handbook reader not available: {e}")
@@ -33,6 +38,9 @@ class ChatResponse(BaseModel):
     success: bool
     error: Optional[str] = None
 
+class ChatStreamSummary(ChatResponse):
+    time_to_first_token_ms: Optional[float] = None
+
 class HandbookProcessRequest(BaseModel):
     user_id: str
     academic_id: str
@@ -53,26 +61,62 @@ class ValidationResult(BaseModel):
     info: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
+def create_adk_client() -> httpx.AsyncClient:
+    """Create the long-lived, connection-pooled client used for all ADK calls."""
+    http2 = Config.ADK_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            print("HTTP/2 requested but 'h2' is not installed; using HTTP/1.1 for ADK calls")
+            http2 = False
+    
+    return httpx.AsyncClient(
+        timeout=Config.ADK_HTTP_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=Config.ADK_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.ADK_HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=Config.ADK_HTTP_KEEPALIVE_EXPIRY
+        ),
+        http2=http2
+    )
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Bridge service initialized - connecting to ADK server")
     print(f"ADK Server: {Config.ADK_SERVER_URL}")
     
+    app.state.adk_client = create_adk_client()
+    app.state.adk_sessions = TTLCache(
+        max_size=Config.ADK_SESSION_CACHE_SIZE,
+        ttl_seconds=Config.ADK_SESSION_CACHE_TTL
+    )
+    
     if HANDBOOK_AVAILABLE:
         print("Handbook processing service enabled")
-        app.state.content_extractor = ContentExtractor()
-        app.state.json_generator = HandbookJSONGenerator()
-        app.state.database_updater = HandbookDatabaseUpdater()
+        app.state.handbook_engine = HandbookEngine()
         
-        if app.state.database_updater.validate_database_connection():
-            print("Handbook database connection validated")
-        else:
-            print("WARNING: Handbook database connection failed")
+        app.state.job_executor = HandbookJobExecutor(
+            on_failure=lambda handbook_id, message: app.state.handbook_engine.load().database_updater.update_processing_status(
+                handbook_id, "failed", message
+            )
+        )
+        await app.state.job_executor.start()
+        
+        # Chat is served right away; the handbook engine warms up behind it
+        app.state.handbook_warmup = asyncio.create_task(app.state.handbook_engine.warm_up())
     else:
         print("Handbook processing service disabled")
     
     yield
     print("Shutting down bridge service...")
+    
+    if HANDBOOK_AVAILABLE:
+        app.state.handbook_warmup.cancel()
+        await app.state.job_executor.shutdown()
+    
+    await app.state.adk_client.aclose()
+    await close_async_supabase()
 
 app = FastAPI(
     title="Camply Agent Bridge",
@@ -96,17 +140,42 @@ async def root():
 @app.get("/health")
 async def health_check():
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{Config.ADK_SERVER_URL}/")
-            adk_status = "ready" if response.status_code == 200 else "error"
+        response = await app.state.adk_client.get(f"{Config.ADK_SERVER_URL}/", timeout=5.0)
+        adk_status = "ready" if response.status_code == 200 else "error"
     except:
         adk_status = "not_connected"
     
     return {
         "status": "healthy",
         "adk_server_status": adk_status,
-        "adk_server_url": Config.ADK_SERVER_URL
+        "adk_server_url": Config.ADK_SERVER_URL,
+        "adk_session_cache": app.state.adk_sessions.get_stats(),
+        "handbook_jobs": app.state.job_executor.get_stats() if HANDBOOK_AVAILABLE else None,
+        "handbook_engine": app.state.handbook_engine.get_status() if HANDBOOK_AVAILABLE else None,
+        "handbook_result_cache": (
+            app.state.handbook_engine.result_cache.get_stats()
+            if HANDBOOK_AVAILABLE and app.state.handbook_engine.is_warm else None
+        )
+    }
+
+@app.get("/ready")
+async def readiness_check(require_handbook: bool = False):
+    """
+    Readiness probe.
+    
+    Chat is ready as soon as the app has started. The handbook engine loads
+    in the background; pass require_handbook=true to report not ready (503)
+    until it is warm.
+    """
+    handbook_status = app.state.handbook_engine.get_status() if HANDBOOK_AVAILABLE else {"state": "unavailable"}
+    handbook_warm = handbook_status["state"] == "warm"
+    
+    body = {
+        "status": "ready" if handbook_warm or not require_handbook else "warming",
+        "chat": "ready",
+        "handbook_engine": handbook_status
     }
+    return JSONResponse(status_code=200 if body["status"] == "ready" else 503, content=body)
 
 @app.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
@@ -122,72 +191,44 @@ async def chat_endpoint(request: ChatRequest):
                 error="user_id_required"
             )
         
-        if (request.context and 
-            request.context.get('type') == 'handbook_processing' and 
-            request.context.get('action') == 'process' and
-            request.context.get('handbook_id')):
-            
+        if is_handbook_processing_request(request):
             return await handle_handbook_processing_request(request)
         
-        session_id = request.session_id or f"session_{request.user_id}_{hash(request.message) % 10000}"
+        session_id = get_session_id(request)
         
         print(f"Processing chat request for user: {request.user_id}")
         print(f"Message: {request.message[:100]}...")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                session_response = await client.post(
-                    f"{Config.ADK_SERVER_URL}/apps/{Config.ADK_APP_NAME}/users/{request.user_id}/sessions/{session_id}",
-                    json={
-                        "user_id": request.user_id,
-                        "session_type": "chat",
-                        "created_from": "main_bridge"
-                    },
-                    headers={"Content-Type": "application/json"}
-                )
-                print(f"Session created/accessed: {session_response.status_code}")
-            except Exception as e:
-                print(f"Session handling (might already exist): {e}")
-                pass
-            
-            adk_response = await client.post(
-                f"{Config.ADK_SERVER_URL}/run",
-                json={
-                    "appName": Config.ADK_APP_NAME,
-                    "userId": request.user_id,
-                    "sessionId": session_id,
-                    "newMessage": {
-                        "role": "user",
-                        "parts": [{"text": request.message}]
-                    }
-                },
-                headers={"Content-Type": "application/json"}
-            )
-            
-            print(f"ADK Response Status: {adk_response.status_code}")
-            
-            if adk_response.status_code != 200:
-                error_text = adk_response.text
-                print(f"ADK Error Response: {error_text}")
-                raise HTTPException(status_code=500, detail=f"ADK server error: {adk_response.status_code}")
-            
-            adk_data = adk_response.json()
-            print(f"ADK Data Type: {type(adk_data)}, Length: {len(adk_data) if isinstance(adk_data, list) else 'N/A'}")
-            
-            agent_response = "Hello! I'm your Student Desk Assistant. How can I help you today?"
-            
-            if isinstance(adk_data, list) and len(adk_data) > 0:
-                for event in reversed(adk_data):
-                    if (event.get("content", {}).get("role") == "model" and 
-                        event.get("content", {}).get("parts")):
-                        parts = event["content"]["parts"]
-                        for part in parts:
-                            if "text" in part:
-                                agent_response = part["text"]
-                                print(f"Found agent response: {agent_response[:100]}...")
-                                break
-                        if "Hello!" not in agent_response or len(agent_response) > 100:
+        client = app.state.adk_client
+        
+        await ensure_adk_session(client, request.user_id, session_id)
+        
+        adk_response = await send_adk_run(client, request, session_id)
+        
+        print(f"ADK Response Status: {adk_response.status_code}")
+        
+        if adk_response.status_code != 200:
+            error_text = adk_response.text
+            print(f"ADK Error Response: {error_text}")
+            raise HTTPException(status_code=500, detail=f"ADK server error: {adk_response.status_code}")
+        
+        adk_data = adk_response.json()
+        print(f"ADK Data Type: {type(adk_data)}, Length: {len(adk_data) if isinstance(adk_data, list) else 'N/A'}")
+        
+        agent_response = "Hello! I'm your Student Desk Assistant. How can I help you today?"
+        
+        if isinstance(adk_data, list) and len(adk_data) > 0:
+            for event in reversed(adk_data):
+                if (event.get("content", {}).get("role") == "model" and 
+                    event.get("content", {}).get("parts")):
+                    parts = event["content"]["parts"]
+                    for part in parts:
+                        if "text" in part:
+                            agent_response = part["text"]
+                            print(f"Found agent response: {agent_response[:100]}...")
                             break
+                    if "Hello!" not in agent_response or len(agent_response) > 100:
+                        break
         
         print(f"Agent response: {agent_response[:100]}...")
         
@@ -206,6 +247,209 @@ async def chat_endpoint(request: ChatRequest):
             error=str(e)
         )
 
+@app.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """
+    Streaming variant of /chat that proxies ADK's SSE run mode.
+    
+    Emits `delta` events carrying partial model text as it arrives, then a
+    single `done` event whose payload has the ChatResponse fields.
+    """
+    return StreamingResponse(
+        stream_chat_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def stream_chat_events(request: ChatRequest) -> AsyncIterator[str]:
+    """Relay ADK /run_sse events to the client as Server-Sent Events."""
+    started = time.perf_counter()
+    first_token_ms = None
+    streamed_text = ""
+    final_text = None
+    
+    try:
+        if not request.user_id:
+            yield format_sse("done", ChatStreamSummary(
+                response="I need to know who you are to provide personalized assistance. Please log in.",
+                agent_used="student_desk",
+                success=False,
+                error="user_id_required"
+            ).model_dump())
+            return
+        
+        if is_handbook_processing_request(request):
+            result = await handle_handbook_processing_request(request)
+            yield format_sse("done", ChatStreamSummary(**result.model_dump()).model_dump())
+            return
+        
+        session_id = get_session_id(request)
+        client = app.state.adk_client
+        
+        print(f"Processing streaming chat request for user: {request.user_id}")
+        
+        await ensure_adk_session(client, request.user_id, session_id)
+        
+        adk_response = await send_adk_run(client, request, session_id, stream=True)
+        try:
+            if adk_response.status_code != 200:
+                error_text = (await adk_response.aread()).decode(errors="replace")
+                print(f"ADK Error Response: {error_text}")
+                raise Exception(f"ADK server error: {adk_response.status_code}")
+            
+            async for line in adk_response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                
+                event = json.loads(line[5:].strip())
+                if event.get("error"):
+                    raise Exception(f"ADK run error: {event['error']}")
+                
+                text = extract_model_text(event)
+                if not text:
+                    continue
+                
+                event_name = "delta"
+                if event.get("partial"):
+                    delta = text
+                    streamed_text += text
+                elif text.startswith(streamed_text):
+                    # Non-partial events carry the full aggregated text; only
+                    # forward the part the client has not already seen.
+                    final_text = text
+                    delta = text[len(streamed_text):]
+                    streamed_text = ""
+                else:
+                    # The final text differs from the streamed one: the client
+                    # swaps what it streamed for this message rather than appending
+                    final_text = text
+                    event_name, delta = "replace", text
+                    streamed_text = ""
+                
+                if delta:
+                    if first_token_ms is None:
+                        first_token_ms = (time.perf_counter() - started) * 1000
+                        print(f"Chat stream time to first token: {first_token_ms:.0f}ms")
+                    yield format_sse(event_name, {"text": delta})
+        finally:
+            await adk_response.aclose()
+        
+        agent_response = final_text or streamed_text or "Hello! I'm your Student Desk Assistant. How can I help you today?"
+        
+        yield format_sse("done", ChatStreamSummary(
+            response=agent_response,
+            agent_used="student_desk",
+            success=True,
+            time_to_first_token_ms=first_token_ms
+        ).model_dump())
+        
+    except Exception as e:
+        print(f"Error processing streaming chat: {e}")
+        yield format_sse("done", ChatStreamSummary(
+            response="I apologize, but I'm having trouble processing your request right now. Please try again.",
+            agent_used="student_desk",
+            success=False,
+            error=str(e),
+            time_to_first_token_ms=first_token_ms
+        ).model_dump())
+
+def is_handbook_processing_request(request: ChatRequest) -> bool:
+    """Check whether a chat request is the frontend's handbook processing trigger."""
+    return bool(
+        request.context and 
+        request.context.get('type') == 'handbook_processing' and 
+        request.context.get('action') == 'process' and
+        request.context.get('handbook_id')
+    )
+
+def get_session_id(request: ChatRequest) -> str:
+    """Get the ADK session id for a chat request."""
+    return request.session_id or f"session_{request.user_id}_{hash(request.message) % 10000}"
+
+def build_run_payload(request: ChatRequest, session_id: str) -> Dict[str, Any]:
+    """Build the request body for ADK's /run and /run_sse endpoints."""
+    return {
+        "appName": Config.ADK_APP_NAME,
+        "userId": request.user_id,
+        "sessionId": session_id,
+        "newMessage": {
+            "role": "user",
+            "parts": [{"text": request.message}]
+        }
+    }
+
+async def ensure_adk_session(client: httpx.AsyncClient, user_id: str, session_id: str):
+    """
+    Create the ADK session, ignoring errors if it already exists.
+    
+    Sessions known to exist are remembered in app.state.adk_sessions, so the
+    create round trip only happens once per (user_id, session_id).
+    """
+    session_key = (user_id, session_id)
+    if session_key in app.state.adk_sessions:
+        return
+    
+    try:
+        session_response = await client.post(
+            f"{Config.ADK_SERVER_URL}/apps/{Config.ADK_APP_NAME}/users/{user_id}/sessions/{session_id}",
+            json={
+                "user_id": user_id,
+                "session_type": "chat",
+                "created_from": "main_bridge"
+            },
+            headers={"Content-Type": "application/json"}
+        )
+        print(f"Session created/accessed: {session_response.status_code}")
+        
+        if session_response.is_success or "already exists" in session_response.text.lower():
+            app.state.adk_sessions.set(session_key, True)
+    except Exception as e:
+        print(f"Session handling (might already exist): {e}")
+
+async def send_adk_run(client: httpx.AsyncClient, request: ChatRequest, session_id: str,
+                       stream: bool = False) -> httpx.Response:
+    """
+    POST a message to ADK's /run (or /run_sse when streaming).
+    
+    If ADK reports the session as missing (404), the cached session entry is
+    dropped, the session is recreated and the run is retried once. Streamed
+    responses are returned unread and must be closed by the caller.
+    """
+    payload = build_run_payload(request, session_id)
+    headers = {"Content-Type": "application/json"}
+    url = f"{Config.ADK_SERVER_URL}/run"
+    
+    if stream:
+        payload["streaming"] = True
+        headers["Accept"] = "text/event-stream"
+        url = f"{Config.ADK_SERVER_URL}/run_sse"
+    
+    for attempt in range(2):
+        response = await client.send(
+            client.build_request("POST", url, json=payload, headers=headers),
+            stream=stream
+        )
+        if response.status_code != 404 or attempt > 0:
+            return response
+        
+        await response.aclose()
+        print(f"ADK session {session_id} not found; recreating and retrying")
+        app.state.adk_sessions.invalidate((request.user_id, session_id))
+        await ensure_adk_session(client, request.user_id, session_id)
+    
+    return response
+
+def extract_model_text(event: Dict[str, Any]) -> str:
+    """Concatenate the text parts of a model event, or return '' for other events."""
+    content = event.get("content") or {}
+    if content.get("role") != "model":
+        return ""
+    return "".join(part["text"] for part in content.get("parts") or [] if part.get("text"))
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Format a Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
 async def handle_handbook_processing_request(request: ChatRequest) -> ChatResponse:
     """Handle handbook processing requests triggered from frontend upload."""
     try:
@@ -222,12 +466,9 @@ async def handle_handbook_processing_request(request: ChatRequest) -> ChatRespon
         
         print(f"Processing handbook {handbook_id} for user {user_id}")
         
-        from supabase import create_client
-        from shared.config import Config
-        
-        supabase = create_client(Config.SUPABASE_URL, Config.get_supabase_backend_key())
+        supabase = await get_async_supabase()
         
-        handbook_response = supabase.table('user_handbooks') \
+        handbook_response = await supabase.table('user_handbooks') \
             .select('*') \
             .eq('handbook_id', handbook_id) \
             .eq('user_id', user_id) \
@@ -243,25 +484,14 @@ async def handle_handbook_processing_request(request: ChatRequest) -> ChatRespon
             )
         
         handbook = handbook_response.data
-           
-        from fastapi import BackgroundTasks
-        background_tasks = BackgroundTasks()
-        background_tasks.add_task(
-            process_handbook_background,
-            handbook_id,
-            handbook['storage_path'],
-            app.state.content_extractor,
-            app.state.json_generator,
-            app.state.database_updater
-        )
         
-        await process_handbook_background(
-            handbook_id,
-            handbook['storage_path'],
-            app.state.content_extractor,
-            app.state.json_generator,
-            app.state.database_updater
-        )
+        if not enqueue_handbook_job(handbook_id, handbook['storage_path']):
+            return ChatResponse(
+                response="Our handbook processor is busy right now. Please try again in a few minutes.",
+                agent_used="handbook_processor",
+                success=False,
+                error="handbook_queue_full"
+            )
         
         return ChatResponse(
             response=f"Great! I've started processing your handbook '{handbook['original_filename']}'. This usually takes 1-2 minutes. I'll extract all the important information like examination rules, attendance policies, course details, and more. You can ask me questions about your handbook once processing is complete!",
@@ -279,13 +509,14 @@ async def handle_handbook_processing_request(request: ChatRequest) -> ChatRespon
         )
 
 @app.post("/handbook/process", response_model=ProcessingStatus)
-async def process_handbook(request: HandbookProcessRequest, background_tasks: BackgroundTasks):
+async def process_handbook(request: HandbookProcessRequest):
     """Start processing a handbook PDF."""
     if not HANDBOOK_AVAILABLE:
         raise HTTPException(status_code=503, detail="Handbook processing service not available")
     
     try:
-        if not app.state.database_updater.validate_database_connection():
+        engine = await get_handbook_engine()
+        if not await engine.database_updater.validate_database_connection():
             raise HTTPException(
                 status_code=503, 
                 detail="Database connection unavailable"
@@ -295,12 +526,9 @@ async def process_handbook(request: HandbookProcessRequest, background_tasks: Ba
         handbook_id = None
         
         # First try to find existing handbook with same storage path
-        from supabase import create_client
-        from shared.config import Config
-        
-        supabase = create_client(Config.SUPABASE_URL, Config.get_supabase_backend_key())
+        supabase = await get_async_supabase()
         
-        existing_response = supabase.table('user_handbooks') \
+        existing_response = await supabase.table('user_handbooks') \
             .select('handbook_id') \
             .eq('user_id', request.user_id) \
             .eq('storage_path', request.storage_path) \
@@ -312,7 +540,7 @@ async def process_handbook(request: HandbookProcessRequest, background_tasks: Ba
             print(f"Found existing handbook: {handbook_id}")
         else:
             # Create new handbook record
-            handbook_id = app.state.database_updater.create_handbook_record(
+            handbook_id = await engine.database_updater.create_handbook_record(
                 user_id=request.user_id,
                 academic_id=request.academic_id,
                 storage_path=request.storage_path,
@@ -327,14 +555,8 @@ async def process_handbook(request: HandbookProcessRequest, background_tasks: Ba
                 detail="Failed to get or create handbook record"
             )
         
-        background_tasks.add_task(
-            process_handbook_background,
-            handbook_id,
-            request.storage_path,
-            app.state.content_extractor,
-            app.state.json_generator,
-            app.state.database_updater
-        )
+        if not enqueue_handbook_job(handbook_id, request.storage_path):
+            raise HTTPException(status_code=503, detail="Handbook processing queue is full")
         
         return ProcessingStatus(
             status="processing",
@@ -342,30 +564,30 @@ async def process_handbook(request: HandbookProcessRequest, background_tasks: Ba
             handbook_id=handbook_id
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/handbook/process-existing/{handbook_id}", response_model=ProcessingStatus)
-async def process_existing_handbook(handbook_id: str, background_tasks: BackgroundTasks):
+async def process_existing_handbook(handbook_id: str):
     """Process an existing handbook that was already uploaded."""
     if not HANDBOOK_AVAILABLE:
         raise HTTPException(status_code=503, detail="Handbook processing service not available")
     
     try:
         # Validate database connection
-        if not app.state.database_updater.validate_database_connection():
+        engine = await get_handbook_engine()
+        if not await engine.database_updater.validate_database_connection():
             raise HTTPException(
                 status_code=503, 
                 detail="Database connection unavailable"
             )
         
         # Get handbook record from database
-        from supabase import create_client
-        from shared.config import Config
-        
-        supabase = create_client(Config.SUPABASE_URL, Config.get_supabase_backend_key())
+        supabase = await get_async_supabase()
         
-        handbook_response = supabase.table('user_handbooks') \
+        handbook_response = await supabase.table('user_handbooks') \
             .select('*') \
             .eq('handbook_id', handbook_id) \
             .single() \
@@ -380,15 +602,9 @@ async def process_existing_handbook(handbook_id: str, background_tasks: Backgrou
         handbook = handbook_response.data
         print(f"Processing existing handbook: {handbook['original_filename']}")
         
-        # Start background processing
-        background_tasks.add_task(
-            process_handbook_background,
-            handbook_id,
-            handbook['storage_path'],
-            app.state.content_extractor,
-            app.state.json_generator,
-            app.state.database_updater
-        )
+        # Queue background processing
+        if not enqueue_handbook_job(handbook_id, handbook['storage_path']):
+            raise HTTPException(status_code=503, detail="Handbook processing queue is full")
         
         return ProcessingStatus(
             status="processing",
@@ -396,6 +612,8 @@ async def process_existing_handbook(handbook_id: str, background_tasks: Backgrou
             handbook_id=handbook_id
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -406,8 +624,11 @@ async def get_processing_status(handbook_id: str):
         raise HTTPException(status_code=503, detail="Handbook processing service not available")
     
     try:
-        status = app.state.database_updater.get_processing_status(handbook_id)
+        engine = await get_handbook_engine()
+        status = await engine.database_updater.get_processing_status(handbook_id)
         return ProcessingStatus(**status)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -417,6 +638,9 @@ async def validate_handbook(file: UploadFile = File(...)):
     if not HANDBOOK_AVAILABLE:
         raise HTTPException(status_code=503, detail="Handbook processing service not available")
     
+    await get_handbook_engine()
+    from handbook_reader.pdf_processor import validate_pdf, get_pdf_info
+    
     try:
         with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
             content = await file.read()
@@ -449,45 +673,110 @@ async def validate_handbook(file: UploadFile = File(...)):
         except:
             pass
 
-async def process_handbook_background(
+async def get_handbook_engine() -> "HandbookEngine":
+    """Get the warm handbook engine, loading it now if warm-up has not finished."""
+    try:
+        return await app.state.handbook_engine.ensure_loaded()
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=f"Handbook processing service not available: {e}")
+
+def enqueue_handbook_job(handbook_id: str, storage_path: str) -> bool:
+    """Queue a handbook for processing on the job executor and return immediately."""
+    return app.state.job_executor.submit(
+        handbook_id,
+        process_handbook_background,
+        handbook_id,
+        storage_path,
+        app.state.handbook_engine
+    )
+
+def process_handbook_background(
     handbook_id: str, 
     storage_path: str,
-    content_extractor: ContentExtractor,
-    json_generator: HandbookJSONGenerator,
-    database_updater: HandbookDatabaseUpdater
+    engine: "HandbookEngine"
 ):
-    """Background task for processing handbook PDFs."""
+    """
+    Blocking handbook pipeline, run on a HandbookJobExecutor worker thread.
+    
+    Errors are raised to the executor, which counts the job as failed and
+    marks the handbook failed. The pipeline stops at the next
+    raise_if_cancelled() check once the executor has cancelled the job, and
+    always before storing results.
+    """
     import logging
-    import asyncio
     
     logger = logging.getLogger(__name__)
+    pdf_path = None
     
     try:
         logger.info(f"Starting background processing for handbook {handbook_id}")
         
+        # Loads the engine here if the first job arrives before warm-up finishes
+        engine.load()
+        from handbook_reader.pdf_processor import HandbookProcessor
+        
+        content_extractor = engine.content_extractor
+        json_generator = engine.json_generator
+        database_updater = engine.database_updater
+        result_cache = engine.result_cache
+        
         database_updater.update_processing_status(handbook_id, "processing")
         
-        pdf_path = await download_from_storage(storage_path)
+        pdf_path = download_from_storage(storage_path)
         
         if not pdf_path or not Path(pdf_path).exists():
             raise Exception(f"Failed to download file from storage: {storage_path}")
         
+        raise_if_cancelled()
+        
+        pdf_hash = None
+        if result_cache:
+            pdf_hash = result_cache.hash_file(pdf_path)
+            cached_format = result_cache.get(pdf_hash)
+            
+            if cached_format is not None:
+                logger.info(f"Reusing cached result for identical PDF {pdf_hash[:12]}")
+                raise_if_cancelled()
+                if not database_updater.store_processed_content(handbook_id, cached_format):
+                    raise Exception("Failed to store processed content")
+                
+                logger.info(f"Successfully completed processing for handbook {handbook_id} from cache")
+                return
+        
         logger.info(f"Processing PDF: {pdf_path}")
         processor = HandbookProcessor(pdf_path)
         
         if not processor.open_document():
             raise Exception("Failed to open PDF document")
 
-        pdf_content = processor.extract_all_content()
-        processor.close()
+        categorizer = None
+        if HandbookConfig.STREAMING_PIPELINE and HandbookConfig.PRESERVE_STRUCTURE:
+            logger.info("Extracting and categorizing content page by page")
+            from handbook_reader.incremental import IncrementalCategorizer
+            
+            # A re-processed handbook only rescores chunks touching pages changed since its last run
+            categorizer = IncrementalCategorizer(content_extractor, database_updater.get_page_index(handbook_id))
+            try:
+                categorized_content = categorizer.categorize_pages(cancellable(processor.iter_page_texts()))
+            finally:
+                processor.close()
+            pdf_content = processor.stream_stats
+        else:
+            # No page index here: every chunk is scored on each run
+            try:
+                pdf_content = processor.extract_all_content()
+            finally:
+                processor.close()
+            raise_if_cancelled()
+            
+            logger.info("Starting content categorization")
+            categorized_content = content_extractor.extract_categorized_content(
+                pdf_content['total_text']
+            )
         
+        raise_if_cancelled()
         logger.info(f"Extracted {pdf_content['total_words']} words from {pdf_content['total_pages']} pages")
         
-        logger.info("Starting content categorization")
-        categorized_content = content_extractor.extract_categorized_content(
-            pdf_content['total_text']
-        )
-        
         validation_report = content_extractor.validate_categorization(categorized_content)
         logger.info(f"Categorization complete. Quality score: {validation_report['average_quality_score']:.1f}")
         
@@ -507,24 +796,31 @@ async def process_handbook_background(
         if not json_validation["is_valid"]:
             logger.warning(f"JSON validation warnings: {json_validation['errors']}")
         
+        if categorizer and categorizer.stats["incremental"]:
+            changed_sections = categorizer.changed_sections(database_format)
+            logger.info(f"Sections changed since the last run: {', '.join(changed_sections) or 'none'}")
+        
+        # Last check: a cancelled job must not overwrite the failed status with results
+        raise_if_cancelled()
         logger.info("Storing processed content in database")
         success = database_updater.store_processed_content(handbook_id, database_format)
         
         if not success:
             raise Exception("Failed to store processed content")
         
-        cleanup_temp_file(pdf_path)
+        if categorizer:
+            database_updater.store_page_index(handbook_id, categorizer.get_page_index(database_format))
         
-        logger.info(f"Successfully completed processing for handbook {handbook_id}")
+        if result_cache and pdf_hash:
+            result_cache.put(pdf_hash, database_format)
         
-    except Exception as e:
-        logger.error(f"Error processing handbook {handbook_id}: {e}")
-        database_updater.update_processing_status(handbook_id, "failed", str(e))
+        logger.info(f"Successfully completed processing for handbook {handbook_id}")
         
-        if 'pdf_path' in locals():
+    finally:
+        if pdf_path:
             cleanup_temp_file(pdf_path)
 
-async def download_from_storage(storage_path: str) -> Optional[str]:
+def download_from_storage(storage_path: str) -> Optional[str]:
     """Download file from Supabase storage to local temp file."""
     try:
         from supabase import create_client
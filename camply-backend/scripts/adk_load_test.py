@@ -0,0 +1,96 @@
+"""Load test ADK calls with a client per request vs the shared pooled client.
+
+Starts the stub ADK server (stub_adk.py) on 127.0.0.1 and sends chat messages
+the way the bridge does (session create POST, then /run POST) from concurrent
+senders: first with a new httpx.AsyncClient per message, as /chat did before
+the shared client, then through the single client main.create_adk_client()
+builds from the ADK_HTTP_* settings. Prints messages and HTTP requests per
+second and message latency percentiles for both.
+
+The session cache is not involved: every message makes both calls.
+
+Usage (from camply-backend/):
+    python scripts/adk_load_test.py [--messages 2000] [--concurrency 50] [--latency-ms 5]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_adk import stub_adk_server
+from main import create_adk_client
+from shared import Config
+
+async def send_message(client: httpx.AsyncClient, base_url: str, user_id: str, session_id: str):
+    """Session create then run, as chat_endpoint does without a cached session."""
+    await client.post(
+        f"{base_url}/apps/{Config.ADK_APP_NAME}/users/{user_id}/sessions/{session_id}",
+        json={"user_id": user_id, "session_type": "chat", "created_from": "load_test"}
+    )
+    response = await client.post(f"{base_url}/run", json={
+        "appName": Config.ADK_APP_NAME,
+        "userId": user_id,
+        "sessionId": session_id,
+        "newMessage": {"role": "user", "parts": [{"text": "When are exams?"}]}
+    })
+    response.raise_for_status()
+
+async def load(base_url: str, messages: int, concurrency: int, shared: bool):
+    """Send messages from concurrent senders, returning (seconds, per-message latencies)."""
+    shared_client = create_adk_client() if shared else None
+    queue = asyncio.Queue()
+    for index in range(messages):
+        queue.put_nowait(index)
+    latencies = []
+
+    async def sender():
+        while not queue.empty():
+            index = queue.get_nowait()
+            started = time.perf_counter()
+            if shared_client:
+                await send_message(shared_client, base_url, f"user-{index % 100}", f"session-{index % 100}")
+            else:
+                async with httpx.AsyncClient(timeout=Config.ADK_HTTP_TIMEOUT) as client:
+                    await send_message(client, base_url, f"user-{index % 100}", f"session-{index % 100}")
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(sender() for _ in range(concurrency)))
+    finally:
+        if shared_client:
+            await shared_client.aclose()
+    return time.perf_counter() - started, latencies
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=5, help="simulated ADK latency per request")
+    args = parser.parse_args()
+
+    with stub_adk_server(args.latency_ms) as (base_url, _):
+        # Warm up the stub and create the sessions
+        asyncio.run(load(base_url, 100, 10, shared=True))
+
+        print(f"{args.messages} messages, {args.concurrency} concurrent senders, "
+              f"stub ADK latency {args.latency_ms:.0f}ms, 2 HTTP requests per message")
+        print(f"{'ADK client':<22}{'msg/s':>9}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}")
+        for label, shared in (("client per message", False), ("shared pooled client", True)):
+            seconds, latencies = asyncio.run(load(base_url, args.messages, args.concurrency, shared))
+            print(f"{label:<22}{args.messages / seconds:>9.0f}{2 * args.messages / seconds:>9.0f}"
+                  f"{statistics.median(latencies) * 1000:>9.1f}{percentile(latencies, 0.99) * 1000:>9.1f}")
+
+if __name__ == "__main__":
+    main()
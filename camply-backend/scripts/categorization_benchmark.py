@@ -0,0 +1,80 @@
+"""Benchmark per-chunk categorization against the batched score matrix.
+
+Scores the same chunks with ContentExtractor.categorize_chunk (one chunk at a
+time) and categorize_chunk_batch (one score matrix per batch), checks that both
+give identical matches and prints the timings. Chunks come from a text file
+(paragraphs separated by blank lines) or are generated from the category
+keywords.
+
+Usage (from camply-backend/):
+    python scripts/categorization_benchmark.py [--chunks 10000] [--text handbook.txt] [--batch-size 256]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handbook_reader.config import HandbookConfig
+from handbook_reader.content_extractor import ContentExtractor
+
+FILLER = (
+    "the students must ensure that all of their records are complete before the end of each "
+    "term and any request should be submitted to the office in writing with supporting documents"
+).split()
+
+def synthetic_paragraphs(count: int, seed: int = 7):
+    """Generate handbook-like paragraphs mixing category keywords with filler words."""
+    rng = random.Random(seed)
+    keywords = [keyword for category in HandbookConfig.get_all_categories()
+                for keyword in HandbookConfig.get_category_keywords(category)]
+    paragraphs = []
+    for _ in range(count):
+        words = [rng.choice(keywords) if rng.random() < 0.08 else rng.choice(FILLER)
+                 for _ in range(rng.randint(20, 80))]
+        paragraphs.append(" ".join(words).capitalize() + ".")
+    return paragraphs
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=10000)
+    parser.add_argument("--text", help="Text file to chunk instead of generated paragraphs")
+    parser.add_argument("--batch-size", type=int, default=HandbookConfig.SCORING_BATCH_SIZE)
+    args = parser.parse_args()
+
+    extractor = ContentExtractor()
+    if args.text:
+        with open(args.text, encoding="utf-8") as f:
+            chunks = extractor.build_chunks(f.read())[:args.chunks]
+    else:
+        chunks = []
+        while len(chunks) < args.chunks:
+            chunks = extractor.build_chunks("\n\n".join(synthetic_paragraphs(args.chunks * 3)))
+        chunks = chunks[:args.chunks]
+
+    started = time.perf_counter()
+    expected = [extractor.categorize_chunk(chunk.text, chunk.overlap) for chunk in chunks]
+    loop_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    actual = []
+    for start in range(0, len(chunks), args.batch_size):
+        actual.extend(extractor.categorize_chunk_batch(chunks[start:start + args.batch_size]))
+    batch_seconds = time.perf_counter() - started
+
+    if actual != expected:
+        mismatched = sum(a != e for a, e in zip(actual, expected))
+        raise SystemExit(f"Batched categorization differs on {mismatched} of {len(chunks)} chunks")
+
+    matches = sum(len(chunk_matches) for chunk_matches in expected)
+    print(f"{len(chunks)} chunks, {matches} category matches (identical)")
+    print(f"per chunk:    {loop_seconds:.2f}s ({loop_seconds / len(chunks) * 1e6:.0f} us/chunk)")
+    print(f"score matrix: {batch_seconds:.2f}s ({batch_seconds / len(chunks) * 1e6:.0f} us/chunk, "
+          f"batch size {args.batch_size})")
+    print(f"speedup:      {loop_seconds / batch_seconds:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Measure /chat latency while handbooks are being processed.
+
+Starts the stub ADK server (stub_adk.py) and sends /chat requests through the
+bridge in-process, one every --interval-ms, in three scenarios:
+
+- idle: no handbook processing
+- executor: --jobs handbooks processed concurrently on HandbookJobExecutor
+  (concurrency --jobs), as /handbook/process schedules them
+- inline: the same handbooks processed by coroutines on the event loop, as
+  process_handbook_background ran before the executor (skip with --no-inline)
+
+Each handbook job extracts, categorizes and formats the PDF as the job
+pipeline does; download and database writes are left out. Prints p50, p99
+and max /chat latency per scenario.
+
+Usage (from camply-backend/):
+    python scripts/chat_under_load_benchmark.py handbook.pdf [--jobs 5] [--interval-ms 50]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_adk import stub_adk_server
+from incremental_benchmark import process
+import main as bridge
+from handbook_reader.job_executor import HandbookJobExecutor
+from shared import Config
+from shared.cache import TTLCache
+
+async def chat_until(done, interval: float):
+    """Send /chat requests every interval seconds until done() is true, returning latencies."""
+    latencies = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=bridge.app), base_url="http://bridge") as client:
+        while not done():
+            started = time.perf_counter()
+            response = await client.post("/chat", json={
+                "message": "When are exams?", "user_id": "user-1", "session_id": "session-1"
+            })
+            latencies.append(time.perf_counter() - started)
+            if not response.json()["success"]:
+                raise SystemExit(f"Chat failed: {response.json()['error']}")
+            await asyncio.sleep(max(0.0, interval - latencies[-1]))
+    return latencies
+
+async def scenario(name: str, pdf_path: str, jobs: int, interval: float, idle_seconds: float):
+    bridge.app.state.adk_client = bridge.create_adk_client()
+    bridge.app.state.adk_sessions = TTLCache()
+    try:
+        if name == "idle":
+            deadline = time.perf_counter() + idle_seconds
+            return await chat_until(lambda: time.perf_counter() > deadline, interval)
+
+        if name == "executor":
+            executor = HandbookJobExecutor(max_concurrency=jobs, max_queue_size=jobs)
+            await executor.start()
+            try:
+                job_ids = [f"handbook-{index}" for index in range(jobs)]
+                for job_id in job_ids:
+                    executor.submit(job_id, process, pdf_path)
+                return await chat_until(
+                    lambda: all(executor.get_job_state(job_id) is None for job_id in job_ids), interval
+                )
+            finally:
+                await executor.shutdown()
+
+        # Blocking work called straight from coroutines, as before the executor
+        async def inline_job():
+            await asyncio.sleep(0)
+            process(pdf_path)
+
+        pending = [asyncio.create_task(inline_job()) for _ in range(jobs)]
+        latencies = await chat_until(lambda: all(task.done() for task in pending), interval)
+        await asyncio.gather(*pending)
+        return latencies
+    finally:
+        await bridge.app.state.adk_client.aclose()
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdf")
+    parser.add_argument("--jobs", type=int, default=5, help="handbooks processed concurrently")
+    parser.add_argument("--interval-ms", type=float, default=50, help="time between /chat requests")
+    parser.add_argument("--latency-ms", type=float, default=20, help="simulated ADK latency per request")
+    parser.add_argument("--idle-seconds", type=float, default=5)
+    parser.add_argument("--no-inline", action="store_true", help="skip the inline (pre-executor) scenario")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    scenarios = ["idle", "executor"] + ([] if args.no_inline else ["inline"])
+    results = []
+    with stub_adk_server(args.latency_ms) as (base_url, _):
+        Config.ADK_SERVER_URL = base_url
+        for name in scenarios:
+            started = time.perf_counter()
+            # The bridge logs every request
+            with contextlib.redirect_stdout(io.StringIO()):
+                latencies = asyncio.run(scenario(
+                    name, args.pdf, args.jobs, args.interval_ms / 1000, args.idle_seconds
+                ))
+            results.append((name, latencies, time.perf_counter() - started))
+
+    print(f"/chat every {args.interval_ms:.0f}ms, stub ADK latency {args.latency_ms:.0f}ms, "
+          f"{args.jobs} concurrent handbooks ({os.path.basename(args.pdf)}), {os.cpu_count()} CPU cores")
+    print(f"{'scenario':<10}{'requests':>10}{'seconds':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>10}")
+    for name, latencies, seconds in results:
+        print(f"{name:<10}{len(latencies):>10}{seconds:>9.1f}{statistics.median(latencies) * 1000:>9.1f}"
+              f"{percentile(latencies, 0.99) * 1000:>9.1f}{max(latencies) * 1000:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark parallel page extraction.
+
+Runs HandbookProcessor.extract_all_content (the non-streaming pipeline,
+HANDBOOK_STREAMING_PIPELINE=FALSE) serially and with each requested number of
+worker processes, checks that every run returns the same pages in the same
+order, and prints the wall time and pages per second of each. The streaming
+pipeline's text-only pass (iter_page_texts) is timed for reference.
+
+Usage (from camply-backend/):
+    python scripts/extraction_benchmark.py handbook.pdf [--workers 2 4] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handbook_reader.config import HandbookConfig
+from handbook_reader.pdf_processor import HandbookProcessor
+
+def extract(pdf_path: str, workers: int):
+    """Extract all content, returning (page texts in order, seconds)."""
+    started = time.perf_counter()
+    processor = HandbookProcessor(pdf_path)
+    try:
+        content = processor.extract_all_content(workers=workers)
+    finally:
+        processor.close()
+    seconds = time.perf_counter() - started
+    return [(page.page_number, page.text) for page in content["pages"]], seconds
+
+def stream(pdf_path: str) -> float:
+    """Consume iter_page_texts, returning the seconds taken."""
+    started = time.perf_counter()
+    processor = HandbookProcessor(pdf_path)
+    processor.open_document()
+    try:
+        for _ in processor.iter_page_texts():
+            pass
+    finally:
+        processor.close()
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdf")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--repeat", type=int, default=3, help="runs per configuration (best is reported)")
+    args = parser.parse_args()
+
+    # Below PARALLEL_MIN_PAGES extract_all_content always runs serially
+    HandbookConfig.PARALLEL_MIN_PAGES = 1
+
+    baseline = None
+    rows = []
+    for workers in [1] + args.workers:
+        best = None
+        for _ in range(args.repeat):
+            pages, seconds = extract(args.pdf, workers)
+            if baseline is None:
+                baseline = pages
+            elif pages != baseline:
+                raise SystemExit(f"{workers} workers returned different pages than the serial run")
+            best = seconds if best is None else min(best, seconds)
+        rows.append((f"{workers} worker(s)", best))
+    rows.append(("streaming text only", min(stream(args.pdf) for _ in range(args.repeat))))
+
+    print(f"{len(baseline)} pages, {os.cpu_count()} CPU cores; all runs returned identical pages")
+    print(f"{'extraction':<22}{'seconds':>10}{'pages/s':>10}{'speedup':>10}")
+    for label, seconds in rows:
+        print(f"{label:<22}{seconds:>10.2f}{len(baseline) / seconds:>10.0f}{rows[0][1] / seconds:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
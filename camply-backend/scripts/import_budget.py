@@ -0,0 +1,62 @@
+"""Import-time report and budget check for the bridge service.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter, prints the
+slowest top-level imports and exits non-zero when importing main takes longer
+than the budget.
+
+Usage (from camply-backend/):
+    python scripts/import_budget.py [--budget-ms 1000] [--module main] [--top 15]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+def measure(module: str):
+    """Return (module, self_us, cumulative_us, depth) for every import of a fresh `import module`."""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=backend_dir, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return imports
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1000")))
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    imports = measure(args.module)
+    total_ms = next(cumulative for name, _, cumulative, depth in imports
+                    if name == args.module and depth == 0) / 1000
+
+    print(f"Slowest imports under {args.module} (cumulative ms):")
+    direct = [entry for entry in imports if 1 <= entry[3] <= 2]
+    for name, _, cumulative, depth in sorted(direct, key=lambda entry: entry[2], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}  {'  ' * (depth - 1)}{name}")
+
+    heavy = [name for name, *_ in imports if name.split(".")[0] in ("pymupdf", "fitz", "spacy", "numpy", "supabase")]
+    if heavy:
+        print(f"Heavy packages imported at startup: {', '.join(sorted({name.split('.')[0] for name in heavy}))}")
+
+    print(f"import {args.module}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    if total_ms > args.budget_ms:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
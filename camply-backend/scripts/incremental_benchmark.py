@@ -0,0 +1,102 @@
+"""Benchmark incremental reprocessing of a revised handbook.
+
+Edits one page of a PDF (a sentence is added to it), then processes the
+revised copy twice: from scratch, and incrementally with the page index saved
+from the original. Checks that both give identical categorized content and
+prints the timings, which cover extraction (PyMuPDF), categorization and JSON
+formatting as in the job pipeline.
+
+Usage (from camply-backend/):
+    python scripts/incremental_benchmark.py handbook.pdf [--page 150]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pymupdf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from handbook_reader.content_extractor import ContentExtractor
+from handbook_reader.incremental import IncrementalCategorizer
+from handbook_reader.json_generator import HandbookJSONGenerator
+from handbook_reader.pdf_processor import HandbookProcessor
+from handbook_reader.segmentation import SentenceSegmenter
+
+EDIT = "Students must maintain a minimum attendance of eighty percent in every course."
+
+def edit_page(pdf_path: str, page_number: int) -> str:
+    """Write a copy of the PDF with a sentence added near the bottom of one page."""
+    doc = pymupdf.open(pdf_path)
+    page = doc[page_number - 1]
+    page.insert_text((72, page.rect.height - 72), EDIT, fontsize=10)
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    doc.save(path)
+    doc.close()
+    return path
+
+def new_extractor() -> ContentExtractor:
+    """Extractor with its own sentence segmenter, so no run reads another's memo."""
+    extractor = ContentExtractor()
+    extractor.segmenter = SentenceSegmenter()
+    extractor.segmenter.split("Warm up the sentence segmenter. It loads on first use.")
+    return extractor
+
+def process(pdf_path: str, page_index=None):
+    """Extract, categorize and format a PDF, returning (categorized content, database format, categorizer, seconds)."""
+    categorizer = IncrementalCategorizer(new_extractor(), page_index)
+    json_generator = HandbookJSONGenerator()
+    started = time.perf_counter()
+    processor = HandbookProcessor(pdf_path)
+    processor.open_document()
+    try:
+        categorized_content = categorizer.categorize_pages(processor.iter_page_texts())
+    finally:
+        processor.close()
+    database_format = json_generator.format_for_database(
+        json_generator.generate_handbook_json(categorized_content)
+    )
+    return categorized_content, database_format, categorizer, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdf")
+    parser.add_argument("--page", type=int, help="1-based page to edit (default: the middle page)")
+    args = parser.parse_args()
+
+    with pymupdf.open(args.pdf) as doc:
+        page_count = len(doc)
+    page_number = args.page or page_count // 2 + 1
+    revised_path = edit_page(args.pdf, page_number)
+
+    try:
+        _, original_format, original_categorizer, _ = process(args.pdf)
+        page_index = original_categorizer.get_page_index(original_format)
+
+        full, _, _, full_seconds = process(revised_path)
+        incremental, database_format, categorizer, incremental_seconds = process(revised_path, page_index)
+    finally:
+        os.unlink(revised_path)
+
+    for result in (full, incremental):
+        for data in result.values():
+            data['keyword_matches'] = sorted(data['keyword_matches'])
+    if incremental != full:
+        raise SystemExit("Incremental categorization differs from a full run")
+
+    stats = categorizer.stats
+    print(f"{page_count} pages, page {page_number} edited (identical categorized content)")
+    print(f"changed pages:    {stats['changed_pages']}/{stats['pages']}")
+    print(f"scored chunks:    {stats['rescored_chunks']}/{stats['chunks']}")
+    print(f"changed sections: {', '.join(categorizer.changed_sections(database_format)) or 'none'}")
+    print(f"full run:         {full_seconds:.2f}s")
+    print(f"incremental:      {incremental_seconds:.2f}s")
+    print(f"time saved:       {full_seconds - incremental_seconds:.2f}s "
+          f"({(1 - incremental_seconds / full_seconds) * 100:.0f}%)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark per-message /chat latency with and without the ADK session cache.
+
+Starts the stub ADK server (stub_adk.py) and sends messages through the
+bridge's /chat endpoint in-process, one at a time, several per session (a
+conversation). With the cache, only a session's first message makes the
+session create round trip; without it (cache size 0, the behaviour before the
+cache) every message does. Prints latency percentiles and ADK requests per
+message for both.
+
+Usage (from camply-backend/):
+    python scripts/session_cache_benchmark.py [--sessions 20] [--messages 10] [--latency-ms 20]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stub_adk import stub_adk_server
+import main as bridge
+from shared import Config
+from shared.cache import TTLCache
+
+async def converse(sessions: int, messages: int, cache_size: int):
+    """Send every session's messages in turn, returning per-message latencies."""
+    bridge.app.state.adk_client = bridge.create_adk_client()
+    bridge.app.state.adk_sessions = TTLCache(max_size=cache_size, ttl_seconds=Config.ADK_SESSION_CACHE_TTL)
+    latencies = []
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=bridge.app), base_url="http://bridge") as client:
+            for session in range(sessions):
+                for message in range(messages):
+                    started = time.perf_counter()
+                    response = await client.post("/chat", json={
+                        "message": f"Question {message}",
+                        "user_id": f"user-{session}",
+                        "session_id": f"session-{session}-{cache_size}"
+                    })
+                    latencies.append(time.perf_counter() - started)
+                    if not response.json()["success"]:
+                        raise SystemExit(f"Chat failed: {response.json()['error']}")
+    finally:
+        await bridge.app.state.adk_client.aclose()
+    return latencies
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=10, help="messages per session")
+    parser.add_argument("--latency-ms", type=float, default=20, help="simulated ADK latency per request")
+    args = parser.parse_args()
+    total = args.sessions * args.messages
+
+    with stub_adk_server(args.latency_ms) as (base_url, stub):
+        Config.ADK_SERVER_URL = base_url
+        results = []
+        for label, cache_size in (("no session cache", 0), ("session cache", Config.ADK_SESSION_CACHE_SIZE)):
+            stub.state.requests.clear()
+            # The bridge logs every request
+            with contextlib.redirect_stdout(io.StringIO()):
+                latencies = asyncio.run(converse(args.sessions, args.messages, cache_size))
+            results.append((label, latencies, sum(stub.state.requests.values()) / total))
+
+    print(f"{args.sessions} sessions x {args.messages} messages, stub ADK latency {args.latency_ms:.0f}ms")
+    print(f"{'':<18}{'mean ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'ADK req/msg':>13}")
+    for label, latencies, requests_per_message in results:
+        print(f"{label:<18}{statistics.mean(latencies) * 1000:>9.1f}{statistics.median(latencies) * 1000:>9.1f}"
+              f"{percentile(latencies, 0.95) * 1000:>9.1f}{requests_per_message:>13.2f}")
+
+if __name__ == "__main__":
+    main()
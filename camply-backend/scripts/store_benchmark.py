@@ -0,0 +1,152 @@
+"""Benchmark diff-aware handbook content writes.
+
+Processes a PDF and a copy with one page edited (see incremental_benchmark.py),
+then plans the writes HandbookDatabaseUpdater.store_processed_content makes
+for a first store, a no-op reprocess and a reprocess of the revised copy, and
+prints the request bytes and planning time (index builds and serialization;
+network time not included) of each next to a full rewrite. Also checks that
+the row derive_handbook_contents() would build from the partial write, as
+mirrored here, equals the fully rewritten row (apart from the last_updated
+timestamps of unchanged sections).
+
+No requests are made, but the Supabase client is created, so SUPABASE_URL and
+a key must be set.
+
+Usage (from camply-backend/):
+    python scripts/store_benchmark.py handbook.pdf [--page 150]
+"""
+
+import argparse
+import base64
+import os
+import sys
+import time
+
+import pymupdf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from incremental_benchmark import edit_page, new_extractor, process
+from handbook_reader.database_updater import HandbookDatabaseUpdater, json_size
+from shared.database import HANDBOOK_SECTIONS, handbook_content_hash, handbook_section_hash
+
+def stored_state(row, inline_sections=False):
+    """State handbook_content_state() returns for a handbook pointing at row."""
+    chunk_index = row["chunk_index"]
+    return {
+        "content_hash": row["content_hash"],
+        "stored": False,
+        "inline_sections": inline_sections,
+        "sections": {section: row[section].get("section_hash") for section in HANDBOOK_SECTIONS},
+        "chunk_index": {key: value for key, value in chunk_index.items() if key not in ("chunks", "vectors")}
+    }
+
+def derive_row(base, payload):
+    """Python mirror of derive_handbook_contents() and splice_chunk_index()."""
+    changed = payload["changed_sections"]
+    row = {
+        "content_hash": payload["new_content_hash"],
+        **{section: changed.get(section, base[section]) for section in HANDBOOK_SECTIONS},
+        "search_index": payload["new_search_index"],
+        "chunk_index": payload["new_chunk_index"]
+    }
+    if payload["chunk_index_partial"]:
+        chunk_index = payload["new_chunk_index"]
+        width = chunk_index["dim"] * 4
+        entries = []
+        for source, index in ((False, base["chunk_index"]), (True, chunk_index)):
+            vectors = base64.b64decode(index["vectors"])
+            for position, chunk in enumerate(index["chunks"]):
+                if (chunk[0] in changed) == source:
+                    entries.append((HANDBOOK_SECTIONS.index(chunk[0]), source, position,
+                                    chunk, vectors[position * width:(position + 1) * width]))
+        entries.sort(key=lambda entry: entry[:3])
+        row["chunk_index"] = {
+            "version": chunk_index["version"],
+            "model": chunk_index["model"],
+            "dim": chunk_index["dim"],
+            "chunks": [entry[3] for entry in entries],
+            "vectors": base64.b64encode(b"".join(entry[4] for entry in entries)).decode("ascii")
+        }
+    return row
+
+def without_timestamps(row):
+    """Row with each section's metadata.last_updated dropped (unchanged sections keep the stored one)."""
+    return {
+        key: {**value, "metadata": {k: v for k, v in value["metadata"].items() if k != "last_updated"}}
+        if key in HANDBOOK_SECTIONS else value
+        for key, value in row.items()
+    }
+
+def plan(updater, database_format, state):
+    """Plan a store as store_processed_content does, returning (write, bytes sent, seconds)."""
+    started = time.perf_counter()
+    sections = {
+        section: {**database_format[section], "section_hash": handbook_section_hash(database_format[section])}
+        for section in HANDBOOK_SECTIONS
+    }
+    content_hash = handbook_content_hash(sections)
+    write = updater.plan_content_write(sections, content_hash, state)
+    update_data = {
+        "processing_status": "completed",
+        "processed_date": updater.current_timestamp,
+        "updated_at": updater.current_timestamp,
+        "error_message": None
+    }
+    if state.get("content_hash") != content_hash:
+        update_data["content_hash"] = content_hash
+    if state.get("inline_sections"):
+        update_data.update({section: None for section in HANDBOOK_SECTIONS})
+    written = json_size(write["payload"]) if write["payload"] else 0
+    written += json_size(update_data)
+    return write, written, time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("pdf")
+    parser.add_argument("--page", type=int, help="1-based page to edit (default: the middle page)")
+    args = parser.parse_args()
+
+    with pymupdf.open(args.pdf) as doc:
+        page_count = len(doc)
+    page_number = args.page or page_count // 2 + 1
+    revised_path = edit_page(args.pdf, page_number)
+    try:
+        _, original, _, _ = process(args.pdf)
+        _, revised, _, _ = process(revised_path)
+    finally:
+        os.unlink(revised_path)
+
+    updater = HandbookDatabaseUpdater(new_extractor())
+    first, first_bytes, first_seconds = plan(updater, original, {})
+    base = first["payload"]
+
+    # Before diff-aware writes: an existing row was skipped, but every section
+    # column was nulled on the user row; changed content was sent in full
+    _, noop_before_bytes, noop_before_seconds = plan(updater, original, {"stored": True, "inline_sections": True})
+    noop, noop_bytes, noop_seconds = plan(updater, original, {**stored_state(base), "stored": True})
+    full, full_bytes, full_seconds = plan(updater, revised, {"inline_sections": True})
+    partial, partial_bytes, partial_seconds = plan(updater, revised, stored_state(base))
+
+    if partial["mode"] != "partial" or (
+        without_timestamps(derive_row(base, partial["payload"])) != without_timestamps(full["payload"])
+    ):
+        raise SystemExit("Partial write does not rebuild the fully written row")
+
+    print(f"{page_count} pages, page {page_number} edited; "
+          f"sections changed: {', '.join(partial['changed_sections']) or 'none'}")
+    print(f"derived row identical to a full rewrite "
+          f"(chunk index {'spliced' if partial['payload']['chunk_index_partial'] else 'sent in full'})")
+    print(f"{'store':<22}{'bytes':>12}{'seconds':>10}")
+    for label, written, seconds in (
+        ("first store", first_bytes, first_seconds),
+        ("no-op, before", noop_before_bytes, noop_before_seconds),
+        ("no-op, diff-aware", noop_bytes, noop_seconds),
+        ("revised, full", full_bytes, full_seconds),
+        ("revised, diff-aware", partial_bytes, partial_seconds),
+    ):
+        print(f"{label:<22}{written:>12,}{seconds:>10.2f}")
+    print(f"revised store sends {partial_bytes / full_bytes * 100:.0f}% of the full rewrite")
+
+if __name__ == "__main__":
+    main()
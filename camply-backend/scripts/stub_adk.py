@@ -0,0 +1,108 @@
+"""Local stand-in for the ADK server, used by the chat load tests.
+
+Serves the endpoints the bridge calls (session create, /run, /run_sse and /)
+on 127.0.0.1 from a background thread, with a fixed simulated latency per
+request. Sessions are kept in memory: creating an existing one answers 400
+"Session already exists" and running an unknown one answers 404, as ADK does.
+Counts every request by endpoint in `requests`.
+
+Run on its own to point a bridge at it:
+    python scripts/stub_adk.py [--port 8000] [--latency-ms 20]
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+
+REPLY = "Exams start on 1 December; the timetable is on the notice board."
+
+def model_event(text: str, partial: bool = False) -> dict:
+    return {"author": "student_desk", "content": {"role": "model", "parts": [{"text": text}]}, "partial": partial}
+
+def create_app(latency_ms: float = 20) -> FastAPI:
+    """Build the stub ADK app; its request counts are in app.state.requests."""
+    app = FastAPI()
+    app.state.requests = Counter()
+    sessions = set()
+
+    async def delay():
+        await asyncio.sleep(latency_ms / 1000)
+
+    @app.get("/")
+    async def root():
+        app.state.requests["health"] += 1
+        return {"status": "ok"}
+
+    @app.post("/apps/{app_name}/users/{user_id}/sessions/{session_id}")
+    async def create_session(app_name: str, user_id: str, session_id: str):
+        app.state.requests["session"] += 1
+        await delay()
+        if (user_id, session_id) in sessions:
+            return JSONResponse(status_code=400, content={"detail": "Session already exists"})
+        sessions.add((user_id, session_id))
+        return {"id": session_id, "userId": user_id, "appName": app_name}
+
+    @app.post("/run")
+    async def run(body: dict):
+        app.state.requests["run"] += 1
+        await delay()
+        if (body["userId"], body["sessionId"]) not in sessions:
+            return JSONResponse(status_code=404, content={"detail": "Session not found"})
+        return [model_event(REPLY)]
+
+    @app.post("/run_sse")
+    async def run_sse(body: dict):
+        app.state.requests["run_sse"] += 1
+        await delay()
+        if (body["userId"], body["sessionId"]) not in sessions:
+            return JSONResponse(status_code=404, content={"detail": "Session not found"})
+
+        async def events():
+            words = REPLY.split(" ")
+            for index, word in enumerate(words):
+                yield f"data: {json.dumps(model_event(word + (' ' if index < len(words) - 1 else ''), partial=True))}\n\n"
+            yield f"data: {json.dumps(model_event(REPLY))}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@contextmanager
+def stub_adk_server(latency_ms: float = 20, port: int = None):
+    """Run the stub in a background thread, yielding (base URL, app)."""
+    app = create_app(latency_ms)
+    port = port or free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f"http://127.0.0.1:{port}", app
+    finally:
+        server.should_exit = True
+        thread.join()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency_ms), host="127.0.0.1", port=args.port)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 """Shared services for Camply backend."""
 
 from .config import Config
-from .database import UserDataService
+from .database import UserDataService, HandbookDataService
+from .turn_context import TurnContext, get_turn_context
 
-__all__ = ["Config", "UserDataService"] 
\ No newline at end of file
+__all__ = ["Config", "UserDataService", "HandbookDataService", "TurnContext", "get_turn_context"] 
\ No newline at end of file
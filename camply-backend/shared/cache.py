@@ -0,0 +1,132 @@
+"""In-process caching utilities for Camply backend services."""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Size-bounded LRU cache whose entries expire after a fixed time-to-live."""
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 300):
+        """
+        Args:
+            max_size: Maximum number of entries; least recently used entries are evicted first
+            ttl_seconds: Seconds an entry stays valid after it is set
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a live entry and mark it recently used, or return default."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store an entry, evicting the least recently used ones past max_size."""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry[0] > time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop a single entry. Returns True if it was present."""
+        return self._entries.pop(key, None) is not None
+
+    def clear(self):
+        """Drop every entry."""
+        self._entries.clear()
+
+    def get_stats(self) -> dict:
+        """Get size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
+
+class AsyncTTLCache(TTLCache):
+    """TTLCache that loads misses through an async loader, coalescing concurrent misses.
+
+    While a key is being loaded, other callers asking for the same key await
+    the same in-flight fetch instead of issuing their own. None results are
+    not cached so lookups for missing rows are retried on the next call.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 300):
+        super().__init__(max_size=max_size, ttl_seconds=ttl_seconds)
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.coalesced = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, loading it with loader() on a miss."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        loop = asyncio.get_running_loop()
+        pending = self._in_flight.get(key)
+        if pending is not None and pending.get_loop() is loop:
+            self.coalesced += 1
+            return await asyncio.shield(pending)
+
+        task = asyncio.ensure_future(loader())
+        self._in_flight[key] = task
+        try:
+            value = await asyncio.shield(task)
+        finally:
+            still_current = self._in_flight.get(key) is task
+            if still_current:
+                del self._in_flight[key]
+
+        if still_current and value is not None:
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop an entry and detach any in-flight load so its result is not stored."""
+        detached = self._in_flight.pop(key, None) is not None
+        return super().invalidate(key) or detached
+
+    def clear(self):
+        """Drop every entry and detach all in-flight loads."""
+        self._in_flight.clear()
+        super().clear()
+
+    def get_stats(self) -> dict:
+        """Get size, hit/miss counters and the number of coalesced misses."""
+        stats = super().get_stats()
+        stats["coalesced"] = self.coalesced
+        stats["in_flight"] = len(self._in_flight)
+        return stats
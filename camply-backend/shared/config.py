@@ -12,9 +12,53 @@ class Config:
     SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY", "")
     SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
     
+    # Direct Postgres connection (optional, enables the asyncpg data path).
+    # Set DATABASE_STATEMENT_CACHE_SIZE=0 behind a transaction-mode pooler.
+    DATABASE_URL = os.getenv("DATABASE_URL", "")
+    DATABASE_STATEMENT_CACHE_SIZE = int(os.getenv("DATABASE_STATEMENT_CACHE_SIZE", "100"))
+    
     ADK_SERVER_URL = os.getenv("ADK_SERVER_URL", "http://localhost:8000")
     ADK_APP_NAME = os.getenv("ADK_APP_NAME", "student_desk")
     
+    # Shared HTTP client settings for bridge -> ADK calls
+    ADK_HTTP_TIMEOUT = float(os.getenv("ADK_HTTP_TIMEOUT", "30"))
+    ADK_HTTP_MAX_CONNECTIONS = int(os.getenv("ADK_HTTP_MAX_CONNECTIONS", "100"))
+    ADK_HTTP_MAX_KEEPALIVE = int(os.getenv("ADK_HTTP_MAX_KEEPALIVE", "20"))
+    ADK_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("ADK_HTTP_KEEPALIVE_EXPIRY", "30"))
+    ADK_HTTP2 = os.getenv("ADK_HTTP2", "FALSE").upper() == "TRUE"
+    
+    # Known ADK sessions, used to skip redundant session-create calls
+    ADK_SESSION_CACHE_SIZE = int(os.getenv("ADK_SESSION_CACHE_SIZE", "10000"))
+    ADK_SESSION_CACHE_TTL = float(os.getenv("ADK_SESSION_CACHE_TTL", "3600"))
+    
+    # User profile cache used by UserDataService.get_user_context. Profile edits
+    # made in the web app are not pushed to the backend, so agents can see the
+    # old profile for up to USER_CONTEXT_CACHE_TTL seconds.
+    USER_CONTEXT_CACHE_SIZE = int(os.getenv("USER_CONTEXT_CACHE_SIZE", "1000"))
+    USER_CONTEXT_CACHE_TTL = float(os.getenv("USER_CONTEXT_CACHE_TTL", "300"))
+    
+    # Handbook search indexes (BM25 and chunk vectors) kept in memory, keyed by
+    # handbook content hash
+    SEARCH_INDEX_CACHE_SIZE = int(os.getenv("SEARCH_INDEX_CACHE_SIZE", "64"))
+    SEARCH_INDEX_CACHE_TTL = float(os.getenv("SEARCH_INDEX_CACHE_TTL", "3600"))
+    
+    # Chunk embeddings for semantic retrieval: "hashing" (no model files) or a
+    # sentence-transformers model name (requires the 'sentence-transformers' package)
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "hashing")
+    EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "256"))
+    
+    # Handbook search ranking: "bm25" (in-process index, see shared/search_index.py)
+    # or "postgres" (ts_rank_cd over handbook_contents, see search_handbook_sections)
+    HANDBOOK_SEARCH_BACKEND = os.getenv("HANDBOOK_SEARCH_BACKEND", "bm25").lower()
+    
+    # Section tools send the LLM summary, key points and only the passages that
+    # best match the query, up to this many characters; 0 = full section content
+    SECTION_CONTEXT_MAX_CHARS = int(os.getenv("SECTION_CONTEXT_MAX_CHARS", "4000"))
+    
+    # Per-turn tool memo (see shared/turn_context.py)
+    TURN_CONTEXT_MAX_TURNS = int(os.getenv("TURN_CONTEXT_MAX_TURNS", "1000"))
+    TURN_CONTEXT_TTL = float(os.getenv("TURN_CONTEXT_TTL", "600"))
+    
     # CORS origins (comma-separated list)
     ALLOWED_ORIGINS = os.getenv(
         "ALLOWED_ORIGINS", 
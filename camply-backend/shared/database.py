@@ -1,39 +1,227 @@
 """Database operations for fetching user data from Supabase."""
 
-from supabase import create_client, Client
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, List, TYPE_CHECKING
+from contextlib import asynccontextmanager
 from .config import Config
+from .cache import AsyncTTLCache
+from .search_index import HandbookSearchIndex, split_passages
+import asyncio
 import asyncpg
-import os
+import hashlib
+import json
+import threading
 
-supabase: Client = create_client(Config.SUPABASE_URL, Config.get_supabase_backend_key())
+# The supabase SDK and NumPy (chunk vectors) are imported on first use to keep
+# service startup fast.
+if TYPE_CHECKING:
+    from supabase import AsyncClient, Client
+    from .vector_index import ChunkVectorIndex
 
-_connection_pool: Optional[asyncpg.Pool] = None
+_supabase: Optional["Client"] = None
+_supabase_lock = threading.Lock()
 
-async def get_database_connection():
-    """Get database connection from pool."""
-    global _connection_pool
+# One async client and creation lock per event loop (see get_async_supabase)
+_async_supabase_clients: Dict[asyncio.AbstractEventLoop, "AsyncClient"] = {}
+_async_supabase_locks: Dict[asyncio.AbstractEventLoop, asyncio.Lock] = {}
 
-    if _connection_pool is None:
-        database_url = os.getenv("DATABASE_URL")
-        if not database_url:
-            raise Exception("DATABASE_URL environment variable not set")
+# One asyncpg pool and creation lock per event loop (see get_connection_pool)
+_connection_pools: Dict[asyncio.AbstractEventLoop, asyncpg.Pool] = {}
+_connection_pool_locks: Dict[asyncio.AbstractEventLoop, asyncio.Lock] = {}
+_pool_lock = threading.Lock()
 
-        _connection_pool = await asyncpg.create_pool(
-            database_url,
-            min_size=1,
-            max_size=10,
-            command_timeout=60
-        )
+USER_CONTEXT_SQL = """
+    select
+        u.user_id, u.name, u.email, u.phone_number, u.profile_photo_url,
+        a.academic_id, a.college_id, a.department_name, a.branch_name,
+        a.admission_year, a.graduation_year, a.roll_number,
+        c.college_id as c_college_id, c.name as college_name, c.city, c.state,
+        c.university_name, c.college_website_url
+    from public.users u
+    left join public.user_academic_details a on a.academic_id = u.academic_id
+    left join public.colleges c on c.college_id = a.college_id
+    where u.user_id = $1
+"""
+
+HANDBOOK_SECTIONS = (
+    'basic_info', 'semester_structure', 'examination_rules',
+    'evaluation_criteria', 'attendance_policies', 'academic_calendar',
+    'course_details', 'assessment_methods', 'disciplinary_rules',
+    'graduation_requirements', 'fee_structure', 'facilities_rules'
+)
+
+HANDBOOK_ROW_COLUMNS = "handbook_id, original_filename, processed_date, upload_date, content_hash"
+
+# Processed sections live once per distinct handbook in handbook_contents and
+# user_handbooks rows point at them through content_hash. Rows written before
+# that still carry their sections inline, so reads select both and merge.
+HANDBOOK_CONTENT_EMBED = "handbook_content:handbook_contents"
+
+def handbook_section_columns(columns: List[str]) -> str:
+    """Project section columns from the user row and from its shared content row."""
+    projection = ", ".join(columns)
+    return f"{projection}, {HANDBOOK_CONTENT_EMBED}({projection})"
+
+def resolve_handbook_content(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill a user_handbooks row's section columns from its embedded shared content."""
+    shared_content = row.pop("handbook_content", None) or {}
+    for column, value in shared_content.items():
+        if row.get(column) is None:
+            row[column] = value
+    return row
+
+def handbook_section_hash(section: Optional[Dict[str, Any]]) -> str:
+    """
+    SHA-256 over a processed section as it is stored.
+    
+    Covers every field (content, summary, key points, scores, ...) in
+    canonical JSON, except metadata.last_updated, which changes on every run
+    without the section changing, and the stored section_hash itself.
+    """
+    section = {key: value for key, value in (section or {}).items() if key != "section_hash"}
+    metadata = section.get("metadata")
+    if isinstance(metadata, dict):
+        section["metadata"] = {key: value for key, value in metadata.items() if key != "last_updated"}
+    
+    canonical = json.dumps(section, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def handbook_content_hash(sections: Dict[str, Any]) -> str:
+    """
+    Content address of a processed handbook.
+    
+    SHA-256 over the handbook_section_hash() of every section in
+    HANDBOOK_SECTIONS order, so two runs share a row only if everything
+    stored for them is the same, not just the section text.
+    """
+    return hashlib.sha256("\x1f".join(
+        handbook_section_hash(sections.get(section)) for section in HANDBOOK_SECTIONS
+    ).encode("utf-8")).hexdigest()
+
+# Only each section's metadata object is projected, so content and
+# searchable_text never leave the database. Every extra JSON path costs
+# another detoast of the column, hence one path per section.
+HANDBOOK_MANIFEST_COLUMNS = ", ".join([
+    HANDBOOK_ROW_COLUMNS,
+    handbook_section_columns([
+        f"{section}_metadata:{section}->metadata"
+        for section in HANDBOOK_SECTIONS
+    ])
+])
+
+async def get_connection_pool() -> asyncpg.Pool:
+    """Get the asyncpg pool for the running event loop, creating it on first use.
 
-    return await _connection_pool.acquire()
+    asyncpg connections belong to the loop that opened them, so each loop gets
+    its own pool, as with get_async_supabase(). Pools of loops that have since
+    closed are dropped when a new loop asks for one.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _connection_pools.get(loop)
+    if pool is None:
+        with _pool_lock:
+            for closed_loop in [other for other in _connection_pool_locks if other.is_closed()]:
+                _connection_pool_locks.pop(closed_loop, None)
+                _connection_pools.pop(closed_loop, None)
+            lock = _connection_pool_locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            pool = _connection_pools.get(loop)
+            if pool is None:
+                if not Config.DATABASE_URL:
+                    raise Exception("DATABASE_URL environment variable not set")
+
+                pool = await asyncpg.create_pool(
+                    Config.DATABASE_URL,
+                    min_size=1,
+                    max_size=10,
+                    command_timeout=60,
+                    statement_cache_size=Config.DATABASE_STATEMENT_CACHE_SIZE
+                )
+                _connection_pools[loop] = pool
+
+    return pool
+
+@asynccontextmanager
+async def get_database_connection() -> AsyncIterator[asyncpg.Connection]:
+    """Acquire a pooled connection and release it when the block exits."""
+    pool = await get_connection_pool()
+    async with pool.acquire() as connection:
+        yield connection
 
 async def close_connection_pool():
-    """Close the connection pool."""
-    global _connection_pool
-    if _connection_pool:
-        await _connection_pool.close()
-        _connection_pool = None
+    """Close the current event loop's connection pool, if it has one."""
+    pool = _connection_pools.pop(asyncio.get_running_loop(), None)
+    if pool:
+        await pool.close()
+
+def get_supabase() -> "Client":
+    """
+    Get the shared synchronous Supabase client, creating it on first use.
+    
+    Only for blocking code (handbook processing worker threads); coroutines
+    use get_async_supabase() so queries never block the event loop.
+    """
+    global _supabase
+    
+    if _supabase is None:
+        with _supabase_lock:
+            if _supabase is None:
+                from supabase import create_client
+                _supabase = create_client(Config.SUPABASE_URL, Config.get_supabase_backend_key())
+    
+    return _supabase
+
+async def get_async_supabase() -> "AsyncClient":
+    """
+    Get the shared async Supabase client, creating it on first use.
+    
+    All PostgREST calls made by coroutines go through this client and reuse
+    its pooled HTTP connections. Connections belong to the event loop that
+    opened them, so each loop (e.g. one per asyncio.run call, or a loop in
+    another thread) gets its own client; loops running at the same time
+    never share or replace each other's client. Clients of loops that have
+    since closed are dropped when a new loop asks for one.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_supabase_clients.get(loop)
+    if client is None:
+        with _supabase_lock:
+            for closed_loop in [other for other in _async_supabase_locks if other.is_closed()]:
+                _async_supabase_locks.pop(closed_loop, None)
+                _async_supabase_clients.pop(closed_loop, None)
+            lock = _async_supabase_locks.setdefault(loop, asyncio.Lock())
+        async with lock:
+            client = _async_supabase_clients.get(loop)
+            if client is None:
+                from supabase import acreate_client
+                client = await acreate_client(Config.SUPABASE_URL, Config.get_supabase_backend_key())
+                _async_supabase_clients[loop] = client
+    
+    return client
+
+async def close_async_supabase():
+    """Close the current event loop's async Supabase client, if it has one.
+    
+    Call before the loop ends (e.g. in the app's shutdown handler): its
+    connections cannot be closed once the loop is gone.
+    """
+    client = _async_supabase_clients.pop(asyncio.get_running_loop(), None)
+    if client:
+        await client.postgrest.aclose()
+
+_user_context_cache = AsyncTTLCache(
+    max_size=Config.USER_CONTEXT_CACHE_SIZE,
+    ttl_seconds=Config.USER_CONTEXT_CACHE_TTL
+)
+
+_search_index_cache = AsyncTTLCache(
+    max_size=Config.SEARCH_INDEX_CACHE_SIZE,
+    ttl_seconds=Config.SEARCH_INDEX_CACHE_TTL
+)
+
+_chunk_index_cache = AsyncTTLCache(
+    max_size=Config.SEARCH_INDEX_CACHE_SIZE,
+    ttl_seconds=Config.SEARCH_INDEX_CACHE_TTL
+)
 
 class UserDataService:
     """Service for fetching user data from Supabase."""
@@ -43,6 +231,114 @@ class UserDataService:
         """
         Fetch user basic details, academic details, and college information.
         
+        Results are cached per user_id (see USER_CONTEXT_CACHE_TTL) and concurrent
+        lookups for the same user share one database fetch. The returned dict is
+        shared between callers and must not be mutated.
+        
+        Profiles are written by the web app straight to Supabase, so the backend
+        is never told about a change: an edited profile reaches the agents once
+        the cached entry expires, up to USER_CONTEXT_CACHE_TTL seconds later.
+        
+        Args:
+            user_id: UUID of the authenticated user
+            
+        Returns:
+            Dictionary containing user context or None if not found
+        """
+        return await _user_context_cache.get_or_load(
+            user_id, lambda: UserDataService.fetch_user_context(user_id)
+        )
+    
+    @staticmethod
+    async def fetch_user_context(user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch user context straight from the database, bypassing the cache.
+        
+        Uses the single-query asyncpg path when DATABASE_URL is configured and
+        falls back to PostgREST if it is not set or the query fails.
+        
+        Args:
+            user_id: UUID of the authenticated user
+            
+        Returns:
+            Dictionary containing user context or None if not found
+        """
+        if Config.DATABASE_URL:
+            try:
+                return await UserDataService.fetch_user_context_sql(user_id)
+            except Exception as e:
+                print(f"asyncpg user context fetch failed, falling back to PostgREST: {e}")
+        
+        return await UserDataService.fetch_user_context_postgrest(user_id)
+    
+    @staticmethod
+    async def fetch_user_context_sql(user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch user, academic details and college in one joined query over asyncpg.
+        
+        The statement is prepared once per pooled connection through asyncpg's
+        statement cache. Returns the same shape as fetch_user_context_postgrest.
+        
+        Args:
+            user_id: UUID of the authenticated user
+            
+        Returns:
+            Dictionary containing user context or None if not found
+        """
+        async with get_database_connection() as connection:
+            row = await connection.fetchrow(USER_CONTEXT_SQL, user_id)
+        
+        if row is None:
+            print(f"No user found with ID: {user_id}")
+            return None
+        
+        user = {
+            "user_id": str(row["user_id"]),
+            "name": row["name"],
+            "email": row["email"],
+            "phone_number": row["phone_number"],
+            "profile_photo_url": row["profile_photo_url"]
+        }
+        
+        if row["academic_id"] is None:
+            return {"user": user, "academic_details": None, "college": None}
+        
+        return {
+            "user": user,
+            "academic_details": {
+                "academic_id": str(row["academic_id"]),
+                "college_id": str(row["college_id"]) if row["college_id"] else None,
+                "department_name": row["department_name"],
+                "branch_name": row["branch_name"],
+                "admission_year": row["admission_year"],
+                "graduation_year": row["graduation_year"],
+                "roll_number": row["roll_number"]
+            },
+            "college": {
+                "college_id": str(row["c_college_id"]),
+                "name": row["college_name"],
+                "city": row["city"],
+                "state": row["state"],
+                "university_name": row["university_name"],
+                "college_website_url": row["college_website_url"]
+            } if row["c_college_id"] else None
+        }
+    
+    @staticmethod
+    def clear_user_context_cache():
+        """Drop all cached user contexts."""
+        _user_context_cache.clear()
+    
+    @staticmethod
+    def get_user_context_cache_stats() -> Dict[str, Any]:
+        """Get hit/miss counters for the user context cache."""
+        return _user_context_cache.get_stats()
+    
+    @staticmethod
+    async def fetch_user_context_postgrest(user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch user context with two sequential PostgREST queries.
+        
         Args:
             user_id: UUID of the authenticated user
             
@@ -50,7 +346,8 @@ class UserDataService:
             Dictionary containing user context or None if not found
         """
         try:
-            user_response = supabase.table("users").select("*").eq("user_id", user_id).execute()
+            client = await get_async_supabase()
+            user_response = await client.table("users").select("*").eq("user_id", user_id).execute()
             
             if not user_response.data:
                 print(f"No user found with ID: {user_id}")
@@ -59,7 +356,7 @@ class UserDataService:
             user_data = user_response.data[0]
             
             if user_data.get("academic_id"):
-                academic_response = supabase.table("user_academic_details").select(
+                academic_response = await client.table("user_academic_details").select(
                     "*, colleges(*)"
                 ).eq("academic_id", user_data["academic_id"]).execute()
                 
@@ -122,7 +419,8 @@ class UserDataService:
             Dictionary containing campus AI content or None if not found
         """
         try:
-            response = supabase.table("campus_ai_content").select("*").eq("college_id", college_id).eq("is_active", True).order("updated_at", desc=True).limit(1).execute()
+            client = await get_async_supabase()
+            response = await client.table("campus_ai_content").select("*").eq("college_id", college_id).eq("is_active", True).order("updated_at", desc=True).limit(1).execute()
             
             if not response.data:
                 print(f"No campus AI content found for college ID: {college_id}")
@@ -266,4 +564,360 @@ class UserDataService:
         content_parts.append(f"\nContent Version: {campus_content.get('content_version', 1)}")
         content_parts.append(f"Last Updated: {campus_content.get('updated_at', 'N/A')}")
         
-        return "\n".join(content_parts) 
\ No newline at end of file
+        return "\n".join(content_parts)
+
+
+class HandbookDataService:
+    """Service for reading processed handbooks without pulling every section body."""
+    
+    @staticmethod
+    def _build_manifest(row: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a manifest projection row into {handbook fields, sections: {...}}."""
+        sections = {}
+        for section in HANDBOOK_SECTIONS:
+            metadata = row.get(f"{section}_metadata")
+            if not isinstance(metadata, dict):
+                continue
+            
+            sections[section] = {
+                "word_count": metadata.get("word_count", 0),
+                "quality_score": metadata.get("quality_score", 0.0),
+                "confidence_score": metadata.get("confidence_score", 0.0)
+            }
+        
+        return {
+            "handbook_id": row["handbook_id"],
+            "content_hash": row.get("content_hash"),
+            "original_filename": row.get("original_filename"),
+            "processed_date": row.get("processed_date"),
+            "upload_date": row.get("upload_date"),
+            "sections": sections
+        }
+    
+    @staticmethod
+    async def get_handbook_manifests(user_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Fetch per-section manifests for a user's completed handbooks, newest first.
+        
+        A manifest carries each section's word count, quality and confidence
+        scores, but not its content. Sections without metadata are left out.
+        
+        Args:
+            user_id: UUID of the authenticated user
+            limit: Maximum number of handbooks to return, all if None
+            
+        Returns:
+            List of manifest dictionaries (empty on error)
+        """
+        try:
+            client = await get_async_supabase()
+            query = client.table('user_handbooks') \
+                .select(HANDBOOK_MANIFEST_COLUMNS) \
+                .eq('user_id', user_id) \
+                .eq('processing_status', 'completed') \
+                .order('upload_date', desc=True)
+            if limit:
+                query = query.limit(limit)
+            response = await query.execute()
+            
+            return [
+                HandbookDataService._build_manifest(resolve_handbook_content(row))
+                for row in response.data or []
+            ]
+            
+        except Exception as e:
+            print(f"Error fetching handbook manifests: {e}")
+            return []
+    
+    @staticmethod
+    async def get_latest_handbook_manifest(user_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch the manifest of the user's most recently uploaded completed handbook."""
+        manifests = await HandbookDataService.get_handbook_manifests(user_id, limit=1)
+        return manifests[0] if manifests else None
+    
+    @staticmethod
+    async def get_handbook_section(handbook_id: str, section: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch one full section column of a handbook.
+        
+        Args:
+            handbook_id: UUID of the handbook
+            section: One of HANDBOOK_SECTIONS
+            
+        Returns:
+            Row with the handbook fields and the section column, or None
+        """
+        if section not in HANDBOOK_SECTIONS:
+            raise ValueError(f"Unknown handbook section: {section}")
+        
+        try:
+            client = await get_async_supabase()
+            response = await client.table('user_handbooks') \
+                .select(f"{HANDBOOK_ROW_COLUMNS}, {handbook_section_columns([section])}") \
+                .eq('handbook_id', handbook_id) \
+                .limit(1) \
+                .execute()
+            return resolve_handbook_content(response.data[0]) if response.data else None
+            
+        except Exception as e:
+            print(f"Error fetching handbook section {section}: {e}")
+            return None
+    
+    @staticmethod
+    async def get_handbook_section_columns(handbook_id: str, sections: List[str]) -> Optional[Dict[str, Any]]:
+        """
+        Fetch several full section columns of one handbook in a single query.
+        
+        Args:
+            handbook_id: UUID of the handbook
+            sections: Section columns to read
+            
+        Returns:
+            Row with the handbook fields and the requested sections, or None
+        """
+        sections = [section for section in sections if section in HANDBOOK_SECTIONS]
+        if not sections:
+            return None
+        
+        try:
+            client = await get_async_supabase()
+            response = await client.table('user_handbooks') \
+                .select(f"{HANDBOOK_ROW_COLUMNS}, {handbook_section_columns(sections)}") \
+                .eq('handbook_id', handbook_id) \
+                .limit(1) \
+                .execute()
+            return resolve_handbook_content(response.data[0]) if response.data else None
+            
+        except Exception as e:
+            print(f"Error fetching handbook sections {', '.join(sections)}: {e}")
+            return None
+    
+    @staticmethod
+    async def get_latest_handbook_with_section(user_id: str, section: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the newest completed handbook of a user whose section is not null.
+
+        A single LIMIT 1 query: the section is matched on the user row (inline
+        sections) or on its shared content row, so older uploads are only read
+        up to the first one that has the section.
+
+        Args:
+            user_id: UUID of the authenticated user
+            section: One of HANDBOOK_SECTIONS
+
+        Returns:
+            Row with the handbook fields and the section column, or None
+        """
+        if section not in HANDBOOK_SECTIONS:
+            raise ValueError(f"Unknown handbook section: {section}")
+
+        embed = HANDBOOK_CONTENT_EMBED.split(":")[0]
+        try:
+            client = await get_async_supabase()
+            response = await client.table('user_handbooks') \
+                .select(f"{HANDBOOK_ROW_COLUMNS}, {handbook_section_columns([section])}") \
+                .eq('user_id', user_id) \
+                .eq('processing_status', 'completed') \
+                .not_.is_(f"{embed}.{section}", "null") \
+                .or_(f"{section}.not.is.null,{embed}.not.is.null") \
+                .order('upload_date', desc=True) \
+                .limit(1) \
+                .execute()
+            return resolve_handbook_content(response.data[0]) if response.data else None
+
+        except Exception as e:
+            print(f"Error fetching latest handbook with section {section}: {e}")
+            return None
+
+    @staticmethod
+    async def get_handbook_sections(user_id: str, sections: List[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch selected full section columns for a user's completed handbooks in one query.
+        
+        Args:
+            user_id: UUID of the authenticated user
+            sections: Section columns to read
+            
+        Returns:
+            Rows with the handbook fields and the requested sections, newest first
+            (empty on error)
+        """
+        sections = [section for section in sections if section in HANDBOOK_SECTIONS]
+        if not sections:
+            return []
+        
+        try:
+            client = await get_async_supabase()
+            response = await client.table('user_handbooks') \
+                .select(f"{HANDBOOK_ROW_COLUMNS}, {handbook_section_columns(sections)}") \
+                .eq('user_id', user_id) \
+                .eq('processing_status', 'completed') \
+                .order('upload_date', desc=True) \
+                .execute()
+            return [resolve_handbook_content(row) for row in response.data or []]
+            
+        except Exception as e:
+            print(f"Error fetching handbook sections: {e}")
+            return []
+    
+    @staticmethod
+    async def get_search_index(handbook: Dict[str, Any]) -> Optional[HandbookSearchIndex]:
+        """
+        Get the search index of a handbook, loading it on first use.
+        
+        Indexes are stored with the shared content and cached in memory by
+        content hash, which never changes for the same content. Handbooks
+        without a stored index (processed before indexing, or with inline
+        sections) get one built from their sections.
+        
+        Args:
+            handbook: Manifest or row with handbook_id and content_hash
+            
+        Returns:
+            HandbookSearchIndex or None if the handbook has no content
+        """
+        content_hash = handbook.get("content_hash")
+        cache_key = content_hash or f"handbook:{handbook['handbook_id']}"
+        return await _search_index_cache.get_or_load(
+            cache_key, lambda: HandbookDataService.fetch_search_index(handbook["handbook_id"], content_hash)
+        )
+    
+    @staticmethod
+    async def fetch_search_index(handbook_id: str, content_hash: Optional[str]) -> Optional[HandbookSearchIndex]:
+        """Load a stored search index, or build one from the handbook's sections."""
+        try:
+            client = await get_async_supabase()
+            if content_hash:
+                response = await client.table('handbook_contents') \
+                    .select('search_index') \
+                    .eq('content_hash', content_hash) \
+                    .limit(1) \
+                    .execute()
+                if response.data:
+                    index = HandbookSearchIndex.from_dict(response.data[0].get("search_index"))
+                    if index is not None:
+                        return index
+            
+            response = await client.table('user_handbooks') \
+                .select(f"handbook_id, {handbook_section_columns(list(HANDBOOK_SECTIONS))}") \
+                .eq('handbook_id', handbook_id) \
+                .limit(1) \
+                .execute()
+            if not response.data:
+                return None
+            
+            row = resolve_handbook_content(response.data[0])
+            return HandbookSearchIndex.build({section: row.get(section) for section in HANDBOOK_SECTIONS})
+            
+        except Exception as e:
+            print(f"Error loading handbook search index: {e}")
+            return None
+    
+    @staticmethod
+    async def search_handbook_sections(content_hashes: List[str], query: str,
+                                       limit: int = 5) -> Optional[List[Dict[str, Any]]]:
+        """
+        Rank shared handbook sections with Postgres full-text search.
+        
+        Ranking (ts_rank_cd over weighted title/summary/key_points/content
+        vectors) and snippet extraction run in the database, so only the top
+        matches are transferred. The query accepts web-search syntax:
+        "quoted phrases", or, -excluded.
+        
+        Args:
+            content_hashes: Shared contents to search
+            query: Search query
+            limit: Maximum number of sections to return
+            
+        Returns:
+            Rows with content_hash, section, rank and snippet, best first,
+            or None if the search could not run
+        """
+        if not content_hashes:
+            return []
+        
+        try:
+            client = await get_async_supabase()
+            response = await client.rpc("search_handbook_sections", {
+                "content_hashes": content_hashes,
+                "search_query": query,
+                "match_limit": limit
+            }).execute()
+            return response.data or []
+            
+        except Exception as e:
+            print(f"Error running handbook full-text search: {e}")
+            return None
+    
+    @staticmethod
+    async def get_chunk_index(handbook: Dict[str, Any]) -> Optional["ChunkVectorIndex"]:
+        """
+        Get the chunk embedding index of a handbook, loading it on first use.
+        
+        Like get_search_index, indexes are cached in memory by content hash.
+        A stored index made by a different embedder is re-embedded from its
+        chunk texts; handbooks without one are chunked into passages and
+        embedded on demand.
+        
+        Args:
+            handbook: Manifest or row with handbook_id and content_hash
+            
+        Returns:
+            ChunkVectorIndex or None if the handbook has no content
+        """
+        content_hash = handbook.get("content_hash")
+        cache_key = content_hash or f"handbook:{handbook['handbook_id']}"
+        return await _chunk_index_cache.get_or_load(
+            cache_key, lambda: HandbookDataService.fetch_chunk_index(handbook["handbook_id"], content_hash)
+        )
+    
+    @staticmethod
+    async def fetch_chunk_index(handbook_id: str, content_hash: Optional[str]) -> Optional["ChunkVectorIndex"]:
+        """Load a stored chunk index, or embed one from the handbook's sections."""
+        from .embeddings import get_embedder
+        from .vector_index import ChunkVectorIndex
+        
+        embedder = get_embedder()
+        try:
+            client = await get_async_supabase()
+            if content_hash:
+                response = await client.table('handbook_contents') \
+                    .select('chunk_index') \
+                    .eq('content_hash', content_hash) \
+                    .limit(1) \
+                    .execute()
+                if response.data:
+                    index = ChunkVectorIndex.from_dict(response.data[0].get("chunk_index"))
+                    if index is not None and index.model == embedder.name:
+                        return index
+                    if index is not None:
+                        return await asyncio.to_thread(ChunkVectorIndex.build, index.chunks, embedder)
+            
+            response = await client.table('user_handbooks') \
+                .select(f"handbook_id, {handbook_section_columns(list(HANDBOOK_SECTIONS))}") \
+                .eq('handbook_id', handbook_id) \
+                .limit(1) \
+                .execute()
+            if not response.data:
+                return None
+            
+            row = resolve_handbook_content(response.data[0])
+            chunks = [
+                (section, passage)
+                for section in HANDBOOK_SECTIONS
+                for passage in split_passages((row.get(section) or {}).get("content") or "")
+                if passage
+            ]
+            return await asyncio.to_thread(ChunkVectorIndex.build, chunks, embedder)
+            
+        except Exception as e:
+            print(f"Error loading handbook chunk index: {e}")
+            return None
+    
+    @staticmethod
+    def get_search_index_cache_stats() -> Dict[str, Any]:
+        """Get hit/miss counters for the search index caches."""
+        return {
+            "bm25": _search_index_cache.get_stats(),
+            "chunk_vectors": _chunk_index_cache.get_stats()
+        }
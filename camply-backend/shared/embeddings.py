@@ -0,0 +1,80 @@
+"""Text embedding models for semantic handbook retrieval."""
+
+import math
+import zlib
+from typing import List, Optional
+
+import numpy as np
+
+from .config import Config
+from .search_index import STOPWORDS, tokenize
+
+class HashingEmbedder:
+    """Deterministic hashing-vectorizer embedding with no model files.
+
+    Unigrams and adjacent-word bigrams (stopwords dropped) are hashed with
+    CRC32 into a fixed number of signed buckets, weighted by 1 + log(tf) and
+    L2-normalized. Vectors are identical across processes and machines, so
+    indexes built at processing time match query vectors built by the agent.
+    """
+
+    def __init__(self, dim: int = None):
+        self.dim = dim or Config.EMBEDDING_DIM
+        self.name = f"hashing-{self.dim}"
+
+    def _features(self, text: str) -> dict:
+        words = [token for token in tokenize(text) if token not in STOPWORDS]
+        counts = {}
+        for feature in words + [f"{a} {b}" for a, b in zip(words, words[1:])]:
+            counts[feature] = counts.get(feature, 0) + 1
+        return counts
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts into an (n, dim) float32 array of unit vectors."""
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, count in self._features(text).items():
+                digest = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                vectors[row, digest % self.dim] += sign * (1.0 + math.log(count))
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+class SentenceTransformerEmbedder:
+    """Local sentence-transformers model (optional dependency)."""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"st:{model_name}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed texts into an (n, dim) float32 array of unit vectors."""
+        return self.model.encode(
+            texts, batch_size=32, normalize_embeddings=True, convert_to_numpy=True
+        ).astype(np.float32)
+
+_embedder = None
+
+def get_embedder():
+    """Get the process-wide embedder selected by EMBEDDING_MODEL ("hashing" or a sentence-transformers model)."""
+    global _embedder
+
+    if _embedder is None:
+        model_name = Config.EMBEDDING_MODEL
+        if model_name and model_name != "hashing":
+            try:
+                _embedder = SentenceTransformerEmbedder(model_name)
+            except ImportError:
+                print(f"Embedding model '{model_name}' requested but 'sentence-transformers' is not installed; using hashing embeddings")
+            except Exception as e:
+                print(f"Failed to load embedding model '{model_name}', using hashing embeddings: {e}")
+
+        if _embedder is None:
+            _embedder = HashingEmbedder()
+
+    return _embedder
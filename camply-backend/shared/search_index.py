@@ -0,0 +1,273 @@
+"""Inverted index with BM25 ranking over processed handbook sections."""
+
+import heapq
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+INDEX_VERSION = 1
+
+TOKEN = re.compile(r"[a-z0-9]+")
+PHRASE = re.compile(r'"([^"]+)"')
+PARAGRAPH_BREAK = re.compile(r"\n[^\S\n]*\n")
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from
+further had has have having he her here hers him his how i if in into is it its itself
+just may me might more most must my no nor not of off on once only or other our ours out
+over own same shall she should so some such than that the their theirs them then there
+these they this those through to too under until up upon very was we were what when where
+which while who whom why will with would you your yours
+""".split())
+
+# BM25 parameters (Robertson/Sparck Jones defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+PASSAGE_WORDS = 120
+SNIPPET_CHARS = 240
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens, stopwords included so positions stay aligned."""
+    return TOKEN.findall(text.lower())
+
+def split_passages(content: str, max_words: int = PASSAGE_WORDS) -> Iterable[str]:
+    """Split section content on paragraph breaks, windowing paragraphs longer than max_words."""
+    for paragraph in PARAGRAPH_BREAK.split(content):
+        words = paragraph.split()
+        for start in range(0, len(words), max_words):
+            yield " ".join(words[start:start + max_words])
+
+class HandbookSearchIndex:
+    """Passage-level inverted index for one processed handbook.
+
+    Each section's content is split into passages of at most PASSAGE_WORDS
+    words. Postings map a term to the passages containing it together with the
+    term's token positions, which serve both BM25 term frequencies and phrase
+    matching. The index round-trips through to_dict()/from_dict() so it can be
+    stored as JSON next to the handbook; stored postings are kept as one
+    compact string per term and only decoded when a query uses the term.
+    """
+
+    def __init__(self, passages: List[Tuple[str, str]], lengths: List[int],
+                 postings: Dict[str, List[Tuple[int, List[int]]]] = None,
+                 encoded_postings: Dict[str, str] = None):
+        self.passages = passages
+        self.lengths = lengths
+        self.avg_length = (sum(lengths) / len(lengths)) if lengths else 0.0
+        self._postings = postings if postings is not None else {}
+        self._encoded_postings = encoded_postings if encoded_postings is not None else {}
+
+    @classmethod
+    def build(cls, sections: Dict[str, Any]) -> "HandbookSearchIndex":
+        """Index the content text of every section in a processed handbook.
+
+        Args:
+            sections: Mapping of section name to processed section data
+
+        Returns:
+            A new HandbookSearchIndex
+        """
+        passages = []
+        lengths = []
+        postings: Dict[str, List[Tuple[int, List[int]]]] = {}
+
+        for section, section_data in sections.items():
+            content = (section_data or {}).get("content") if isinstance(section_data, dict) else None
+            if not content:
+                continue
+
+            for passage in split_passages(content):
+                passage_id = len(passages)
+                positions: Dict[str, List[int]] = {}
+                for position, token in enumerate(tokenize(passage)):
+                    if token not in STOPWORDS:
+                        positions.setdefault(token, []).append(position)
+                if not positions:
+                    continue
+
+                passages.append((section, passage))
+                lengths.append(sum(len(term_positions) for term_positions in positions.values()))
+                for term, term_positions in positions.items():
+                    postings.setdefault(term, []).append((passage_id, term_positions))
+
+        return cls(passages, lengths, postings=postings)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Optional["HandbookSearchIndex"]:
+        """Load an index produced by to_dict(), or None if it is missing or outdated."""
+        if not data or data.get("version") != INDEX_VERSION:
+            return None
+        return cls(
+            [tuple(passage) for passage in data["passages"]],
+            data["lengths"],
+            encoded_postings=data["postings"]
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the index to JSON-compatible data.
+
+        Postings are encoded as "passage:pos,pos;passage:pos" strings, which
+        parse far faster than nested JSON arrays.
+        """
+        encoded = dict(self._encoded_postings)
+        for term, postings in self._postings.items():
+            encoded[term] = ";".join(
+                f"{passage_id}:{','.join(map(str, positions))}"
+                for passage_id, positions in postings
+            )
+
+        return {
+            "version": INDEX_VERSION,
+            "passages": [list(passage) for passage in self.passages],
+            "lengths": self.lengths,
+            "postings": encoded
+        }
+
+    def postings(self, term: str) -> List[Tuple[int, List[int]]]:
+        """Get (passage_id, positions) pairs for a term, decoding stored postings on first use."""
+        postings = self._postings.get(term)
+        if postings is None:
+            encoded = self._encoded_postings.get(term)
+            if encoded is None:
+                return []
+            postings = []
+            for entry in encoded.split(";"):
+                passage_id, positions = entry.split(":")
+                postings.append((int(passage_id), [int(position) for position in positions.split(",")]))
+            self._postings[term] = postings
+        return postings
+
+    def search(self, query: str, limit: int = 10, sections: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Rank passages against a query with BM25.
+
+        Double-quoted parts of the query are phrases: only passages containing
+        every phrase are returned. All other words are matched independently.
+
+        Args:
+            query: Free-text query, optionally with "quoted phrases"
+            limit: Maximum number of hits to return
+            sections: Restrict hits to these sections (all if None)
+
+        Returns:
+            Hits ordered by descending score, each with section, passage_id,
+            score and snippet
+        """
+        phrases = [tokenize(phrase) for phrase in PHRASE.findall(query)]
+        phrases = [phrase for phrase in phrases if any(token not in STOPWORDS for token in phrase)]
+        terms = {token for token in tokenize(query) if token not in STOPWORDS}
+        if not terms:
+            return []
+
+        allowed = set(sections) if sections is not None else None
+        passage_count = len(self.passages)
+        scores: Dict[int, float] = {}
+
+        for term in terms:
+            postings = self.postings(term)
+            if not postings:
+                continue
+
+            idf = math.log(1 + (passage_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for passage_id, positions in postings:
+                if allowed is not None and self.passages[passage_id][0] not in allowed:
+                    continue
+                tf = len(positions)
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[passage_id] / self.avg_length)
+                scores[passage_id] = scores.get(passage_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        if phrases:
+            phrase_positions = {
+                token: dict(self.postings(token))
+                for phrase in phrases for token in phrase if token not in STOPWORDS
+            }
+            scores = {
+                passage_id: score for passage_id, score in scores.items()
+                if all(self._contains_phrase(passage_id, phrase, phrase_positions) for phrase in phrases)
+            }
+
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [
+            {
+                "section": self.passages[passage_id][0],
+                "passage_id": passage_id,
+                "score": round(score, 3),
+                "snippet": self.snippet(passage_id, terms, phrases)
+            }
+            for passage_id, score in top
+        ]
+
+    @staticmethod
+    def _contains_phrase(passage_id: int, phrase: List[str],
+                         phrase_positions: Dict[str, Dict[int, List[int]]]) -> bool:
+        """Check that the phrase's non-stopword tokens occur at matching offsets."""
+        anchored = [(offset, token) for offset, token in enumerate(phrase) if token not in STOPWORDS]
+        first_offset, first_token = anchored[0]
+        rest = [(offset - first_offset, set(phrase_positions[token].get(passage_id, ())))
+                for offset, token in anchored[1:]]
+
+        for start in phrase_positions[first_token].get(passage_id, ()):
+            if all(start + offset in positions for offset, positions in rest):
+                return True
+        return False
+
+    def snippet(self, passage_id: int, terms: Iterable[str], phrases: Iterable[List[str]] = ()) -> str:
+        """Cut a window of the passage around its first phrase or term match."""
+        text = self.passages[passage_id][1]
+        patterns = [r"[^a-z0-9]+".join(map(re.escape, phrase)) for phrase in phrases]
+        patterns.append("|".join(map(re.escape, sorted(terms, key=len, reverse=True))))
+
+        match = None
+        for pattern in patterns:
+            match = re.search(rf"(?<![a-z0-9])(?:{pattern})(?![a-z0-9])", text, re.IGNORECASE)
+            if match:
+                break
+
+        if len(text) <= SNIPPET_CHARS:
+            return text
+
+        center = match.start() if match else 0
+        start = max(0, center - SNIPPET_CHARS // 3)
+        end = min(len(text), start + SNIPPET_CHARS)
+        if start > 0:
+            space = text.find(" ", start)
+            start = space + 1 if 0 <= space < center else start
+        if end < len(text):
+            space = text.rfind(" ", start, end)
+            end = space if space > center else end
+
+        return f"{'...' if start > 0 else ''}{text[start:end]}{'...' if end < len(text) else ''}"
+
+def select_passages(content: str, query: str, max_chars: int) -> Tuple[List[str], int]:
+    """Pick the passages of one section that best answer a query within a character budget.
+
+    Passages are ranked with BM25 against the query and taken best first
+    while they fit in max_chars; without a query or any matching passage
+    they are taken in document order. At least one passage is always kept.
+
+    Args:
+        content: Section content text
+        query: Free-text query (may be empty)
+        max_chars: Character budget for the selected passages
+
+    Returns:
+        (selected passages in document order, total number of passages)
+    """
+    index = HandbookSearchIndex.build({"content": {"content": content}})
+    passage_count = len(index.passages)
+
+    ranked = [hit["passage_id"] for hit in index.search(query, limit=passage_count)] if query else []
+    if not ranked:
+        ranked = list(range(passage_count))
+
+    selected = []
+    used = 0
+    for passage_id in ranked:
+        length = len(index.passages[passage_id][1])
+        if selected and used + length > max_chars:
+            continue
+        selected.append(passage_id)
+        used += length
+
+    return [index.passages[passage_id][1] for passage_id in sorted(selected)], passage_count
@@ -0,0 +1,176 @@
+"""Per-turn memo shared by every agent tool called during one ADK run."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .cache import TTLCache
+from .config import Config
+from .database import HandbookDataService, UserDataService
+
+# Not a "temp:" key: AgentTool copies the parent's session state into the
+# sub-agent's session, but the session service drops temp: keys on the way.
+# start_turn() overwrites it at the start of every turn.
+TURN_ID_STATE_KEY = "turn_id"
+
+_MISSING = object()
+
+# Safety net for turns whose end callback never fires (e.g. a sub-agent run on
+# its own); normal turns are removed by end_turn().
+_turn_contexts = TTLCache(
+    max_size=Config.TURN_CONTEXT_MAX_TURNS,
+    ttl_seconds=Config.TURN_CONTEXT_TTL
+)
+
+class TurnContext:
+    """Lazily loaded user profile, campus content and latest handbook for one turn.
+
+    Each value is fetched at most once per turn; concurrent tool calls asking
+    for the same value share the in-flight fetch.
+    """
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self._values: Dict[str, Any] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        self.fetch_counts: Dict[str, int] = {}
+
+    async def _memoize(self, name: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        value = self._values.get(name, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        pending = self._pending.get(name)
+        if pending is None or pending.get_loop() is not asyncio.get_running_loop():
+            pending = asyncio.ensure_future(loader())
+            self._pending[name] = pending
+            self.fetch_counts[name] = self.fetch_counts.get(name, 0) + 1
+
+        try:
+            value = await asyncio.shield(pending)
+        finally:
+            if self._pending.get(name) is pending and pending.done():
+                del self._pending[name]
+
+        self._values[name] = value
+        return value
+
+    async def get_user_context(self) -> Optional[Dict[str, Any]]:
+        """Get the user's profile, academic details and college."""
+        return await self._memoize(
+            "user_context", lambda: UserDataService.get_user_context(self.user_id)
+        )
+
+    async def get_college_id(self) -> Optional[str]:
+        """Get the user's college_id, or None if the profile is incomplete."""
+        user_context = await self.get_user_context()
+        academic_details = (user_context or {}).get("academic_details") or {}
+        return academic_details.get("college_id")
+
+    async def get_campus_content(self) -> Optional[Dict[str, Any]]:
+        """Get the active campus AI content for the user's college."""
+        college_id = await self.get_college_id()
+        if not college_id:
+            return None
+
+        return await self._memoize(
+            "campus_content", lambda: UserDataService.get_campus_ai_content(college_id)
+        )
+
+    async def get_handbook_manifest(self) -> Optional[Dict[str, Any]]:
+        """Get per-section metadata of the user's latest completed handbook, without content."""
+        return await self._memoize(
+            "handbook_manifest", lambda: HandbookDataService.get_latest_handbook_manifest(self.user_id)
+        )
+
+    async def get_handbook_section(self, section: str) -> Optional[Dict[str, Any]]:
+        """Get one full section of the latest handbook, loading it on first use.
+
+        Returns None if there is no handbook or the manifest shows the section
+        is null, without querying for the body.
+        """
+        manifest = await self.get_handbook_manifest()
+        if not manifest or section not in manifest["sections"]:
+            return None
+
+        return await self._memoize(
+            f"handbook_section:{section}",
+            lambda: HandbookDataService.get_handbook_section(manifest["handbook_id"], section)
+        )
+
+    async def get_newest_handbook_section(self, section: str) -> Optional[Dict[str, Any]]:
+        """Get a section from the latest handbook, or from the newest older upload that has it.
+
+        The fallback query only runs when the latest handbook lacks the
+        section, and at most once per section per turn.
+        """
+        row = await self.get_handbook_section(section)
+        if row and row.get(section):
+            return row
+
+        return await self._memoize(
+            f"newest_handbook_section:{section}",
+            lambda: HandbookDataService.get_latest_handbook_with_section(self.user_id, section)
+        )
+
+    async def get_handbook_sections(self, sections: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get several sections of the latest handbook, loading the ones not yet memoized in one query.
+
+        Returns a mapping of section name to the same row get_handbook_section()
+        would return; later get_handbook_section() calls reuse these rows.
+        """
+        manifest = await self.get_handbook_manifest()
+        if manifest:
+            missing = [
+                section for section in dict.fromkeys(sections)
+                if section in manifest["sections"]
+                and f"handbook_section:{section}" not in self._values
+                and f"handbook_section:{section}" not in self._pending
+            ]
+            if len(missing) > 1:
+                row = await self._memoize(
+                    f"handbook_sections:{','.join(missing)}",
+                    lambda: HandbookDataService.get_handbook_section_columns(manifest["handbook_id"], missing)
+                )
+                for section in missing:
+                    self._values.setdefault(f"handbook_section:{section}", row)
+
+        return {section: await self.get_handbook_section(section) for section in sections}
+
+
+def _get_turn_id(tool_context) -> Optional[str]:
+    state = getattr(tool_context, 'state', None)
+    turn_id = state.get(TURN_ID_STATE_KEY) if state is not None and hasattr(state, 'get') else None
+    return turn_id or getattr(tool_context, 'invocation_id', None)
+
+
+def get_turn_context(tool_context, user_id: str) -> TurnContext:
+    """Get the memo for the turn a tool call belongs to, creating it if needed.
+
+    Sub-agents invoked through AgentTool run in their own invocation but inherit
+    the parent's session state, so the turn id set by start_turn() is shared.
+    """
+    turn_id = _get_turn_id(tool_context)
+    if not turn_id:
+        return TurnContext(user_id)
+
+    key = (turn_id, user_id)
+    turn_context = _turn_contexts.get(key)
+    if turn_context is None:
+        turn_context = TurnContext(user_id)
+        _turn_contexts.set(key, turn_context)
+
+    return turn_context
+
+
+def start_turn(callback_context) -> None:
+    """before_agent_callback for the root agent: tag the session state with a turn id."""
+    callback_context.state[TURN_ID_STATE_KEY] = callback_context.invocation_id
+    return None
+
+
+def end_turn(callback_context) -> None:
+    """after_agent_callback for the root agent: discard the memo for the finished turn."""
+    turn_id = callback_context.state.get(TURN_ID_STATE_KEY) or callback_context.invocation_id
+    user_id = callback_context.state.get('user_id')
+    _turn_contexts.invalidate((turn_id, user_id))
+    return None
@@ -0,0 +1,100 @@
+"""Dense vector index over handbook chunks with NumPy cosine top-k search."""
+
+import base64
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+INDEX_VERSION = 1
+
+class ChunkVectorIndex:
+    """Embedded handbook chunks held in one contiguous float32 matrix.
+
+    Rows are unit vectors, so cosine similarity is a single matrix product;
+    several queries are scored in one batch. The index round-trips through
+    to_dict()/from_dict() (vectors base64-encoded) so it can be stored as JSON
+    next to the handbook. `model` names the embedder that produced the
+    vectors; queries must be embedded with the same one.
+    """
+
+    def __init__(self, chunks: List[Tuple[str, str]], vectors: np.ndarray, model: str):
+        self.chunks = chunks
+        self.vectors = vectors
+        self.model = model
+
+    @classmethod
+    def build(cls, chunks: List[Tuple[str, str]], embedder) -> "ChunkVectorIndex":
+        """Embed (section, text) chunks with the given embedder."""
+        if chunks:
+            vectors = embedder.embed([text for _, text in chunks])
+        else:
+            vectors = np.zeros((0, embedder.dim), dtype=np.float32)
+        return cls(chunks, vectors, embedder.name)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Optional["ChunkVectorIndex"]:
+        """Load an index produced by to_dict(), or None if it is missing or outdated."""
+        if not data or data.get("version") != INDEX_VERSION:
+            return None
+
+        vectors = np.frombuffer(base64.b64decode(data["vectors"]), dtype=np.float32)
+        return cls(
+            [tuple(chunk) for chunk in data["chunks"]],
+            vectors.reshape(len(data["chunks"]), data["dim"]),
+            data["model"]
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the index to JSON-compatible data."""
+        return {
+            "version": INDEX_VERSION,
+            "model": self.model,
+            "dim": int(self.vectors.shape[1]),
+            "chunks": [list(chunk) for chunk in self.chunks],
+            "vectors": base64.b64encode(np.ascontiguousarray(self.vectors, dtype=np.float32).tobytes()).decode("ascii")
+        }
+
+    def search(self, query_vectors: np.ndarray, top_k: int = 5,
+               sections: Optional[Iterable[str]] = None) -> List[List[Tuple[int, float]]]:
+        """Find the top_k most similar chunks for each query vector.
+
+        Args:
+            query_vectors: (m, dim) or (dim,) unit vectors from the index's embedder
+            top_k: Number of chunks per query
+            sections: Restrict results to these sections (all if None)
+
+        Returns:
+            For each query, (chunk_index, cosine_score) pairs best first
+        """
+        queries = np.atleast_2d(query_vectors).astype(np.float32, copy=False)
+        if not self.chunks:
+            return [[] for _ in range(len(queries))]
+
+        scores = queries @ self.vectors.T
+        if sections is not None:
+            allowed = set(sections)
+            mask = np.array([section not in allowed for section, _ in self.chunks])
+            scores[:, mask] = -np.inf
+
+        k = min(top_k, len(self.chunks))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in enumerate(top):
+            ordered = candidates[np.argsort(-scores[row, candidates])]
+            results.append([
+                (int(index), float(scores[row, index]))
+                for index in ordered if np.isfinite(scores[row, index])
+            ])
+        return results
+
+    def search_texts(self, queries: Sequence[str], embedder, top_k: int = 5,
+                     sections: Optional[Iterable[str]] = None) -> List[List[Dict[str, Any]]]:
+        """Embed queries in one batch and return their top chunks with section labels."""
+        matches = self.search(embedder.embed(list(queries)), top_k=top_k, sections=sections)
+        return [
+            [
+                {"section": self.chunks[index][0], "text": self.chunks[index][1], "score": round(score, 4)}
+                for index, score in query_matches
+            ]
+            for query_matches in matches
+        ]
@@ -4,6 +4,7 @@ from google.adk.agents import LlmAgent
 from google.adk.tools.agent_tool import AgentTool
 from .sub_agents import campus_agent, handbook_agent
 from .tools import ADK_TOOLS
+from shared.turn_context import start_turn, end_turn
 
 from . import prompt
 
@@ -26,6 +27,8 @@ student_desk = LlmAgent(
         prompt.STUDENT_DESK_PROMPT
     ),
     output_key="student_response",
+    before_agent_callback=start_turn,
+    after_agent_callback=end_turn,
     tools=[
         AgentTool(agent=campus_agent),
         AgentTool(agent=handbook_agent),
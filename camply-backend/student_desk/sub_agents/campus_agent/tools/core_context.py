@@ -6,7 +6,7 @@ from google.adk.tools import FunctionTool
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
 
-from shared import UserDataService
+from shared import get_turn_context
 
 
 @FunctionTool
@@ -38,7 +38,7 @@ async def get_user_college_context(*, tool_context) -> dict:
                 }
             }
         
-        user_context = await UserDataService.get_user_context(user_id)
+        user_context = await get_turn_context(tool_context, user_id).get_user_context()
         
         if not user_context or not user_context.get('academic_details'):
             return {
@@ -120,7 +120,8 @@ async def fetch_campus_content_by_user_id(*, tool_context) -> dict:
                 "message": "User ID not found in session state"
             }
         
-        user_context = await UserDataService.get_user_context(user_id)
+        turn_context = get_turn_context(tool_context, user_id)
+        user_context = await turn_context.get_user_context()
         
         if not user_context or not user_context.get('academic_details'):
             return {
@@ -134,7 +135,7 @@ async def fetch_campus_content_by_user_id(*, tool_context) -> dict:
         college_name = user_context['college']['name'] if user_context.get('college') else 'Unknown College'
         college_website = user_context['college'].get('college_website_url') if user_context.get('college') else None
         
-        campus_content = await UserDataService.get_campus_ai_content(college_id)
+        campus_content = await turn_context.get_campus_content()
         
         return {
             "success": True,
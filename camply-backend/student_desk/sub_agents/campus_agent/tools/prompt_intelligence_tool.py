@@ -6,7 +6,7 @@ from google.adk.tools import FunctionTool
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))))
 
-from shared import UserDataService
+from shared import get_turn_context
 
 CONTENT_TYPE_MAPPING = {
     "campus-news": "college_overview_content",
@@ -40,7 +40,8 @@ async def analyze_prompt_based_intelligence(prompt_id: str, custom_prompt: str =
                 "message": "User ID not found in session state"
             }
         
-        user_context = await UserDataService.get_user_context(user_id)
+        turn_context = get_turn_context(tool_context, user_id)
+        user_context = await turn_context.get_user_context()
         
         if not user_context:
             return {
@@ -59,7 +60,7 @@ async def analyze_prompt_based_intelligence(prompt_id: str, custom_prompt: str =
                 "message": "College information not found in user profile"
             }
         
-        campus_content = await UserDataService.get_campus_ai_content(college_id)
+        campus_content = await turn_context.get_campus_content()
         
         content_type = CONTENT_TYPE_MAPPING.get(prompt_id, "college_overview_content")
         cached_content = None
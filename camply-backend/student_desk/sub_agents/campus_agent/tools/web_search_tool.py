@@ -6,7 +6,7 @@ from google.adk.tools import FunctionTool
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))))
 
-from shared import UserDataService
+from shared import get_turn_context
 
 @FunctionTool
 async def search_campus_intelligence(query: str, search_type: str = "general", *, tool_context) -> Dict[str, Any]:
@@ -28,7 +28,8 @@ async def search_campus_intelligence(query: str, search_type: str = "general", *
                 "message": "User ID not found in session state"
             }
         
-        user_context = await UserDataService.get_user_context(user_id)
+        turn_context = get_turn_context(tool_context, user_id)
+        user_context = await turn_context.get_user_context()
         
         if not user_context:
             return {
@@ -47,7 +48,7 @@ async def search_campus_intelligence(query: str, search_type: str = "general", *
                 "message": "College information not found in user profile"
             }
         
-        campus_content = await UserDataService.get_campus_ai_content(college_id)
+        campus_content = await turn_context.get_campus_content()
         
         query_analysis = analyze_query_intent(query)
         relevant_content = find_relevant_database_content(campus_content, query_analysis) if campus_content else None
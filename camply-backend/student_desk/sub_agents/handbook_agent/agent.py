@@ -23,7 +23,10 @@ from .tools import (
     
     # Multi-section intelligence tools
     get_comprehensive_handbook_search,
-    get_multi_section_analysis
+    get_multi_section_analysis,
+    
+    # Semantic retrieval
+    get_relevant_handbook_chunks
 )
 
 MODEL = "gemini-2.0-flash"
@@ -64,7 +67,10 @@ handbook_agent = LlmAgent(
         
         # Advanced analysis tools - Use for complex queries
         get_comprehensive_handbook_search,
-        get_multi_section_analysis
+        get_multi_section_analysis,
+        
+        # Semantic retrieval - Use for specific questions to fetch only relevant passages
+        get_relevant_handbook_chunks
     ],
     disallow_transfer_to_parent=False,
     disallow_transfer_to_peers=False
@@ -18,11 +18,16 @@ HANDBOOK_AGENT_PROMPT = """You are an ADVANCED HANDBOOK INTELLIGENCE SPECIALIST
 
 ### **2. INTELLIGENT TOOL ROUTING SYSTEM**
 
+**Specific Questions** → Use `get_relevant_handbook_chunks(query)` first:
+- "How many days of medical leave are allowed?" → Returns only the most relevant passages with section labels
+- Fall back to full section tools only when the passages do not answer the question
+
 **Single-Section Queries** → Use specific section tools:
 - "What's the attendance policy?" → `get_attendance_policies_data()`
 - "How is CGPA calculated?" → `get_evaluation_criteria_data()`
 - "What are exam rules?" → `get_examination_rules_data()`
 - "What's the fee structure?" → `get_fee_structure_data()`
+- Always pass the student's question as `query`: long sections return only the matching `relevant_excerpts` plus summary and key points (see `content_trimming` in the metadata)
 
 **Multi-Section Queries** → Use `get_multi_section_analysis()`:
 - "What attendance do I need for exams?" → attendance_policies + examination_rules
@@ -21,7 +21,10 @@ from .handbook_tools import (
     
     # Multi-section intelligence tools
     get_comprehensive_handbook_search,
-    get_multi_section_analysis
+    get_multi_section_analysis,
+    
+    # Semantic retrieval
+    get_relevant_handbook_chunks
 )
 
 __all__ = [
@@ -45,5 +48,8 @@ __all__ = [
     
     # Multi-section intelligence tools
     "get_comprehensive_handbook_search",
-    "get_multi_section_analysis"
+    "get_multi_section_analysis",
+    
+    # Semantic retrieval
+    "get_relevant_handbook_chunks"
 ] 
\ No newline at end of file
@@ -3,13 +3,26 @@
 import sys
 import os
 import json
+import asyncio
 from datetime import datetime
 from typing import Dict, Any, Optional, List, Union
 from google.adk.tools import FunctionTool
-from shared.database import supabase
+from shared.database import HANDBOOK_SECTIONS
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
-from shared import UserDataService
+from shared import Config, HandbookDataService, get_turn_context
+from shared.embeddings import get_embedder
+from shared.search_index import select_passages
+
+# Passages ranked per handbook before grouping by section
+SEARCH_HIT_LIMIT = 30
+
+# Sections returned by the Postgres full-text search
+SEARCH_SECTION_LIMIT = 5
+
+# Passages returned by get_relevant_handbook_chunks (default and upper bound)
+CHUNK_RESULT_LIMIT = 5
+MAX_CHUNK_RESULTS = 20
 
 
 @FunctionTool
@@ -33,7 +46,8 @@ async def get_handbook_intelligence_context(*, tool_context) -> dict:
                 "message": "User ID not found in session state"
             }
 
-        user_context = await UserDataService.get_user_context(user_id)
+        turn_context = get_turn_context(tool_context, user_id)
+        user_context = await turn_context.get_user_context()
         if not user_context:
             return {
                 "success": False,
@@ -47,16 +61,9 @@ async def get_handbook_intelligence_context(*, tool_context) -> dict:
         department_name = user_context.get("academic_details", {}).get("department_name", "Unknown Department")
         branch_name = user_context.get("academic_details", {}).get("branch_name", "Unknown Branch")
 
-        response = supabase.table('user_handbooks') \
-            .select('*') \
-            .eq('user_id', user_id) \
-            .eq('processing_status', 'completed') \
-            .order('upload_date', desc=True) \
-            .execute()
+        manifest = await turn_context.get_handbook_manifest()
 
-        handbooks = response.data if response.data else []
-
-        if not handbooks:
+        if not manifest:
             return {
                 "success": False,
                 "error": "no_handbook_found",
@@ -69,8 +76,7 @@ async def get_handbook_intelligence_context(*, tool_context) -> dict:
                 }
             }
 
-        latest_handbook = handbooks[0]
-        section_analysis = analyze_handbook_sections(latest_handbook)
+        section_analysis = analyze_handbook_sections(manifest)
         
         return {
             "success": True,
@@ -83,9 +89,9 @@ async def get_handbook_intelligence_context(*, tool_context) -> dict:
                 "program_name": f"{department_name} - {branch_name}"
             },
             "handbook_info": {
-                "handbook_id": latest_handbook['handbook_id'],
-                "filename": latest_handbook['original_filename'],
-                "processed_date": latest_handbook.get('processed_date'),
+                "handbook_id": manifest['handbook_id'],
+                "filename": manifest['original_filename'],
+                "processed_date": manifest.get('processed_date'),
                 "total_sections": len(section_analysis['available_sections']),
                 "sections_summary": section_analysis
             },
@@ -252,7 +258,10 @@ async def get_semester_structure_data(query: str = "", *, tool_context) -> dict:
 
 @FunctionTool
 async def get_comprehensive_handbook_search(search_query: str, *, tool_context) -> dict:
-    """Comprehensive search across all handbook sections with intelligent ranking."""
+    """Comprehensive search across all handbook sections with intelligent ranking.
+    
+    Wrap exact phrases in double quotes, e.g. "minimum attendance".
+    """
     try:
         session_state = getattr(tool_context, 'state', None)
         if not session_state:
@@ -262,44 +271,30 @@ async def get_comprehensive_handbook_search(search_query: str, *, tool_context)
         if not user_id:
             return {"success": False, "error": "missing_user_id"}
 
-        user_context = await UserDataService.get_user_context(user_id)
+        user_context = await get_turn_context(tool_context, user_id).get_user_context()
         student_name = user_context.get("user", {}).get("name", "Student") if user_context else "Student"
 
-        response = supabase.table('user_handbooks') \
-            .select('*') \
-            .eq('user_id', user_id) \
-            .eq('processing_status', 'completed') \
-            .execute()
+        section_names = list(HANDBOOK_SECTIONS)
+        handbooks = await HandbookDataService.get_handbook_manifests(user_id)
 
-        if not response.data:
+        if not handbooks:
             return {
                 "success": False,
                 "error": "no_handbooks_found",
                 "message": f"No processed handbooks found for {student_name}. Please upload and process a handbook first."
             }
 
-        search_results = []
-        section_names = [
-            'basic_info', 'semester_structure', 'examination_rules', 
-            'evaluation_criteria', 'attendance_policies', 'academic_calendar',
-            'course_details', 'assessment_methods', 'disciplinary_rules',
-            'graduation_requirements', 'fee_structure', 'facilities_rules'
-        ]
-        
-        for handbook in response.data:
-            for section_name in section_names:
-                section_data = handbook.get(section_name)
-                if section_data:
-                    matches = search_in_json_data(section_data, search_query)
-                    if matches:
-                        search_results.append({
-                            "section": section_name,
-                            "section_title": format_section_title(section_name),
-                            "handbook_filename": handbook['original_filename'],
-                            "matches": matches[:3],
-                            "relevance_score": calculate_relevance_score(matches, search_query),
-                            "match_count": len(matches)
-                        })
+        # Re-uploads of the same handbook share one content row; search it once
+        unique_handbooks = {}
+        for handbook in handbooks:
+            unique_handbooks.setdefault(handbook.get("content_hash") or handbook["handbook_id"], handbook)
+        handbooks = list(unique_handbooks.values())
+
+        search_results = None
+        if Config.HANDBOOK_SEARCH_BACKEND == "postgres":
+            search_results = await search_handbooks_in_database(handbooks, search_query)
+        if search_results is None:
+            search_results = await search_handbooks_with_index(handbooks, search_query)
 
         search_results.sort(key=lambda x: x['relevance_score'], reverse=True)
         
@@ -344,11 +339,21 @@ async def get_multi_section_analysis(sections: List[str], query: str = "", *, to
         if not sections:
             return {"success": False, "error": "no_valid_sections", "message": "No valid sections specified"}
 
+        # Load every requested section in one query up front so the per-section
+        # calls below only read the turn memo
+        turn_context = get_turn_context(tool_context, user_id)
+        await turn_context.get_handbook_sections(sections)
+        
+        section_results = await asyncio.gather(*[
+            _get_section_data(section, query, tool_context, 
+                              format_section_title(section), 
+                              f"{section} related information",
+                              turn_context=turn_context)
+            for section in sections
+        ])
+        
         multi_section_data = {}
-        for section in sections:
-            section_result = await _get_section_data(section, query, tool_context, 
-                                                   format_section_title(section), 
-                                                   f"{section} related information")
+        for section, section_result in zip(sections, section_results):
             if section_result["success"]:
                 multi_section_data[section] = section_result["data"]
 
@@ -369,8 +374,67 @@ async def get_multi_section_analysis(sections: List[str], query: str = "", *, to
         }
 
 
-async def _get_section_data(section_type: str, query: str, tool_context, section_title: str, description: str) -> dict:
-    """Core function to get data from a specific handbook section."""
+@FunctionTool
+async def get_relevant_handbook_chunks(query: str, top_n: int = 5, *, tool_context) -> dict:
+    """Retrieve only the handbook passages most relevant to a question, with their section labels.
+    
+    Prefer this over whole-section tools for specific questions: it returns a
+    few short passages instead of entire sections.
+    """
+    try:
+        session_state = getattr(tool_context, 'state', None)
+        if not session_state:
+            return {"success": False, "error": "session_unavailable"}
+        
+        user_id = session_state.get('user_id') if hasattr(session_state, 'get') else getattr(session_state, 'user_id', None)
+        if not user_id:
+            return {"success": False, "error": "missing_user_id"}
+
+        manifest = await get_turn_context(tool_context, user_id).get_handbook_manifest()
+        if not manifest:
+            return {
+                "success": False,
+                "error": "no_handbooks_found",
+                "message": "No processed handbook found. Please upload and process a handbook first."
+            }
+
+        index = await HandbookDataService.get_chunk_index(manifest)
+        if index is None:
+            return {"success": False, "error": "no_handbook_content", "message": "Your handbook has no searchable content."}
+
+        top_n = max(1, min(int(top_n or CHUNK_RESULT_LIMIT), MAX_CHUNK_RESULTS))
+        # Embedding the query and scoring the chunks is CPU-bound
+        matches = (await asyncio.to_thread(index.search_texts, [query], get_embedder(), top_k=top_n))[0]
+        
+        return {
+            "success": True,
+            "query": query,
+            "handbook_filename": manifest.get("original_filename"),
+            "chunks": [
+                {
+                    "section": match["section"],
+                    "section_title": format_section_title(match["section"]),
+                    "text": match["text"],
+                    "similarity": match["score"]
+                }
+                for match in matches
+            ]
+        }
+
+    except Exception as e:
+        return {
+            "success": False,
+            "error": "system_error",
+            "message": f"Error retrieving handbook passages: {str(e)}"
+        }
+
+
+async def _get_section_data(section_type: str, query: str, tool_context, section_title: str, description: str,
+                            turn_context=None) -> dict:
+    """Core function to get data from a specific handbook section.
+    
+    Pass turn_context to share one memo across several calls made by the same tool.
+    """
     try:
         session_state = getattr(tool_context, 'state', None)
         if not session_state:
@@ -380,19 +444,15 @@ async def _get_section_data(section_type: str, query: str, tool_context, section
         if not user_id:
             return {"success": False, "error": "missing_user_id"}
 
-        user_context = await UserDataService.get_user_context(user_id)
+        turn_context = turn_context or get_turn_context(tool_context, user_id)
+        user_context = await turn_context.get_user_context()
         student_name = user_context.get("user", {}).get("name", "Student") if user_context else "Student"
         college_name = user_context.get("college", {}).get("name", "Your College") if user_context else "Your College"
 
-        response = supabase.table('user_handbooks') \
-            .select(f'handbook_id, original_filename, processed_date, {section_type}') \
-            .eq('user_id', user_id) \
-            .eq('processing_status', 'completed') \
-            .not_.is_(section_type, 'null') \
-            .order('upload_date', desc=True) \
-            .execute()
+        # Falls back to the newest older upload when the latest handbook lacks the section
+        latest_handbook = await turn_context.get_newest_handbook_section(section_type)
 
-        if not response.data:
+        if not latest_handbook:
             return {
                 "success": False,
                 "error": "no_section_data",
@@ -401,7 +461,6 @@ async def _get_section_data(section_type: str, query: str, tool_context, section
                 "student_name": student_name
             }
 
-        latest_handbook = response.data[0]
         section_data = latest_handbook.get(section_type)
         
         if not section_data:
@@ -412,7 +471,8 @@ async def _get_section_data(section_type: str, query: str, tool_context, section
                 "section": section_type
             }
 
-        formatted_data = format_section_data(section_data, section_type, query)
+        context_data, trimming = compact_section_data(section_data, query)
+        formatted_data = format_section_data(context_data, section_type, query)
         key_insights = extract_key_insights(section_data, section_type, query)
         
         return {
@@ -430,7 +490,8 @@ async def _get_section_data(section_type: str, query: str, tool_context, section
             "metadata": {
                 "section_description": description,
                 "data_length": len(str(section_data)),
-                "contains_query_terms": query.lower() in str(section_data).lower() if query else False
+                "contains_query_terms": query.lower() in str(section_data).lower() if query else False,
+                "content_trimming": trimming
             }
         }
 
@@ -442,14 +503,43 @@ async def _get_section_data(section_type: str, query: str, tool_context, section
         }
 
 
-def analyze_handbook_sections(handbook: dict) -> dict:
-    """Analyze all sections of a handbook for completeness and content quality."""
-    sections = [
-        'basic_info', 'semester_structure', 'examination_rules', 
-        'evaluation_criteria', 'attendance_policies', 'academic_calendar',
-        'course_details', 'assessment_methods', 'disciplinary_rules',
-        'graduation_requirements', 'fee_structure', 'facilities_rules'
-    ]
+def compact_section_data(section_data: dict, query: str = "", max_chars: int = None) -> tuple:
+    """Reduce a section to its summary, key points and the passages most relevant to the query.
+    
+    Sections whose content fits in the budget are returned unchanged. A budget
+    of 0 (SECTION_CONTEXT_MAX_CHARS=0) always returns the full section.
+    
+    Returns:
+        (section data to send to the agent, trimming report)
+    """
+    max_chars = Config.SECTION_CONTEXT_MAX_CHARS if max_chars is None else max_chars
+    content = section_data.get("content") if isinstance(section_data, dict) else None
+    if not max_chars or not content or len(content) <= max_chars:
+        return section_data, {"mode": "full", "trimmed": False}
+
+    excerpts, passage_count = select_passages(content, query, max_chars)
+    excerpt_chars = sum(len(excerpt) for excerpt in excerpts)
+    compact = {
+        "title": section_data.get("title", ""),
+        "summary": section_data.get("summary", ""),
+        "key_points": section_data.get("key_points", []),
+        "relevant_excerpts": excerpts
+    }
+    
+    return compact, {
+        "mode": "excerpts",
+        "trimmed": True,
+        "passages_returned": len(excerpts),
+        "passages_total": passage_count,
+        "content_chars_returned": excerpt_chars,
+        "content_chars_total": len(content),
+        "note": "Only the passages most relevant to the query are included; call again with a more specific query for other details."
+    }
+
+
+def analyze_handbook_sections(manifest: dict) -> dict:
+    """Analyze all sections of a handbook manifest for completeness and content quality."""
+    sections = HANDBOOK_SECTIONS
     
     analysis = {
         "available_sections": [],
@@ -459,14 +549,13 @@ def analyze_handbook_sections(handbook: dict) -> dict:
     }
     
     for section in sections:
-        section_data = handbook.get(section)
-        if section_data:
+        section_manifest = manifest["sections"].get(section)
+        if section_manifest and section_manifest.get("word_count", 0) > 0:
             analysis["available_sections"].append({
                 "section": section,
                 "title": format_section_title(section),
-                "content_length": len(str(section_data)),
-                "has_structured_data": isinstance(section_data, dict),
-                "quality_score": calculate_section_quality(section_data)
+                "word_count": section_manifest["word_count"],
+                "quality_score": section_manifest.get("quality_score", 0.0)
             })
     
     analysis["completion_percentage"] = (len(analysis["available_sections"]) / analysis["total_sections"]) * 100
@@ -609,69 +698,66 @@ def get_related_sections(section_type: str) -> List[str]:
     return relations.get(section_type, [])
 
 
-def search_in_json_data(data: dict, query: str) -> List[str]:
-    """Search for query terms in JSON data structure."""
-    if not query or not data:
-        return []
-    
-    matches = []
-    query_lower = query.lower()
-    
-    def search_recursive(obj, path=""):
-        if isinstance(obj, dict):
-            for key, value in obj.items():
-                current_path = f"{path}.{key}" if path else key
-                if query_lower in key.lower():
-                    matches.append(f"Key: {current_path}")
-                search_recursive(value, current_path)
-        elif isinstance(obj, list):
-            for i, item in enumerate(obj):
-                search_recursive(item, f"{path}[{i}]")
-        else:
-            text = str(obj).lower()
-            if query_lower in text:
-                matches.append(f"Value at {path}: {str(obj)[:100]}...")
-    
-    search_recursive(data)
-    return matches[:10]
-
-
-def calculate_relevance_score(matches: List[str], query: str) -> float:
-    """Calculate relevance score for search matches."""
-    if not matches or not query:
-        return 0.0
-    
-    score = len(matches) * 10
-    
-    query_lower = query.lower()
-    for match in matches:
-        if query_lower in match.lower():
-            score += 5
-    
-    return min(score, 100.0)
-
-
-def calculate_section_quality(section_data) -> float:
-    """Calculate quality score for a section."""
-    if not section_data:
-        return 0.0
-    
-    score = 0.0
-    data_str = str(section_data)
+async def search_handbooks_with_index(handbooks: List[dict], query: str) -> List[dict]:
+    """Rank passages of each handbook with its in-memory BM25 index."""
+    search_results = []
+    for handbook in handbooks:
+        index = await HandbookDataService.get_search_index(handbook)
+        if index is None:
+            continue
+        
+        search_results.extend(group_hits_by_section(
+            index.search(query, limit=SEARCH_HIT_LIMIT),
+            handbook['original_filename']
+        ))
+    return search_results
+
+
+async def search_handbooks_in_database(handbooks: List[dict], query: str) -> Optional[List[dict]]:
+    """Rank shared handbook sections with Postgres full-text search, None if it is unavailable."""
+    filenames = {h["content_hash"]: h['original_filename'] for h in handbooks if h.get("content_hash")}
+    rows = await HandbookDataService.search_handbook_sections(list(filenames), query, limit=SEARCH_SECTION_LIMIT)
+    if rows is None:
+        return None
     
-    score += min(len(data_str) / 100, 30)
+    search_results = [
+        {
+            "section": row["section"],
+            "section_title": format_section_title(row["section"]),
+            "handbook_filename": filenames[row["content_hash"]],
+            "matches": [row["snippet"]],
+            "relevance_score": round(row["rank"], 3),
+            "match_count": 1
+        }
+        for row in rows
+    ]
     
-    if isinstance(section_data, dict):
-        score += min(len(section_data.keys()) * 5, 40)
-
-    if len(data_str) > 500:
-        score += 30
-    elif len(data_str) > 200:
-        score += 20
-    elif len(data_str) > 50:
-        score += 10
+    # Handbooks processed before the shared store keep their sections inline
+    inline_handbooks = [h for h in handbooks if not h.get("content_hash")]
+    if inline_handbooks:
+        search_results.extend(await search_handbooks_with_index(inline_handbooks, query))
+    return search_results
+
+
+def group_hits_by_section(hits: List[dict], handbook_filename: str) -> List[dict]:
+    """Group ranked passage hits into one search result per section, best section first."""
+    results = {}
+    for hit in hits:
+        result = results.get(hit["section"])
+        if result is None:
+            result = results[hit["section"]] = {
+                "section": hit["section"],
+                "section_title": format_section_title(hit["section"]),
+                "handbook_filename": handbook_filename,
+                "matches": [],
+                "relevance_score": hit["score"],
+                "match_count": 0
+            }
+        result["match_count"] += 1
+        if len(result["matches"]) < 3:
+            result["matches"].append(hit["snippet"])
     
-    return min(score, 100.0)
+    return list(results.values())
 
 
 def generate_intelligence_guidance(student_name: str, college_name: str, section_analysis: dict) -> str:
@@ -7,7 +7,7 @@ from google.adk.tools import FunctionTool
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from shared import UserDataService
+from shared import UserDataService, get_turn_context
 
 
 async def get_user_context(*, tool_context) -> Dict[str, Any]:
@@ -37,7 +37,7 @@ async def get_user_context(*, tool_context) -> Dict[str, Any]:
         }
     
     try:
-        user_context = await UserDataService.get_user_context(user_id)
+        user_context = await get_turn_context(tool_context, user_id).get_user_context()
         
         if user_context:
             formatted_context = UserDataService.format_user_context_for_agent(user_context)
@@ -0,0 +1,145 @@
+"""Async Supabase client and asyncpg pool sharing across tasks, event loops and threads."""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+import supabase
+
+from shared import database
+from shared.config import Config
+from shared.database import close_async_supabase, close_connection_pool, get_async_supabase, get_connection_pool
+
+
+@pytest.fixture
+def created(monkeypatch):
+    """Fake acreate_client recording every client it creates."""
+    created = []
+
+    async def acreate_client(url, key):
+        await asyncio.sleep(0.01)
+        closed = []
+
+        async def aclose():
+            closed.append(True)
+
+        client = SimpleNamespace(loop=asyncio.get_running_loop(), closed=closed,
+                                 postgrest=SimpleNamespace(aclose=aclose))
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(supabase, "acreate_client", acreate_client)
+    monkeypatch.setattr(database, "_async_supabase_clients", {})
+    monkeypatch.setattr(database, "_async_supabase_locks", {})
+    return created
+
+
+def test_concurrent_callers_share_one_client(created):
+    async def main():
+        return await asyncio.gather(*(get_async_supabase() for _ in range(50)))
+
+    clients = asyncio.run(main())
+
+    assert len(created) == 1
+    assert all(client is created[0] for client in clients)
+
+
+def test_each_event_loop_gets_its_own_client(created):
+    first = asyncio.run(get_async_supabase())
+    second = asyncio.run(get_async_supabase())
+
+    assert first is not second
+    assert len(created) == 2
+    # The first loop is closed, so its client and lock were dropped
+    assert list(database._async_supabase_clients.values()) == [second]
+    assert len(database._async_supabase_locks) == 1
+
+
+def test_concurrent_loops_keep_their_own_clients(created):
+    barrier = threading.Barrier(4)
+    results = {}
+
+    async def use_client(name):
+        client = await get_async_supabase()
+        barrier.wait()
+        await asyncio.sleep(0.01)
+        # Another loop asking for a client never replaces this loop's
+        results[name] = (client, await get_async_supabase(), asyncio.get_running_loop())
+
+    threads = [threading.Thread(target=asyncio.run, args=(use_client(i),)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 4
+    for client, again, loop in results.values():
+        assert client is again and client.loop is loop
+
+
+def test_close_only_closes_the_current_loops_client(created):
+    async def main():
+        client = await get_async_supabase()
+        await close_async_supabase()
+        return client, await get_async_supabase()
+
+    closed, replacement = asyncio.run(main())
+
+    assert closed.closed == [True]
+    assert replacement is not closed and not replacement.closed
+
+
+@pytest.fixture
+def pools(monkeypatch):
+    """Fake asyncpg.create_pool recording every pool it creates."""
+    pools = []
+
+    async def create_pool(dsn, **kwargs):
+        await asyncio.sleep(0.01)
+        closed = []
+
+        async def close():
+            closed.append(True)
+
+        pool = SimpleNamespace(loop=asyncio.get_running_loop(), closed=closed, close=close)
+        pools.append(pool)
+        return pool
+
+    monkeypatch.setattr(database.asyncpg, "create_pool", create_pool)
+    monkeypatch.setattr(Config, "DATABASE_URL", "postgresql://localhost/camply")
+    monkeypatch.setattr(database, "_connection_pools", {})
+    monkeypatch.setattr(database, "_connection_pool_locks", {})
+    return pools
+
+
+def test_concurrent_callers_share_one_pool(pools):
+    async def main():
+        return await asyncio.gather(*(get_connection_pool() for _ in range(50)))
+
+    results = asyncio.run(main())
+
+    assert len(pools) == 1
+    assert all(pool is pools[0] for pool in results)
+
+
+def test_each_event_loop_gets_its_own_pool(pools):
+    first = asyncio.run(get_connection_pool())
+    second = asyncio.run(get_connection_pool())
+
+    assert first is not second and second.loop is not first.loop
+    # The first loop is closed, so its pool and lock were dropped
+    assert list(database._connection_pools.values()) == [second]
+    assert len(database._connection_pool_locks) == 1
+
+
+def test_close_only_closes_the_current_loops_pool(pools):
+    async def main():
+        pool = await get_connection_pool()
+        await close_connection_pool()
+        return pool, await get_connection_pool()
+
+    closed, replacement = asyncio.run(main())
+
+    assert closed.closed == [True]
+    assert replacement is not closed and not replacement.closed
@@ -0,0 +1,160 @@
+"""/chat and /chat/stream against a fake ADK server."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+import main
+from shared import Config
+from shared.cache import TTLCache
+
+SESSION_PATH = f"/apps/{Config.ADK_APP_NAME}/users/user-1/sessions/session-1"
+
+CHAT = {"message": "When are exams?", "user_id": "user-1", "session_id": "session-1"}
+
+
+def model_event(text, partial=False):
+    return {"content": {"role": "model", "parts": [{"text": text}]}, "partial": partial}
+
+
+class FakeADK:
+    """ADK stand-in that records requests and forgets sessions on demand."""
+
+    def __init__(self, sse_events=()):
+        self.requests = []
+        self.sessions = set()
+        self.sse_events = list(sse_events)
+        self.keep_sessions = True
+
+    def forget_sessions(self):
+        self.sessions.clear()
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.requests.append(path)
+
+        if path == SESSION_PATH:
+            if self.keep_sessions:
+                self.sessions.add(path)
+            return httpx.Response(200, json={"id": "session-1"})
+
+        if SESSION_PATH not in self.sessions:
+            return httpx.Response(404, json={"detail": "Session not found"})
+
+        if path == "/run":
+            return httpx.Response(200, json=[model_event("Exams start on 1 December.")])
+
+        if path == "/run_sse":
+            assert request.headers["accept"] == "text/event-stream"
+            body = "".join(f"data: {json.dumps(event)}\n\n" for event in self.sse_events)
+            return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+        return httpx.Response(404)
+
+
+@pytest.fixture
+def adk():
+    return FakeADK(sse_events=[
+        {"author": "student_desk"},
+        model_event("Exams start ", partial=True),
+        model_event("on 1 December.", partial=True),
+        model_event("Exams start on 1 December."),
+    ])
+
+
+def post(adk, *requests):
+    """Send (path, body) requests to the bridge, with ADK calls going to the fake."""
+    async def run():
+        main.app.state.adk_client = httpx.AsyncClient(transport=httpx.MockTransport(adk.handler))
+        main.app.state.adk_sessions = TTLCache(max_size=10, ttl_seconds=60)
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app),
+                                         base_url="http://bridge") as bridge:
+                return [await bridge.post(path, json=body) for path, body in requests]
+        finally:
+            await main.app.state.adk_client.aclose()
+
+    return asyncio.run(run())
+
+
+def parse_sse(body):
+    events = []
+    for frame in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.split("\n"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_relays_deltas_then_done(adk):
+    response, = post(adk, ("/chat/stream", CHAT))
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_sse(response.text)
+    assert events[:-1] == [
+        ("delta", {"text": "Exams start "}),
+        ("delta", {"text": "on 1 December."}),
+    ]
+    event, done = events[-1]
+    assert event == "done"
+    assert done["success"] and done["response"] == "Exams start on 1 December."
+    assert done["time_to_first_token_ms"] is not None
+    assert adk.requests == [SESSION_PATH, "/run_sse"]
+
+
+def test_stream_replaces_text_the_final_message_rewrites(adk):
+    adk.sse_events = [
+        model_event("Exams start ", partial=True),
+        model_event("in November.", partial=True),
+        model_event("Exams start on 1 December."),
+    ]
+    response, = post(adk, ("/chat/stream", CHAT))
+
+    events = parse_sse(response.text)
+    assert events[:-1] == [
+        ("delta", {"text": "Exams start "}),
+        ("delta", {"text": "in November."}),
+        ("replace", {"text": "Exams start on 1 December."}),
+    ]
+    assert events[-1][1]["response"] == "Exams start on 1 December."
+
+
+def test_session_is_created_once(adk):
+    first, second = post(adk, ("/chat", CHAT), ("/chat", CHAT))
+
+    assert first.json()["success"] and second.json()["success"]
+    assert adk.requests == [SESSION_PATH, "/run", "/run"]
+
+
+@pytest.mark.parametrize("path, run_path", [("/chat", "/run"), ("/chat/stream", "/run_sse")])
+def test_run_is_retried_after_adk_404(adk, path, run_path):
+    original_handler = adk.handler
+
+    def handler(request):
+        # ADK restarts after the session was cached: the next run gets a 404
+        if request.url.path == run_path and adk.requests.count(run_path) == 0:
+            adk.forget_sessions()
+        return original_handler(request)
+
+    adk.handler = handler
+    response, = post(adk, (path, CHAT))
+
+    assert adk.requests == [SESSION_PATH, run_path, SESSION_PATH, run_path]
+    if path == "/chat":
+        assert response.json() == {
+            "response": "Exams start on 1 December.", "agent_used": "student_desk",
+            "success": True, "error": None
+        }
+    else:
+        event, done = parse_sse(response.text)[-1]
+        assert event == "done" and done["success"]
+
+
+def test_second_404_is_reported(adk):
+    adk.keep_sessions = False
+
+    response, = post(adk, ("/chat", CHAT))
+
+    assert adk.requests == [SESSION_PATH, "/run", SESSION_PATH, "/run"]
+    assert not response.json()["success"]
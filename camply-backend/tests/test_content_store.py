@@ -0,0 +1,86 @@
+"""Storing processed content when its shared row is collected mid-store."""
+
+from types import SimpleNamespace
+
+import pytest
+from postgrest.exceptions import APIError
+
+from handbook_reader import database_updater
+from handbook_reader.database_updater import FOREIGN_KEY_VIOLATION, HandbookDatabaseUpdater
+from shared.embeddings import HashingEmbedder
+
+SECTION = {
+    "title": "Examination Rules", "content": "Exams are held in December and May.",
+    "summary": "Exam schedule", "key_points": ["Two exam sessions"], "metadata": {}
+}
+
+
+class FakeQuery:
+    def __init__(self, supabase, table, action=None, payload=None):
+        self.supabase, self.table, self.action, self.payload = supabase, table, action, payload
+
+    def upsert(self, payload, **kwargs):
+        return FakeQuery(self.supabase, self.table, "upsert", payload)
+
+    def update(self, payload):
+        return FakeQuery(self.supabase, self.table, "update", payload)
+
+    def eq(self, *args):
+        return self
+
+    def execute(self):
+        return self.supabase.execute(self.table, self.action, self.payload)
+
+
+class FakeSupabase:
+    """The stored content row exists until the handbook tries to reference it."""
+
+    def __init__(self):
+        self.calls = []
+        self.content_rows = {"collected"}
+        self.collect = True
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rpc(self, name, params):
+        self.calls.append(("rpc", name))
+        state = {"content_hash": None, "stored": True, "inline_sections": False}
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=state))
+
+    def execute(self, table, action, payload):
+        self.calls.append((action, table))
+        if table == "handbook_contents":
+            self.content_rows.add(payload["content_hash"])
+            return SimpleNamespace(data=None)
+
+        if self.collect:
+            # Collected by another handbook's delete after the state was read
+            self.content_rows.discard("collected")
+            self.collect = False
+        if payload.get("content_hash") not in self.content_rows:
+            raise APIError({"code": FOREIGN_KEY_VIOLATION, "message": "violates foreign key constraint"})
+        return SimpleNamespace(data=[payload])
+
+
+@pytest.fixture
+def supabase(monkeypatch):
+    supabase = FakeSupabase()
+    monkeypatch.setattr(database_updater, "get_supabase", lambda: supabase)
+    monkeypatch.setattr(database_updater, "get_embedder", HashingEmbedder)
+    monkeypatch.setattr(database_updater, "handbook_content_hash", lambda sections: "collected")
+    return supabase
+
+
+def test_collected_content_is_stored_again(supabase):
+    updater = HandbookDatabaseUpdater()
+
+    assert updater.store_processed_content("handbook", {"examination_rules": SECTION})
+
+    assert supabase.calls == [
+        ("rpc", "handbook_content_state"),
+        ("update", "user_handbooks"),
+        ("upsert", "handbook_contents"),
+        ("update", "user_handbooks"),
+    ]
+    assert updater.last_store_stats["mode"] == "full"
@@ -0,0 +1,107 @@
+"""Status codes of the handbook processing endpoints."""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import main
+from handbook_reader.job_executor import HandbookJobExecutor
+
+pytestmark = pytest.mark.skipif(not main.HANDBOOK_AVAILABLE, reason="handbook reader not importable")
+
+HANDBOOKS = {
+    "hb-1": {"handbook_id": "hb-1", "original_filename": "2026.pdf", "storage_path": "u/2026.pdf"},
+}
+
+
+class FakeQuery:
+    """Just enough of the PostgREST query builder for process_existing_handbook."""
+
+    def __init__(self):
+        self.handbook_id = None
+
+    def select(self, *args):
+        return self
+
+    def eq(self, column, value):
+        self.handbook_id = value
+        return self
+
+    def single(self):
+        return self
+
+    async def execute(self):
+        return SimpleNamespace(data=HANDBOOKS.get(self.handbook_id))
+
+
+@pytest.fixture
+def bridge(monkeypatch):
+    async def validate_database_connection():
+        return True
+
+    engine = SimpleNamespace(database_updater=SimpleNamespace(
+        validate_database_connection=validate_database_connection
+    ))
+
+    async def ensure_loaded():
+        return engine
+
+    async def get_async_supabase():
+        return SimpleNamespace(table=lambda name: FakeQuery())
+
+    main.app.state.handbook_engine = SimpleNamespace(ensure_loaded=ensure_loaded)
+    monkeypatch.setattr(main, "get_async_supabase", get_async_supabase)
+
+
+def request(path, executor_setup):
+    """POST path once the executor has been set up, returning the response."""
+    async def run():
+        executor = HandbookJobExecutor(max_concurrency=1, max_queue_size=1, job_timeout=30)
+        await executor.start()
+        main.app.state.job_executor = executor
+        release = threading.Event()
+        try:
+            await executor_setup(executor, release)
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app),
+                                         base_url="http://bridge") as client:
+                return await client.post(path)
+        finally:
+            release.set()
+            await executor.shutdown()
+
+    return asyncio.run(run())
+
+
+async def fill_queue(executor, release):
+    """One job running (blocked until release) and one waiting: the queue is full."""
+    executor.submit("running", release.wait)
+    while executor.get_job_state("running") != "running":
+        await asyncio.sleep(0.01)
+    assert executor.submit("queued", release.wait)
+
+
+async def leave_empty(executor, release):
+    pass
+
+
+def test_full_queue_returns_503(bridge):
+    response = request("/handbook/process-existing/hb-1", fill_queue)
+
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Handbook processing queue is full"}
+
+
+def test_missing_handbook_returns_404(bridge):
+    response = request("/handbook/process-existing/unknown", leave_empty)
+
+    assert response.status_code == 404
+
+
+def test_queued_handbook_returns_processing(bridge):
+    response = request("/handbook/process-existing/hb-1", leave_empty)
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "processing"
@@ -0,0 +1,35 @@
+"""Pipeline version fingerprint of processed handbook results."""
+
+import pytest
+
+from handbook_reader import segmentation
+from handbook_reader.config import HandbookConfig
+from handbook_reader.segmentation import SentenceSegmenter
+
+
+def pipeline_version(monkeypatch, segmenter):
+    monkeypatch.setattr(segmentation, "_segmenter", segmenter)
+    return HandbookConfig.get_pipeline_version()
+
+
+def test_version_covers_the_resolved_segmentation_backend(monkeypatch):
+    pytest.importorskip("spacy")
+    segmenters = [
+        SentenceSegmenter(mode="spacy"),
+        SentenceSegmenter(mode="spacy", model_name="not_a_model"),
+        SentenceSegmenter(mode="rules"),
+    ]
+
+    versions = {segmenter.get_backend(): pipeline_version(monkeypatch, segmenter) for segmenter in segmenters}
+
+    # The model and its sentencizer fallback share SENTENCE_SEGMENTER="spacy"
+    # but split differently, so each backend gets its own version
+    assert "spacy:sentencizer" in versions and "rules" in versions
+    assert len(set(versions.values())) == len(versions)
+
+
+def test_version_is_stable_for_the_same_backend(monkeypatch):
+    first = pipeline_version(monkeypatch, SentenceSegmenter(mode="rules"))
+    second = pipeline_version(monkeypatch, SentenceSegmenter(mode="rules"))
+
+    assert first == second
@@ -0,0 +1,190 @@
+"""Section lookups made by handbook tools during one turn."""
+
+import asyncio
+import time
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from shared.database import HandbookDataService, UserDataService
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools.agent_tool import AgentTool
+from google.genai import types
+
+from shared import turn_context
+from shared.turn_context import TURN_ID_STATE_KEY
+from student_desk.agent import student_desk
+from student_desk.sub_agents import campus_agent, handbook_agent
+from student_desk.sub_agents.handbook_agent.tools.handbook_tools import _get_section_data
+from student_desk.tools import ADK_TOOLS
+
+# Simulated round trip of every database call
+QUERY_SECONDS = 0.05
+
+FEE_STRUCTURE = {"content": "Tuition is paid per semester.", "summary": "Fees", "key_points": []}
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Fake HandbookDataService: the latest handbook lacks fee_structure, an older one has it."""
+    calls = {}
+
+    def fake(name, result):
+        async def method(*args):
+            calls[name] = calls.get(name, 0) + 1
+            await asyncio.sleep(QUERY_SECONDS)
+            return result
+        monkeypatch.setattr(owner[name], name, staticmethod(method))
+
+    owner = {
+        "get_user_context": UserDataService,
+        "get_campus_ai_content": UserDataService,
+        "get_latest_handbook_manifest": HandbookDataService,
+        "get_handbook_section": HandbookDataService,
+        "get_latest_handbook_with_section": HandbookDataService,
+        "get_handbook_sections": HandbookDataService,
+    }
+    fake("get_user_context", {
+        "user": {"name": "Asha"}, "college": {"name": "Test College"},
+        "academic_details": {"college_id": "college", "department_name": "Engineering"}
+    })
+    fake("get_campus_ai_content", {"content": {"overview": "A campus."}, "updated_at": None})
+    fake("get_latest_handbook_manifest", {
+        "handbook_id": "latest", "original_filename": "2026.pdf", "sections": {"basic_info": {}}
+    })
+    fake("get_handbook_section", None)
+    fake("get_latest_handbook_with_section", {
+        "handbook_id": "older", "original_filename": "2025.pdf", "fee_structure": FEE_STRUCTURE
+    })
+    fake("get_handbook_sections", [])
+    return calls
+
+
+def tool_context():
+    return SimpleNamespace(state={"user_id": "user", TURN_ID_STATE_KEY: str(uuid.uuid4())})
+
+
+def get_fee_structure(context):
+    return _get_section_data("fee_structure", "fees", context, "Fee Structure", "fees")
+
+
+def test_fallback_runs_once_per_turn(calls):
+    context = tool_context()
+
+    async def turn():
+        first = await get_fee_structure(context)
+        started = time.perf_counter()
+        repeated = [await get_fee_structure(context) for _ in range(3)]
+        return first, repeated, time.perf_counter() - started
+
+    first, repeated, repeated_seconds = asyncio.run(turn())
+
+    assert first["success"] and first["handbook_filename"] == "2025.pdf"
+    assert all(result == first for result in repeated)
+    assert calls["get_latest_handbook_with_section"] == 1
+    assert calls["get_user_context"] == 1
+    assert calls["get_latest_handbook_manifest"] == 1
+    # The latest handbook's manifest shows the section is null, so its body is never read
+    assert "get_handbook_section" not in calls
+    assert "get_handbook_sections" not in calls
+    # Repeated calls are served from the memo, without a single round trip
+    assert repeated_seconds < QUERY_SECONDS
+
+
+def test_concurrent_calls_share_the_fallback(calls):
+    context = tool_context()
+
+    async def turn():
+        return await asyncio.gather(*(get_fee_structure(context) for _ in range(5)))
+
+    results = asyncio.run(turn())
+
+    assert all(result["success"] for result in results)
+    assert calls["get_latest_handbook_with_section"] == 1
+
+
+def test_each_turn_queries_again(calls):
+    asyncio.run(get_fee_structure(tool_context()))
+    asyncio.run(get_fee_structure(tool_context()))
+
+    assert calls["get_latest_handbook_with_section"] == 2
+
+
+class ScriptedLlm(BaseLlm):
+    """Answers each model call with the next response in its script."""
+
+    script: list
+
+    async def generate_content_async(self, llm_request, stream=False):
+        yield LlmResponse(content=types.Content(role="model", parts=[self.script.pop(0)]))
+
+
+def call(name, **args):
+    return types.Part.from_function_call(name=name, args=args)
+
+
+def test_sub_agents_share_the_turn_memo(calls):
+    """One turn: the root agent's tool, then the campus and handbook agents' tools through AgentTool."""
+    campus = campus_agent.clone(update={"model": ScriptedLlm(model="campus", script=[
+        call("get_user_college_context"),
+        call("fetch_campus_content_by_user_id"),
+        types.Part.from_text(text="Campus answer"),
+    ])})
+    handbook = handbook_agent.clone(update={"model": ScriptedLlm(model="handbook", script=[
+        call("get_handbook_intelligence_context"),
+        call("get_fee_structure_data", query="fees"),
+        call("get_fee_structure_data", query="fee deadline"),
+        types.Part.from_text(text="Handbook answer"),
+    ])})
+    root = student_desk.clone(update={
+        "model": ScriptedLlm(model="root", script=[
+            call("get_user_context"),
+            call(campus.name, request="What is my campus like?"),
+            call(handbook.name, request="What are the fees?"),
+            types.Part.from_text(text="Final answer"),
+        ]),
+        "tools": [AgentTool(agent=campus), AgentTool(agent=handbook), *ADK_TOOLS],
+    })
+    runner = Runner(app_name="camply", agent=root, session_service=InMemorySessionService())
+    memos = []
+
+    class RecordingTurnContext(turn_context.TurnContext):
+        def __init__(self, user_id):
+            super().__init__(user_id)
+            memos.append(self)
+
+    async def turn():
+        session = await runner.session_service.create_session(
+            app_name="camply", user_id="user", state={"user_id": "user"}
+        )
+        events = [event async for event in runner.run_async(
+            user_id="user", session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part.from_text(text="Tell me about fees")])
+        )]
+        session = await runner.session_service.get_session(app_name="camply", user_id="user", session_id=session.id)
+        return events, session.state[TURN_ID_STATE_KEY]
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(turn_context, "TurnContext", RecordingTurnContext)
+        events, turn_id = asyncio.run(turn())
+
+    assert events[-1].content.parts[0].text == "Final answer"
+    function_responses = [
+        part.function_response.response for event in events if event.content
+        for part in event.content.parts if part.function_response
+    ]
+    assert [response["result"] for response in function_responses[1:]] == ["Campus answer", "Handbook answer"]
+    # Every tool in the turn, in the root agent and both sub-agents, used one memo
+    assert len(memos) == 1
+    assert calls == {
+        "get_user_context": 1,
+        "get_campus_ai_content": 1,
+        "get_latest_handbook_manifest": 1,
+        "get_latest_handbook_with_section": 1,
+    }
+    # end_turn discarded the memo
+    assert turn_context._turn_contexts.get((turn_id, "user")) is None
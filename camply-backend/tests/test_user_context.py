@@ -0,0 +1,147 @@
+"""UserDataService.get_user_context: its cache, the asyncpg query and the PostgREST fallback."""
+
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from supabase import acreate_client
+from supabase.lib.client_options import AsyncClientOptions
+
+from shared import database
+from shared.config import Config
+from shared.database import UserDataService
+
+USER_ID = "5f0c3f55-6c7e-4f58-9f0b-1a8e7d0c2b11"
+ACADEMIC_ID = "a1d2c3b4-0000-4000-8000-000000000001"
+COLLEGE_ID = "c011e9e0-0000-4000-8000-000000000002"
+
+USER = {
+    "user_id": USER_ID, "name": "Asha", "email": "asha@example.edu",
+    "phone_number": None, "profile_photo_url": None, "academic_id": ACADEMIC_ID
+}
+COLLEGE = {
+    "college_id": COLLEGE_ID, "name": "Test College", "city": "Pune", "state": "MH",
+    "university_name": "Test University", "college_website_url": None
+}
+ACADEMIC_DETAILS = {
+    "academic_id": ACADEMIC_ID, "college_id": COLLEGE_ID, "department_name": "Engineering",
+    "branch_name": "CSE", "admission_year": 2024, "graduation_year": 2028, "roll_number": "42"
+}
+
+# The row USER_CONTEXT_SQL returns for the same user
+SQL_ROW = {
+    **USER,
+    "user_id": uuid.UUID(USER_ID), "academic_id": uuid.UUID(ACADEMIC_ID),
+    **{key: value for key, value in ACADEMIC_DETAILS.items() if key not in ("academic_id", "college_id")},
+    "college_id": uuid.UUID(COLLEGE_ID), "c_college_id": uuid.UUID(COLLEGE_ID),
+    "college_name": COLLEGE["name"], "city": COLLEGE["city"], "state": COLLEGE["state"],
+    "university_name": COLLEGE["university_name"], "college_website_url": None
+}
+
+
+class FakeConnection:
+    """asyncpg connection stand-in counting round trips."""
+
+    def __init__(self, row=SQL_ROW, error=None):
+        self.calls = []
+        self.row = row
+        self.error = error
+
+    async def fetchrow(self, query, *args):
+        self.calls.append(("fetchrow", args))
+        await asyncio.sleep(0.01)
+        if self.error:
+            raise self.error
+        return self.row
+
+
+class FakePostgREST:
+    """PostgREST stand-in counting requests per table."""
+
+    def __init__(self):
+        self.requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        table = request.url.path.rsplit("/", 1)[-1]
+        self.requests.append(table)
+        if table == "users":
+            return httpx.Response(200, json=[USER])
+        if table == "user_academic_details":
+            return httpx.Response(200, json=[{**ACADEMIC_DETAILS, "colleges": COLLEGE}])
+        return httpx.Response(404, json={"message": "unknown table"})
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    connection = FakeConnection()
+
+    @asynccontextmanager
+    async def get_database_connection():
+        yield connection
+
+    monkeypatch.setattr(Config, "DATABASE_URL", "postgresql://localhost/test")
+    monkeypatch.setattr(database, "get_database_connection", get_database_connection)
+    UserDataService.clear_user_context_cache()
+    yield connection
+    UserDataService.clear_user_context_cache()
+
+
+@pytest.fixture
+def postgrest(monkeypatch):
+    postgrest = FakePostgREST()
+
+    async def get_async_supabase():
+        return await acreate_client(Config.SUPABASE_URL, Config.SUPABASE_ANON_KEY, AsyncClientOptions(
+            httpx_client=httpx.AsyncClient(transport=httpx.MockTransport(postgrest.handler))
+        ))
+
+    monkeypatch.setattr(database, "get_async_supabase", get_async_supabase)
+    return postgrest
+
+
+def test_sql_path_is_one_round_trip(connection, postgrest):
+    context = asyncio.run(UserDataService.fetch_user_context(USER_ID))
+
+    assert connection.calls == [("fetchrow", (USER_ID,))]
+    assert postgrest.requests == []
+    assert context["college"]["name"] == "Test College"
+
+
+def test_sql_and_postgrest_paths_agree(connection, postgrest):
+    sql_context = asyncio.run(UserDataService.fetch_user_context_sql(USER_ID))
+    postgrest_context = asyncio.run(UserDataService.fetch_user_context_postgrest(USER_ID))
+
+    assert sql_context == postgrest_context
+    # users, then user_academic_details with the college embedded
+    assert postgrest.requests == ["users", "user_academic_details"]
+
+
+def test_cached_and_concurrent_lookups_share_one_round_trip(connection, postgrest):
+    async def lookups():
+        await asyncio.gather(*(UserDataService.get_user_context(USER_ID) for _ in range(10)))
+        await UserDataService.get_user_context(USER_ID)
+
+    asyncio.run(lookups())
+
+    assert len(connection.calls) == 1
+
+
+def test_falls_back_to_postgrest_when_the_query_fails(connection, postgrest):
+    connection.error = OSError("connection refused")
+
+    context = asyncio.run(UserDataService.fetch_user_context(USER_ID))
+
+    assert len(connection.calls) == 1
+    assert postgrest.requests == ["users", "user_academic_details"]
+    assert context["academic_details"]["branch_name"] == "CSE"
+
+
+def test_postgrest_only_without_database_url(connection, postgrest, monkeypatch):
+    monkeypatch.setattr(Config, "DATABASE_URL", None)
+
+    asyncio.run(UserDataService.fetch_user_context(USER_ID))
+
+    assert connection.calls == []
+    assert postgrest.requests == ["users", "user_academic_details"]
@@ -78,6 +78,7 @@ export interface UserHandbook {
   graduation_requirements?: Record<string, unknown>;
   fee_structure?: Record<string, unknown>;
   facilities_rules?: Record<string, unknown>;
+  content_hash?: string | null;
   created_at: string;
   updated_at: string;
 }
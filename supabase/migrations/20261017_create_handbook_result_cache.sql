@@ -0,0 +1,20 @@
+-- Processed handbook results shared across backend instances, keyed by the
+-- SHA-256 of the PDF bytes and the processing pipeline version
+create table public.handbook_result_cache (
+  pdf_hash varchar(64) not null,
+  pipeline_version varchar not null,
+  database_format jsonb not null,
+  created_at timestamp with time zone default timezone('utc'::text, now()) not null,
+  primary key (pdf_hash, pipeline_version)
+);
+
+-- Only the backend (service role) reads and writes cached results
+alter table public.handbook_result_cache enable row level security;
+
+create policy "System can manage handbook result cache" on public.handbook_result_cache
+  for all using (false);
+
+create index idx_handbook_result_cache_created_at on public.handbook_result_cache(created_at);
+
+comment on table public.handbook_result_cache is 'Processed handbook output reused when an identical PDF is uploaded again';
+comment on column public.handbook_result_cache.pipeline_version is 'HandbookConfig.get_pipeline_version() at the time the result was produced';
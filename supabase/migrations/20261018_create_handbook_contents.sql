@@ -0,0 +1,110 @@
+-- Shared handbook content store
+--
+-- Students of the same college upload the same handbook, and each completed
+-- user_handbooks row used to carry its own copy of all 12 processed sections.
+-- Processed sections now live once per distinct handbook in handbook_contents,
+-- addressed by a hash of their content, and user rows reference them.
+
+-- Content address: SHA-256 over every section's content text, in section
+-- order, joined by a unit separator (mirrors shared.database.handbook_content_hash)
+create or replace function public.handbook_content_hash(sections jsonb[])
+returns varchar as $$
+  select encode(sha256(convert_to(
+    array_to_string(
+      array(
+        select coalesce(section->>'content', '')
+        from unnest(sections) with ordinality as s(section, position)
+        order by position
+      ),
+      chr(31)
+    ),
+    'UTF8'
+  )), 'hex');
+$$ language sql immutable;
+
+create table public.handbook_contents (
+  content_hash varchar(64) primary key,
+
+  -- Structured JSON Data (same layout as the user_handbooks section columns)
+  basic_info jsonb,
+  semester_structure jsonb,
+  examination_rules jsonb,
+  evaluation_criteria jsonb,
+  attendance_policies jsonb,
+  academic_calendar jsonb,
+  course_details jsonb,
+  assessment_methods jsonb,
+  disciplinary_rules jsonb,
+  graduation_requirements jsonb,
+  fee_structure jsonb,
+  facilities_rules jsonb,
+
+  created_at timestamp with time zone default timezone('utc'::text, now()) not null
+);
+
+-- Move existing processed sections into the shared store, one row per distinct handbook
+insert into public.handbook_contents (
+  content_hash, basic_info, semester_structure, examination_rules, evaluation_criteria,
+  attendance_policies, academic_calendar, course_details, assessment_methods,
+  disciplinary_rules, graduation_requirements, fee_structure, facilities_rules
+)
+select distinct on (content_hash)
+  content_hash, basic_info, semester_structure, examination_rules, evaluation_criteria,
+  attendance_policies, academic_calendar, course_details, assessment_methods,
+  disciplinary_rules, graduation_requirements, fee_structure, facilities_rules
+from (
+  select uh.*, public.handbook_content_hash(array[
+    basic_info, semester_structure, examination_rules, evaluation_criteria,
+    attendance_policies, academic_calendar, course_details, assessment_methods,
+    disciplinary_rules, graduation_requirements, fee_structure, facilities_rules
+  ]) as content_hash
+  from public.user_handbooks uh
+  where processing_status = 'completed'
+) existing
+order by content_hash, processed_date desc nulls last;
+
+alter table public.user_handbooks
+  add column content_hash varchar(64) references public.handbook_contents(content_hash);
+
+-- Point completed rows at their shared content and drop the inline copies
+-- (the right-hand side sees the old section values)
+update public.user_handbooks set
+  content_hash = public.handbook_content_hash(array[
+    basic_info, semester_structure, examination_rules, evaluation_criteria,
+    attendance_policies, academic_calendar, course_details, assessment_methods,
+    disciplinary_rules, graduation_requirements, fee_structure, facilities_rules
+  ]),
+  basic_info = null,
+  semester_structure = null,
+  examination_rules = null,
+  evaluation_criteria = null,
+  attendance_policies = null,
+  academic_calendar = null,
+  course_details = null,
+  assessment_methods = null,
+  disciplinary_rules = null,
+  graduation_requirements = null,
+  fee_structure = null,
+  facilities_rules = null
+where processing_status = 'completed';
+
+create index idx_user_handbooks_content_hash on public.user_handbooks(content_hash);
+
+-- Users can read the shared content their own handbooks reference
+alter table public.handbook_contents enable row level security;
+
+create policy "Users can view referenced handbook contents" on public.handbook_contents
+  for select to authenticated using (
+    exists (
+      select 1 from public.user_handbooks uh
+      where uh.content_hash = handbook_contents.content_hash
+      and uh.user_id = auth.uid()
+    )
+  );
+
+-- Only system can insert/update shared content (written by the handbook processor)
+create policy "System can manage handbook contents" on public.handbook_contents
+  for all using (false);
+
+comment on table public.handbook_contents is 'Processed handbook sections stored once per distinct handbook';
+comment on column public.user_handbooks.content_hash is 'Reference to the shared processed sections in handbook_contents';
@@ -0,0 +1,6 @@
+-- Per-handbook inverted index (terms -> passages with token positions) used for
+-- BM25 handbook search. Built by the handbook processor when the content is
+-- first stored; rows without one get an index built on demand by the backend.
+alter table public.handbook_contents add column search_index jsonb;
+
+comment on column public.handbook_contents.search_index is 'Serialized shared.search_index.HandbookSearchIndex for the content';
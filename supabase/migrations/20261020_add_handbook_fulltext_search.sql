@@ -0,0 +1,92 @@
+-- Full-text search over shared handbook sections
+--
+-- Each section gets a stored tsvector generated from its title (weight A),
+-- summary (B), key points (C) and content (D). A single multi-column GIN
+-- index covers all twelve, and search_handbook_sections() ranks matching
+-- sections with ts_rank_cd and returns a short headline per match, so only
+-- the top-k snippets leave the database.
+
+create or replace function public.handbook_section_tsvector(section jsonb)
+returns tsvector as $$
+  select
+    setweight(to_tsvector('english'::regconfig, coalesce(section->>'title', '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(section->>'summary', '')), 'B') ||
+    setweight(jsonb_to_tsvector('english'::regconfig, coalesce(section->'key_points', '[]'::jsonb), '["string"]'), 'C') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(section->>'content', '')), 'D');
+$$ language sql immutable;
+
+alter table public.handbook_contents
+  add column basic_info_search tsvector generated always as (public.handbook_section_tsvector(basic_info)) stored,
+  add column semester_structure_search tsvector generated always as (public.handbook_section_tsvector(semester_structure)) stored,
+  add column examination_rules_search tsvector generated always as (public.handbook_section_tsvector(examination_rules)) stored,
+  add column evaluation_criteria_search tsvector generated always as (public.handbook_section_tsvector(evaluation_criteria)) stored,
+  add column attendance_policies_search tsvector generated always as (public.handbook_section_tsvector(attendance_policies)) stored,
+  add column academic_calendar_search tsvector generated always as (public.handbook_section_tsvector(academic_calendar)) stored,
+  add column course_details_search tsvector generated always as (public.handbook_section_tsvector(course_details)) stored,
+  add column assessment_methods_search tsvector generated always as (public.handbook_section_tsvector(assessment_methods)) stored,
+  add column disciplinary_rules_search tsvector generated always as (public.handbook_section_tsvector(disciplinary_rules)) stored,
+  add column graduation_requirements_search tsvector generated always as (public.handbook_section_tsvector(graduation_requirements)) stored,
+  add column fee_structure_search tsvector generated always as (public.handbook_section_tsvector(fee_structure)) stored,
+  add column facilities_rules_search tsvector generated always as (public.handbook_section_tsvector(facilities_rules)) stored;
+
+create index idx_handbook_contents_search on public.handbook_contents using gin (
+  basic_info_search,
+  semester_structure_search,
+  examination_rules_search,
+  evaluation_criteria_search,
+  attendance_policies_search,
+  academic_calendar_search,
+  course_details_search,
+  assessment_methods_search,
+  disciplinary_rules_search,
+  graduation_requirements_search,
+  fee_structure_search,
+  facilities_rules_search
+);
+
+-- Rank the sections of the given handbooks against a web-style query
+-- ("quoted phrases", or, -excluded) and return the top matches with snippets
+create or replace function public.search_handbook_sections(
+  content_hashes varchar[],
+  search_query text,
+  match_limit integer default 5
+)
+returns table (content_hash varchar, section text, rank real, snippet text) as $$
+  with query as (
+    select websearch_to_tsquery('english'::regconfig, search_query) as q
+  ), matches as (
+    select hc.content_hash, s.section, ts_rank_cd(s.document, query.q) as rank, s.content, query.q
+    from public.handbook_contents hc
+    cross join query
+    cross join lateral (values
+      ('basic_info', hc.basic_info_search, hc.basic_info->>'content'),
+      ('semester_structure', hc.semester_structure_search, hc.semester_structure->>'content'),
+      ('examination_rules', hc.examination_rules_search, hc.examination_rules->>'content'),
+      ('evaluation_criteria', hc.evaluation_criteria_search, hc.evaluation_criteria->>'content'),
+      ('attendance_policies', hc.attendance_policies_search, hc.attendance_policies->>'content'),
+      ('academic_calendar', hc.academic_calendar_search, hc.academic_calendar->>'content'),
+      ('course_details', hc.course_details_search, hc.course_details->>'content'),
+      ('assessment_methods', hc.assessment_methods_search, hc.assessment_methods->>'content'),
+      ('disciplinary_rules', hc.disciplinary_rules_search, hc.disciplinary_rules->>'content'),
+      ('graduation_requirements', hc.graduation_requirements_search, hc.graduation_requirements->>'content'),
+      ('fee_structure', hc.fee_structure_search, hc.fee_structure->>'content'),
+      ('facilities_rules', hc.facilities_rules_search, hc.facilities_rules->>'content')
+    ) as s(section, document, content)
+    where hc.content_hash = any(content_hashes)
+    and s.document @@ query.q
+    order by rank desc
+    limit match_limit
+  )
+  select
+    matches.content_hash,
+    matches.section,
+    matches.rank,
+    ts_headline(
+      'english'::regconfig, matches.content, matches.q,
+      'MaxFragments=2, MinWords=15, MaxWords=35, StartSel=**, StopSel=**, FragmentDelimiter=" ... "'
+    ) as snippet
+  from matches
+  order by matches.rank desc;
+$$ language sql stable;
+
+comment on function public.search_handbook_sections is 'Top-k handbook sections for a query, ranked with ts_rank_cd, with ts_headline snippets';
@@ -0,0 +1,7 @@
+-- Chunk embedding index for semantic handbook retrieval: the handbook's
+-- (section, chunk text) pairs and their float32 unit vectors (base64), built by
+-- the handbook processor alongside search_index. Rows without one get an index
+-- built on demand by the backend.
+alter table public.handbook_contents add column chunk_index jsonb;
+
+comment on column public.handbook_contents.chunk_index is 'Serialized shared.vector_index.ChunkVectorIndex for the content';
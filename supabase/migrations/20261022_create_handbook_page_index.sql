@@ -0,0 +1,19 @@
+-- Per-handbook state for incremental reprocessing: the hash of every page's
+-- cleaned text, the category matches and sentence count of every chunk and the
+-- content_hash of every section from the last successful run. A revised upload
+-- of the same handbook only rescores the chunks touching changed pages.
+create table public.handbook_page_index (
+  handbook_id uuid primary key references public.user_handbooks(handbook_id) on delete cascade,
+  pipeline_version varchar not null,
+  page_index jsonb not null,
+  updated_at timestamp with time zone default timezone('utc'::text, now()) not null
+);
+
+-- Only the backend (service role) reads and writes page indexes
+alter table public.handbook_page_index enable row level security;
+
+create policy "System can manage handbook page indexes" on public.handbook_page_index
+  for all using (false);
+
+comment on table public.handbook_page_index is 'Page hashes and chunk matches reused when a revised handbook is processed again';
+comment on column public.handbook_page_index.pipeline_version is 'HandbookConfig.get_pipeline_version() at the time the index was saved';
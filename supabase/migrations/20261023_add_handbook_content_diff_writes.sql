@@ -0,0 +1,162 @@
+-- Diff-aware writes of processed handbook content
+--
+-- Storing a reprocessed handbook used to send all twelve sections, the search
+-- index and the chunk embedding index in full. The processor now reads the
+-- stored state first with handbook_content_state() (per-section section_hash
+-- values, a hash of everything stored for the section; no section bodies).
+-- When only some sections changed, it sends just those to
+-- derive_handbook_contents(), which builds the new content row from
+-- the handbook's current one: unchanged section columns are copied in the
+-- database and the stored embeddings of their chunks are spliced into the new
+-- chunk index.
+
+-- Everything the processor needs to plan a write, in one call
+create or replace function public.handbook_content_state(
+  target_handbook_id uuid,
+  new_content_hash varchar
+)
+returns jsonb as $$
+  select jsonb_build_object(
+    'content_hash', uh.content_hash,
+    'stored', exists (
+      select 1 from public.handbook_contents stored
+      where stored.content_hash = new_content_hash
+    ),
+    -- Rows processed before handbook_contents still carry their sections inline
+    'inline_sections', num_nonnulls(
+      uh.basic_info, uh.semester_structure, uh.examination_rules, uh.evaluation_criteria,
+      uh.attendance_policies, uh.academic_calendar, uh.course_details, uh.assessment_methods,
+      uh.disciplinary_rules, uh.graduation_requirements, uh.fee_structure, uh.facilities_rules
+    ) > 0,
+    'sections', case when hc.content_hash is not null then jsonb_build_object(
+      'basic_info', hc.basic_info->>'section_hash',
+      'semester_structure', hc.semester_structure->>'section_hash',
+      'examination_rules', hc.examination_rules->>'section_hash',
+      'evaluation_criteria', hc.evaluation_criteria->>'section_hash',
+      'attendance_policies', hc.attendance_policies->>'section_hash',
+      'academic_calendar', hc.academic_calendar->>'section_hash',
+      'course_details', hc.course_details->>'section_hash',
+      'assessment_methods', hc.assessment_methods->>'section_hash',
+      'disciplinary_rules', hc.disciplinary_rules->>'section_hash',
+      'graduation_requirements', hc.graduation_requirements->>'section_hash',
+      'fee_structure', hc.fee_structure->>'section_hash',
+      'facilities_rules', hc.facilities_rules->>'section_hash'
+    ) end,
+    -- Version, model and dim of the chunk index (chunks and vectors stay here)
+    'chunk_index', hc.chunk_index - array['chunks', 'vectors']
+  )
+  from public.user_handbooks uh
+  left join public.handbook_contents hc on hc.content_hash = uh.content_hash
+  where uh.handbook_id = target_handbook_id;
+$$ language sql stable;
+
+-- Chunk embedding index (shared.vector_index.ChunkVectorIndex) of a derived
+-- row: the base index's chunks and vectors for sections not in
+-- changed_sections, and the changed index's for those that are, in section
+-- order. Null, so the backend rebuilds it on demand, if the two indexes were
+-- not built by the same embedder.
+create or replace function public.splice_chunk_index(
+  base jsonb,
+  changed jsonb,
+  changed_sections text[]
+)
+returns jsonb as $$
+  with section_order as (
+    select section, position
+    from unnest(array[
+      'basic_info', 'semester_structure', 'examination_rules', 'evaluation_criteria',
+      'attendance_policies', 'academic_calendar', 'course_details', 'assessment_methods',
+      'disciplinary_rules', 'graduation_requirements', 'fee_structure', 'facilities_rules'
+    ]) with ordinality as s(section, position)
+  ), sources as (
+    select false as is_changed, base->'chunks' as chunks, decode(base->>'vectors', 'base64') as vectors
+    union all
+    select true, changed->'chunks', decode(changed->>'vectors', 'base64')
+  ), entries as (
+    select
+      section_order.position as section_position,
+      sources.is_changed,
+      chunk.position as chunk_position,
+      chunk.value as chunk,
+      substring(
+        sources.vectors
+        from ((chunk.position - 1) * (changed->>'dim')::int * 4 + 1)::int
+        for (changed->>'dim')::int * 4
+      ) as vector
+    from sources
+    cross join lateral jsonb_array_elements(sources.chunks) with ordinality as chunk(value, position)
+    join section_order on section_order.section = chunk.value->>0
+    where sources.is_changed = (chunk.value->>0 = any(changed_sections))
+  )
+  select case
+    when base is null or changed is null
+      or base->'version' is distinct from changed->'version'
+      or base->'model' is distinct from changed->'model'
+      or base->'dim' is distinct from changed->'dim'
+    then null
+    else (
+      select jsonb_build_object(
+        'version', changed->'version',
+        'model', changed->'model',
+        'dim', changed->'dim',
+        'chunks', coalesce(jsonb_agg(chunk order by section_position, is_changed, chunk_position), '[]'::jsonb),
+        -- encode() wraps base64 every 76 characters
+        'vectors', coalesce(translate(encode(
+          string_agg(vector, ''::bytea order by section_position, is_changed, chunk_position), 'base64'
+        ), E'\n', ''), '')
+      )
+      from entries
+    )
+  end;
+$$ language sql immutable;
+
+-- Store a handbook whose content differs from base_content_hash only in
+-- changed_sections (section name -> processed section). Returns whether the
+-- new row exists afterwards; false if the base row is gone.
+create or replace function public.derive_handbook_contents(
+  base_content_hash varchar,
+  new_content_hash varchar,
+  changed_sections jsonb,
+  new_search_index jsonb,
+  new_chunk_index jsonb,
+  chunk_index_partial boolean default true
+)
+returns boolean as $$
+begin
+  insert into public.handbook_contents (
+    content_hash, basic_info, semester_structure, examination_rules, evaluation_criteria,
+    attendance_policies, academic_calendar, course_details, assessment_methods,
+    disciplinary_rules, graduation_requirements, fee_structure, facilities_rules,
+    search_index, chunk_index
+  )
+  select
+    new_content_hash,
+    coalesce(changed_sections->'basic_info', base.basic_info),
+    coalesce(changed_sections->'semester_structure', base.semester_structure),
+    coalesce(changed_sections->'examination_rules', base.examination_rules),
+    coalesce(changed_sections->'evaluation_criteria', base.evaluation_criteria),
+    coalesce(changed_sections->'attendance_policies', base.attendance_policies),
+    coalesce(changed_sections->'academic_calendar', base.academic_calendar),
+    coalesce(changed_sections->'course_details', base.course_details),
+    coalesce(changed_sections->'assessment_methods', base.assessment_methods),
+    coalesce(changed_sections->'disciplinary_rules', base.disciplinary_rules),
+    coalesce(changed_sections->'graduation_requirements', base.graduation_requirements),
+    coalesce(changed_sections->'fee_structure', base.fee_structure),
+    coalesce(changed_sections->'facilities_rules', base.facilities_rules),
+    new_search_index,
+    case when chunk_index_partial then public.splice_chunk_index(
+      base.chunk_index, new_chunk_index, array(select jsonb_object_keys(changed_sections))
+    ) else new_chunk_index end
+  from public.handbook_contents base
+  where base.content_hash = base_content_hash
+  on conflict (content_hash) do nothing;
+
+  return exists (
+    select 1 from public.handbook_contents stored
+    where stored.content_hash = new_content_hash
+  );
+end;
+$$ language plpgsql;
+
+comment on function public.handbook_content_state is 'Stored content_hash, per-section section hashes and chunk index model of a handbook, for diff-aware writes';
+comment on function public.derive_handbook_contents is 'Insert a handbook_contents row that differs from an existing one only in the given sections';
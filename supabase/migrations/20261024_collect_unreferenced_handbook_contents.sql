@@ -0,0 +1,62 @@
+-- Garbage collection of shared handbook content
+--
+-- handbook_contents rows are addressed by shared.database.handbook_content_hash(),
+-- which now covers every stored section field (summary, key points, scores)
+-- rather than the section text only. Rows keyed by the old text-only address
+-- stay valid for the handbooks that reference them; new runs simply never
+-- match them again. The SQL copy of the old address, only used to backfill
+-- the table, is dropped.
+--
+-- A content row is deleted as soon as the last user_handbooks row stops
+-- referencing it, whether the handbook is deleted or reprocessed into
+-- different content.
+
+drop function if exists public.handbook_content_hash(jsonb[]);
+
+-- Content rows are only deleted once unreferenced, but a reference written
+-- concurrently with the delete is cleared rather than left dangling
+alter table public.user_handbooks
+  drop constraint user_handbooks_content_hash_fkey,
+  add constraint user_handbooks_content_hash_fkey
+    foreign key (content_hash) references public.handbook_contents(content_hash)
+    on delete set null;
+
+-- Runs as the table owner: users delete their own handbooks, but only the
+-- system may delete shared content
+create or replace function public.collect_handbook_contents()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  delete from public.handbook_contents hc
+  where hc.content_hash = old.content_hash
+  and not exists (
+    select 1 from public.user_handbooks uh
+    where uh.content_hash = old.content_hash
+  );
+  return null;
+end;
+$$;
+
+create trigger collect_handbook_contents_on_delete
+  after delete on public.user_handbooks
+  for each row
+  when (old.content_hash is not null)
+  execute function public.collect_handbook_contents();
+
+create trigger collect_handbook_contents_on_update
+  after update of content_hash on public.user_handbooks
+  for each row
+  when (old.content_hash is not null and old.content_hash is distinct from new.content_hash)
+  execute function public.collect_handbook_contents();
+
+-- Content no handbook references (e.g. left behind before these triggers)
+delete from public.handbook_contents hc
+where not exists (
+  select 1 from public.user_handbooks uh
+  where uh.content_hash = hc.content_hash
+);
+
+comment on function public.collect_handbook_contents is 'Delete a handbook_contents row once no user_handbooks row references it';
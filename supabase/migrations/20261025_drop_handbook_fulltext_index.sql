@@ -0,0 +1,14 @@
+-- Drop the unused full-text index on handbook_contents
+--
+-- search_handbook_sections() only ever searches the handful of contents
+-- passed in content_hashes: it finds them by primary key, unpivots their
+-- twelve section vectors with a lateral VALUES and matches each with
+-- s.document @@ q. That predicate is on the unpivoted value, not on an
+-- indexed column, so the planner can never use idx_handbook_contents_search;
+-- the primary key lookup is the plan whatever the table size. The index only
+-- made every content write update a twelve-column GIN index.
+--
+-- The stored *_search vectors stay: the function still ranks against them
+-- without re-parsing the sections.
+
+drop index if exists public.idx_handbook_contents_search;
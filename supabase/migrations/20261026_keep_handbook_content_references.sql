@@ -0,0 +1,42 @@
+-- Never clear a handbook's content reference when collecting content
+--
+-- With on delete set null, collection could race a processor that found a
+-- content row already stored and only re-pointed its handbook at it: the
+-- collector's "no other reference" check does not see the uncommitted
+-- update, deletes the row once the processor commits, and the foreign key
+-- action then nulls the fresh reference, leaving a completed handbook
+-- without content.
+--
+-- The foreign key is back to the default (no action). Whichever transaction
+-- loses the race now fails instead:
+-- - the reference update, if the row is already deleted; the processor then
+--   stores the content again and retries (HandbookDatabaseUpdater)
+-- - the collector's delete, if the row is referenced by the time it runs;
+--   collection skips that row, which stays in use
+
+alter table public.user_handbooks
+  drop constraint user_handbooks_content_hash_fkey,
+  add constraint user_handbooks_content_hash_fkey
+    foreign key (content_hash) references public.handbook_contents(content_hash);
+
+create or replace function public.collect_handbook_contents()
+returns trigger
+language plpgsql
+security definer
+set search_path = public
+as $$
+begin
+  begin
+    delete from public.handbook_contents hc
+    where hc.content_hash = old.content_hash
+    and not exists (
+      select 1 from public.user_handbooks uh
+      where uh.content_hash = old.content_hash
+    );
+  exception when foreign_key_violation then
+    -- Referenced again by a handbook written concurrently
+    null;
+  end;
+  return null;
+end;
+$$;